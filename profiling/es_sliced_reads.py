@@ -0,0 +1,105 @@
+"""Benchmark single cursor vs. sliced hexagon reads from Elasticsearch.
+
+Creates a synthetic index with ~500k resolution 10 hexagon documents
+(unless it already exists), then times `get_hexagons` with one cursor
+and with the given numbers of slices.
+
+Usage:
+    python profiling/es_sliced_reads.py config.json --slices 2 4 8
+
+The connection settings are taken from the `database` section of the
+given JSON file, which is validated as a `Config`.
+"""
+
+import argparse
+import time
+from pathlib import Path
+from typing import Any, Iterator
+
+import h3
+
+from sucolo_database_services.data_access import create_elasticsearch_service
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    default_mapping,
+)
+from sucolo_database_services.elasticsearch_client.read_repository import (
+    ElasticsearchReadRepository,
+)
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService,
+)
+from sucolo_database_services.utils.config import Config
+
+INDEX_NAME = "sucolo_benchmark_hexagons"
+RESOLUTION = 10
+# grid_disk(k) holds 3k(k+1)+1 cells, k=408 gives 500,617 hexagons.
+GRID_DISK_K = 408
+CENTER = (12.3731, 51.3397)  # Leipzig, as (lon, lat) like the other h3 calls
+
+
+def synthetic_hexagons() -> Iterator[dict[str, Any]]:
+    center = h3.latlng_to_cell(*CENTER, RESOLUTION)
+    for i, hex_id in enumerate(h3.grid_disk(center, GRID_DISK_K)):
+        lon, lat = h3.cell_to_latlng(hex_id)
+        yield {
+            "type": "hex_center",
+            "hex_id": hex_id,
+            "resolution": RESOLUTION,
+            "location": {"lon": lon, "lat": lat},
+            "Average age": 20 + i % 50,
+            "Total population": float(i % 1000),
+        }
+
+
+def ensure_index(es_service: ElasticsearchService) -> None:
+    if es_service.index_manager.index_exists(INDEX_NAME):
+        return
+    es_service.index_manager.create_index(INDEX_NAME, mapping=default_mapping)
+    print("Uploading synthetic hexagons ...")
+    es_service.write.bulk_ingest(INDEX_NAME, synthetic_hexagons())
+
+
+def benchmark(
+    repository: ElasticsearchReadRepository, slices: int, repeats: int
+) -> None:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        hexagons = repository.get_hexagons(
+            index_name=INDEX_NAME,
+            resolution=RESOLUTION,
+            features=["Average age", "Total population"],
+            slices=slices,
+        )
+        timings.append(time.perf_counter() - start)
+    print(
+        f"slices={slices:<3} hexagons={len(hexagons):<8} "
+        f"best={min(timings):.2f}s mean={sum(timings) / repeats:.2f}s"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("config", type=Path, help="JSON file with a Config.")
+    parser.add_argument("--slices", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument(
+        "--cleanup", action="store_true", help="Delete the index afterwards."
+    )
+    args = parser.parse_args()
+
+    config = Config.model_validate_json(args.config.read_text())
+    es_service = create_elasticsearch_service(config.database)
+    ensure_index(es_service)
+
+    repository = es_service.read
+    benchmark(repository, slices=1, repeats=args.repeats)
+    for slices in args.slices:
+        benchmark(repository, slices=slices, repeats=args.repeats)
+
+    if args.cleanup:
+        es_service.index_manager.delete_index(INDEX_NAME)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,68 @@
-from logging import Logger
+import logging
 
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService as ElasticsearchService,
+)
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkSettings as BulkSettings,
+)
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+from sucolo_database_services.services.base_service import (
+    BaseServiceDependencies as BaseServiceDependencies,
+)
 from sucolo_database_services.services.data_management_service import (
-    DataManagementService
+    DataManagementService as DataManagementService,
 )
 from sucolo_database_services.services.district_features_service import (
-    DistrictFeaturesService
+    DistrictFeaturesService as DistrictFeaturesService,
 )
 from sucolo_database_services.services.dynamic_features_service import (
-    DynamicFeaturesService
+    DynamicFeaturesService as DynamicFeaturesService,
+)
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
 )
 from sucolo_database_services.services.health_check_service import (
-    HealthCheckService
+    HealthCheckService as HealthCheckService,
 )
 from sucolo_database_services.services.metadata_service import (
-    MetadataService
+    MetadataService as MetadataService,
 )
 from sucolo_database_services.services.multiple_features_service import (
-    MultipleFeaturesService
+    MultipleFeaturesService as MultipleFeaturesService,
+)
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine as LocalSpatialEngine,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisScriptSpatialEngine as RedisScriptSpatialEngine,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisSpatialEngine as RedisSpatialEngine,
+)
+from sucolo_database_services.services.spatial_engines import (
+    SpatialEngine as SpatialEngine,
 )
 from sucolo_database_services.utils.config import Config as Config
+from sucolo_database_services.utils.config import (
+    DatabaseConfig as DatabaseConfig,
+)
+from sucolo_database_services.utils.config import (
+    FeaturesConfig as FeaturesConfig,
+)
+from sucolo_database_services.utils.config import LoggingConfig as LoggingConfig
+from sucolo_database_services.utils.config import (
+    SpatialEngineType as SpatialEngineType,
+)
 
+def create_elasticsearch_service(
+    database_config: DatabaseConfig,
+) -> ElasticsearchService: ...
 
 class DataAccess:
-    logger: Logger
+    logger: logging.Logger
     dynamic_features: DynamicFeaturesService
     district_features: DistrictFeaturesService
     data_management: DataManagementService
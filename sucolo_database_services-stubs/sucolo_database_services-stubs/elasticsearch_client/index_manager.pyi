@@ -1,21 +1,32 @@
 from typing import Any
 
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch as Elasticsearch
 
-default_mapping: dict[str, Any] = {...}
+default_mapping: dict[str, Any]
+VERSION_SEPARATOR: str
+BUILD_SETTINGS: dict[str, Any]
 
+class IndexExistsError(Exception): ...
+
+def versioned_index_name(alias: str, version: int) -> str: ...
+def parse_versioned_index_name(index_name: str) -> tuple[str, int] | None: ...
 
 class ElasticsearchIndexManager:
     es: Elasticsearch
     def __init__(self, es_client: Elasticsearch) -> None: ...
-
     def create_index(
-        self,
-        index_name: str,
-        mapping: dict[str, Any] = ...,
+        self, index_name: str, mapping: dict[str, Any] = ...
     ) -> None: ...
-
     def delete_index(
         self, index_name: str, ignore_if_index_not_exist: bool = True
     ) -> None: ...
     def index_exists(self, index_name: str) -> bool: ...
+    def alias_exists(self, alias: str) -> bool: ...
+    def get_versions(self, alias: str) -> dict[int, bool]: ...
+    def create_versioned_index(
+        self, alias: str, mapping: dict[str, Any] = ...
+    ) -> str: ...
+    def publish_version(
+        self, alias: str, index_name: str, mapping: dict[str, Any] = ...
+    ) -> None: ...
+    def delete_stale_versions(self, alias: str, keep: int = 1) -> list[str]: ...
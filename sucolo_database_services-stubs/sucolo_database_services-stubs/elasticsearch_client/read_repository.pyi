@@ -1,47 +1,89 @@
-from dataclasses import dataclass, field
-from typing import Any
+from dataclasses import dataclass
+from typing import Any, Iterator
 
-from elasticsearch import Elasticsearch
+import pandas as pd
+from elasticsearch import Elasticsearch as Elasticsearch
 
 COORD_TYPE = dict[str, float]
 HIT_TYPE = dict[str, Any]
-
+SOURCE_TYPE = dict[str, str | int | float | COORD_TYPE]
+DEFAULT_KEEP_ALIVE: str
+MAX_TERMS_COUNT: int
 
 @dataclass
 class QueryConstructor:
     type_name: str
     id_name: str | None = ...
-    features: list[str] = field(default_factory=lambda: [])
+    features: list[str] = ...
     only_location: bool = ...
     only_polygon: bool = ...
     size: int = ...
     resolution: int | None = ...
+    columnar: bool = ...
+    string_features: list[str] = ...
+    bbox: tuple[float, float, float, float] | None = ...
+    polygon: list[tuple[float, float]] | None = ...
+    ids: list[str] | None = ...
     def __post_init__(self) -> None: ...
     def build(self) -> dict[str, Any]: ...
 
-
 class ElasticsearchReadRepository:
     es: Elasticsearch
-    def __init__(self, es_client: Elasticsearch) -> None: ...
-
+    keep_alive: str
+    def __init__(
+        self, es_client: Elasticsearch, keep_alive: str = ...
+    ) -> None: ...
+    def iter_pois(
+        self,
+        index_name: str,
+        features: list[str] = [],
+        only_location: bool = False,
+        page_size: int = 10000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]: ...
+    def iter_hexagons(
+        self,
+        index_name: str,
+        resolution: int,
+        features: list[str] = [],
+        only_location: bool = False,
+        page_size: int = 10000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]: ...
+    def iter_districts(
+        self,
+        index_name: str,
+        features: list[str] = [],
+        only_polygon: bool = False,
+        page_size: int = 10000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]: ...
     def get_pois(
         self,
         index_name: str,
         features: list[str] = [],
         only_location: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]: ...
-
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]: ...
     def get_hexagons(
         self,
         index_name: str,
         resolution: int,
         features: list[str] = [],
         only_location: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]: ...
-
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]: ...
     def get_districts(
         self,
         index_name: str,
         features: list[str] = [],
         only_polygon: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]: ...
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]: ...
+    def get_hexagon_columns(
+        self,
+        index_name: str,
+        resolution: int,
+        features: list[str],
+        string_features: list[str] = [],
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: list[tuple[float, float]] | None = None,
+        hex_ids: list[str] | None = None,
+    ) -> pd.DataFrame: ...
@@ -1,20 +1,29 @@
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch as Elasticsearch
 
 from sucolo_database_services.elasticsearch_client.index_manager import (
-    ElasticsearchIndexManager
+    ElasticsearchIndexManager as ElasticsearchIndexManager,
+)
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    parse_versioned_index_name as parse_versioned_index_name,
 )
 from sucolo_database_services.elasticsearch_client.read_repository import (
-    ElasticsearchReadRepository
+    ElasticsearchReadRepository as ElasticsearchReadRepository,
 )
 from sucolo_database_services.elasticsearch_client.write_repository import (
-    ElasticsearchWriteRepository
+    BulkSettings as BulkSettings,
+)
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    ElasticsearchWriteRepository as ElasticsearchWriteRepository,
 )
-
 
 class ElasticsearchService:
     index_manager: ElasticsearchIndexManager
     read: ElasticsearchReadRepository
     write: ElasticsearchWriteRepository
-    def __init__(self, es_client: Elasticsearch) -> None: ...
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        bulk_settings: BulkSettings | None = None,
+    ) -> None: ...
     def get_all_indices(self) -> list[str]: ...
     def check_health(self) -> bool: ...
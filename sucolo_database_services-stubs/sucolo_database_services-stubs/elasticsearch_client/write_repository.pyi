@@ -1,22 +1,55 @@
+from dataclasses import dataclass, field
+from typing import Any, Iterable
+
 import geopandas as gpd
-from elasticsearch import Elasticsearch
+from elasticsearch import Elasticsearch as Elasticsearch
+
+from sucolo_database_services.utils.polygons2hexagons import (
+    polygons2hexagons as polygons2hexagons,
+)
 
+@dataclass(frozen=True)
+class BulkSettings:
+    thread_count: int = ...
+    chunk_size: int = ...
+    max_chunk_bytes: int = ...
+    max_retries: int = ...
+    initial_backoff: float = ...
+    max_backoff: float = ...
+
+@dataclass
+class BulkIngestResult:
+    index_name: str
+    docs_indexed: int = ...
+    failures: list[dict[str, Any]] = field(default_factory=list)
+    seconds: float = ...
+    @property
+    def docs_per_second(self) -> float: ...
 
 class ElasticsearchWriteRepository:
     es: Elasticsearch
-    def __init__(self, es_client: Elasticsearch) -> None: ...
-
+    bulk_settings: BulkSettings
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        bulk_settings: BulkSettings | None = None,
+    ) -> None: ...
     def upload_pois(
         self,
         index_name: str,
         gdf: gpd.GeoDataFrame,
         extra_features: list[str] = [],
-    ) -> None: ...
-
+    ) -> BulkIngestResult: ...
     def upload_districts(
         self, index_name: str, gdf: gpd.GeoDataFrame
-    ) -> None: ...
-
+    ) -> BulkIngestResult: ...
     def upload_hex_centers(
-        self, index_name: str, districts: gpd.GeoDataFrame, hex_resolution: int
-    ) -> None: ...
+        self,
+        index_name: str,
+        districts: gpd.GeoDataFrame,
+        hex_resolution: int,
+        normalized: bool = True,
+    ) -> BulkIngestResult: ...
+    def bulk_ingest(
+        self, index_name: str, actions: Iterable[dict[str, Any]]
+    ) -> BulkIngestResult: ...
@@ -1,2 +1,10 @@
 HEX_SUFFIX: str
+HEX_CATALOGUE_SUFFIX: str
 POIS_SUFFIX: str
+WHEELCHAIR_SUFFIX: str
+FEATURES_SUFFIX: str
+POI_CELLS_SUFFIX: str
+POI_CELL_RESOLUTION_SUFFIX: str
+GENERATION_SUFFIX: str
+FEATURE_CACHE_SUFFIX: str
+STAGING_SUFFIX: str
@@ -0,0 +1,26 @@
+from dataclasses import dataclass
+from functools import cached_property as cached_property
+
+import numpy as np
+import numpy.typing as npt
+
+WITH_CENTERS: int
+
+@dataclass(frozen=True)
+class HexCatalogue:
+    h3_ints: npt.NDArray[np.uint64]
+    lon: npt.NDArray[np.float64] | None = ...
+    lat: npt.NDArray[np.float64] | None = ...
+    def __len__(self) -> int: ...
+    @cached_property
+    def hex_ids(self) -> list[str]: ...
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    def from_bytes(cls, data: bytes) -> HexCatalogue: ...
+    @classmethod
+    def from_hex_ids(
+        cls,
+        hex_ids: list[str],
+        lon: npt.NDArray[np.float64] | None = None,
+        lat: npt.NDArray[np.float64] | None = None,
+    ) -> HexCatalogue: ...
@@ -0,0 +1,7 @@
+from typing import Literal
+
+import numpy as np
+
+HexFeatureMode = Literal["nearest", "count", "presence"]
+REPLY_DTYPES: dict[HexFeatureMode, np.dtype[np.generic]]
+HEX_FEATURES_SCRIPT: str
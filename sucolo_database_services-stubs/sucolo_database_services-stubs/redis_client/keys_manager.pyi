@@ -1,8 +1,16 @@
-from redis import Redis
+from redis import Redis as Redis
 
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX as FEATURE_CACHE_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    GENERATION_SUFFIX as GENERATION_SUFFIX,
+)
 
 class RedisKeysManager:
     redis_client: Redis
     def __init__(self, redis_client: Redis) -> None: ...
     def get_city_keys(self, city: str) -> list[str]: ...
     def delete_city_keys(self, city: str) -> None: ...
+    def delete_data_keys(self, city: str) -> None: ...
+    def replace_city_keys(self, city: str, staging_city: str) -> int: ...
@@ -1,13 +1,82 @@
-from redis import Redis
+from typing import Any
 
+import numpy as np
+import numpy.typing as npt
+from redis import Redis as Redis
+from redis.client import Pipeline as Pipeline
+
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX as FEATURE_CACHE_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    FEATURES_SUFFIX as FEATURES_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    GENERATION_SUFFIX as GENERATION_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    HEX_CATALOGUE_SUFFIX as HEX_CATALOGUE_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    HEX_SUFFIX as HEX_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POI_CELLS_SUFFIX as POI_CELLS_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POIS_SUFFIX as POIS_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    HEX_FEATURES_SCRIPT as HEX_FEATURES_SCRIPT,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES as REPLY_DTYPES,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    HexFeatureMode as HexFeatureMode,
+)
+from sucolo_database_services.redis_client.utils import (
+    check_if_keys_exist as check_if_keys_exist,
+)
+from sucolo_database_services.redis_client.utils import (
+    hex_feature_field as hex_feature_field,
+)
+from sucolo_database_services.redis_client.utils import (
+    parse_hex_feature_field as parse_hex_feature_field,
+)
+from sucolo_database_services.utils.hex_centers import HexCenters as HexCenters
+from sucolo_database_services.utils.hex_centers import (
+    HexCentersCache as HexCentersCache,
+)
+
+GEOPOS_CHUNK_SIZE: int
+HEX_FEATURES_CHUNK_SIZE: int
 
 class RedisReadRepository:
     redis_client: Redis
-    def __init__(self, redis_client: Redis) -> None: ...
+    pipeline_chunk_size: int
+    hex_centers_cache: HexCentersCache
+    def __init__(
+        self, redis_client: Redis, pipeline_chunk_size: int = 10000
+    ) -> None: ...
     def key_exists(self, key: str) -> bool: ...
+    def get_generation(self, city: str) -> int: ...
+    def get_cached_features(self, city: str, key: str) -> bytes | None: ...
+    def get_hex_catalogue(
+        self, city: str, resolution: int
+    ) -> HexCatalogue | None: ...
     def get_hexagons(self, city: str, resolution: int) -> list[str]: ...
+    def get_hex_centers(self, city: str, resolution: int) -> HexCenters: ...
+    def get_poi_coordinates(
+        self, city: str, amenity: str
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: ...
+    def get_poi_cells(
+        self, city: str, amenity: str
+    ) -> tuple[list[str], npt.NDArray[np.int64]] | None: ...
     def count_records_per_key(self, city: str) -> dict[str, int]: ...
-
     def find_nearest_pois_to_hex_centers(
         self,
         city: str,
@@ -16,3 +85,43 @@ class RedisReadRepository:
         radius: int = 300,
         count: int | None = 1,
     ) -> dict[str, list[float]]: ...
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]: ...
+    def find_presence_near_hex_centers(
+        self, city: str, amenity: str, resolution: int, radius: int = 300
+    ) -> dict[str, int]: ...
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        mode: HexFeatureMode,
+    ) -> tuple[list[str], npt.NDArray[Any]] | None: ...
+    def get_hex_feature(
+        self,
+        city: str,
+        resolution: int,
+        amenity: str,
+        radius: int,
+        kind: HexFeatureMode,
+    ) -> tuple[list[str], npt.NDArray[Any]] | None: ...
+    def get_materialized_features(
+        self, city: str
+    ) -> dict[int, list[tuple[str, int, HexFeatureMode]]]: ...
+    def compute_feature_at_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int,
+        kind: HexFeatureMode,
+    ) -> npt.NDArray[Any]: ...
@@ -1,19 +1,23 @@
-from redis import Redis
+from redis import Redis as Redis
 
 from sucolo_database_services.redis_client.keys_manager import (
-    RedisKeysManager
+    RedisKeysManager as RedisKeysManager,
 )
 from sucolo_database_services.redis_client.read_repository import (
-    RedisReadRepository
+    RedisReadRepository as RedisReadRepository,
 )
 from sucolo_database_services.redis_client.write_repository import (
-    RedisWriteRepository
+    RedisWriteRepository as RedisWriteRepository,
 )
 
-
 class RedisService:
     keys_manager: RedisKeysManager
     read: RedisReadRepository
     write: RedisWriteRepository
-    def __init__(self, redis_client: Redis) -> None: ...
+    def __init__(
+        self,
+        redis_client: Redis,
+        geoadd_chunk_size: int = 10000,
+        pipeline_chunk_size: int = 10000,
+    ) -> None: ...
     def check_health(self) -> bool: ...
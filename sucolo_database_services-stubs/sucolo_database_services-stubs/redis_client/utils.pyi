@@ -1,9 +1,14 @@
 from redis import Redis as Redis
 
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES as REPLY_DTYPES,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    HexFeatureMode as HexFeatureMode,
+)
 
-class RedisKeyNotFoundError(Exception):
-    """Exception raised when a Redis key is not found."""
-    pass
-
+class RedisKeyNotFoundError(Exception): ...
 
 def check_if_keys_exist(client: Redis, keys: str | list[str]) -> None: ...
+def hex_feature_field(amenity: str, radius: int, kind: str) -> str: ...
+def parse_hex_feature_field(field: str) -> tuple[str, int, HexFeatureMode]: ...
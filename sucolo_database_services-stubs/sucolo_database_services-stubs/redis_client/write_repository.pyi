@@ -1,12 +1,62 @@
+from typing import Any
+
 import geopandas as gpd
-from redis import Redis
+import numpy.typing as npt
+from redis import Redis as Redis
 from redis.typing import ResponseT as ResponseT
 
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX as FEATURE_CACHE_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    FEATURES_SUFFIX as FEATURES_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    GENERATION_SUFFIX as GENERATION_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    HEX_CATALOGUE_SUFFIX as HEX_CATALOGUE_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    HEX_SUFFIX as HEX_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POI_CELL_RESOLUTION_SUFFIX as POI_CELL_RESOLUTION_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POI_CELLS_SUFFIX as POI_CELLS_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POIS_SUFFIX as POIS_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    WHEELCHAIR_SUFFIX as WHEELCHAIR_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES as REPLY_DTYPES,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    HexFeatureMode as HexFeatureMode,
+)
+from sucolo_database_services.redis_client.utils import (
+    hex_feature_field as hex_feature_field,
+)
+from sucolo_database_services.utils.poi_cells import (
+    count_pois_per_cell as count_pois_per_cell,
+)
+from sucolo_database_services.utils.polygons2hexagons import (
+    polygons2hexagons as polygons2hexagons,
+)
 
 class RedisWriteRepository:
     redis_client: Redis
-    def __init__(self, redis_client: Redis) -> None: ...
-
+    geoadd_chunk_size: int
+    def __init__(
+        self, redis_client: Redis, geoadd_chunk_size: int = 10000
+    ) -> None: ...
     def upload_pois_by_amenity_key(
         self,
         city: str,
@@ -14,7 +64,40 @@ class RedisWriteRepository:
         only_wheelchair_accessible: bool = False,
         wheelchair_positive_values: list[str] = ["yes"],
     ) -> list[int]: ...
-
+    def upload_poi_cells(
+        self,
+        city: str,
+        pois: gpd.GeoDataFrame,
+        resolution: int,
+        only_wheelchair_accessible: bool = False,
+        wheelchair_positive_values: list[str] = ["yes"],
+    ) -> list[int]: ...
+    def update_poi_cells(
+        self,
+        city: str,
+        amenity: str,
+        removed: tuple[float, float] | None = None,
+        added: tuple[float, float] | None = None,
+    ) -> None: ...
     def upload_hex_centers(
         self, city: str, districts: gpd.GeoDataFrame, resolution: int = 9
-    ) -> ResponseT: ...
+    ) -> ResponseT | bool: ...
+    def upload_hex_feature(
+        self,
+        city: str,
+        resolution: int,
+        amenity: str,
+        radius: int,
+        kind: HexFeatureMode,
+        values: npt.NDArray[Any],
+    ) -> None: ...
+    def upsert_poi(
+        self, city: str, amenity: str, poi_id: str, lon: float, lat: float
+    ) -> tuple[float, float] | None: ...
+    def delete_poi(
+        self, city: str, amenity: str, poi_id: str
+    ) -> tuple[float, float] | None: ...
+    def bump_generation(self, city: str) -> int: ...
+    def cache_features(
+        self, city: str, key: str, data: bytes, ttl: int | None = None
+    ) -> None: ...
@@ -9,7 +9,6 @@ from sucolo_database_services.redis_client.service import (
     RedisService as RedisService,
 )
 
-
 @dataclass
 class BaseServiceDependencies:
     es_service: ElasticsearchService
@@ -17,7 +16,6 @@ class BaseServiceDependencies:
     logger: Logger
     def __post_init__(self) -> None: ...
 
-
 class BaseService(abc.ABC):
     def __init__(
         self, base_service_dependencies: BaseServiceDependencies
@@ -3,20 +3,59 @@ from typing import Any
 
 import geopandas as gpd
 
-
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    IndexExistsError as IndexExistsError,
+)
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    default_mapping as default_mapping,
+)
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkIngestResult as BulkIngestResult,
+)
+from sucolo_database_services.redis_client.consts import (
+    STAGING_SUFFIX as STAGING_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    WHEELCHAIR_SUFFIX as WHEELCHAIR_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.utils import (
+    RedisKeyNotFoundError as RedisKeyNotFoundError,
+)
 from sucolo_database_services.services.base_service import (
-    BaseService
+    BaseService as BaseService,
 )
 from sucolo_database_services.services.base_service import (
-    BaseServiceDependencies
+    BaseServiceDependencies as BaseServiceDependencies,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    MaterializedFeature as MaterializedFeature,
+)
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine as LocalSpatialEngine,
+)
+from sucolo_database_services.services.spatial_engines import (
+    SpatialEngine as SpatialEngine,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hexagons_near_point as hexagons_near_point,
+)
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
 )
 
+class _Base(BaseService):
+    spatial_engine: SpatialEngine | None
 
-class _Upload(BaseService):
+class _Upload(_Base):
     def __init__(
         self, base_service_dependencies: BaseServiceDependencies
     ) -> None: ...
-
     def upload_city_data(
         self,
         city: str,
@@ -25,24 +64,44 @@ class _Upload(BaseService):
         hex_resolutions: int | list[int] = 9,
         ignore_if_index_exists: bool = True,
         es_index_mapping: dict[str, Any] = ...,
+        replace_if_index_exists: bool = False,
+        materialized_features: list[MaterializedFeature] = [],
+        poi_cell_resolution: int | None = None,
+    ) -> None: ...
+    def materialize_features(
+        self,
+        city: str,
+        hex_resolutions: int | list[int],
+        features: list[MaterializedFeature],
     ) -> None: ...
-
     def upload_city_data_from_files(
         self, city: str, hex_resolutions: int | list[int], data_dir: Path = ...
     ) -> None: ...
 
+class _Update(_Base):
+    def upsert_poi(
+        self,
+        city: str,
+        amenity: str,
+        poi_id: str,
+        lon: float,
+        lat: float,
+        wheelchair_accessible: bool = False,
+    ) -> None: ...
+    def delete_poi(self, city: str, amenity: str, poi_id: str) -> None: ...
 
-class _Delete(BaseService):
+class _Delete(_Base):
     def __init__(
         self, base_service_dependencies: BaseServiceDependencies
     ) -> None: ...
-
     def delete_city_data(
         self, city: str, ignore_if_index_not_exist: bool = True
     ) -> None: ...
 
-
-class DataManagementService(_Upload, _Delete):
+class DataManagementService(_Upload, _Update, _Delete):
+    spatial_engine: SpatialEngine | None
     def __init__(
-        self, base_service_dependencies: BaseServiceDependencies
+        self,
+        base_service_dependencies: BaseServiceDependencies,
+        spatial_engine: SpatialEngine | None = None,
     ) -> None: ...
@@ -6,13 +6,29 @@ from sucolo_database_services.services.base_service import (
 from sucolo_database_services.services.base_service import (
     BaseServiceDependencies as BaseServiceDependencies,
 )
-
+from sucolo_database_services.services.feature_cache import (
+    CachedValues as CachedValues,
+)
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hexagons_in_polygon as hexagons_in_polygon,
+)
 
 class DistrictFeaturesService(BaseService):
+    feature_cache: FeatureCache | None
     def __init__(
-        self, base_service_dependencies: BaseServiceDependencies
+        self,
+        base_service_dependencies: BaseServiceDependencies,
+        feature_cache: FeatureCache | None = None,
     ) -> None: ...
-
     def get_hexagon_district_features(
-        self, city: str, feature_columns: list[str], resolution: int
+        self,
+        city: str,
+        feature_columns: list[str],
+        resolution: int,
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: list[tuple[float, float]] | None = None,
+        hex_ids: list[str] | None = None,
     ) -> pd.DataFrame: ...
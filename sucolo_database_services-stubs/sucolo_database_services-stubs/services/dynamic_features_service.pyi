@@ -1,29 +1,98 @@
+from typing import Mapping
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES as REPLY_DTYPES,
+)
 from sucolo_database_services.services.base_service import (
     BaseService as BaseService,
 )
 from sucolo_database_services.services.base_service import (
     BaseServiceDependencies as BaseServiceDependencies,
 )
+from sucolo_database_services.services.feature_cache import (
+    CachedValues as CachedValues,
+)
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
+)
+from sucolo_database_services.services.feature_planner import (
+    AmenitySweep as AmenitySweep,
+)
+from sucolo_database_services.services.feature_planner import (
+    PlannedFeature as PlannedFeature,
+)
+from sucolo_database_services.services.feature_planner import (
+    is_engine_feature_kind as is_engine_feature_kind,
+)
+from sucolo_database_services.services.feature_planner import (
+    plan_features as plan_features,
+)
 from sucolo_database_services.services.fields_and_queries import (
     AmenityQuery as AmenityQuery,
 )
+from sucolo_database_services.services.fields_and_queries import (
+    PointFeaturesQuery as PointFeaturesQuery,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisSpatialEngine as RedisSpatialEngine,
+)
+from sucolo_database_services.services.spatial_engines import (
+    SpatialEngine as SpatialEngine,
+)
+from sucolo_database_services.utils.distance_features import (
+    CSR_TYPE as CSR_TYPE,
+)
+from sucolo_database_services.utils.distance_features import (
+    accessibility_within as accessibility_within,
+)
+from sucolo_database_services.utils.distance_features import (
+    counts_within_radii as counts_within_radii,
+)
+from sucolo_database_services.utils.distance_features import (
+    kth_nearest_within as kth_nearest_within,
+)
+from sucolo_database_services.utils.distance_features import (
+    nearest_within as nearest_within,
+)
+from sucolo_database_services.utils.distance_features import to_csr as to_csr
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
+from sucolo_database_services.utils.poi_cells import (
+    approximate_counts as approximate_counts,
+)
 
 HEX_ID_TYPE = str
-
+FEATURE_VALUES_TYPE = Mapping[HEX_ID_TYPE, float | int | None]
 
 class DynamicFeaturesService(BaseService):
+    spatial_engine: SpatialEngine
+    feature_cache: FeatureCache | None
     def __init__(
-        self, base_service_dependencies: BaseServiceDependencies
+        self,
+        base_service_dependencies: BaseServiceDependencies,
+        spatial_engine: SpatialEngine | None = None,
+        feature_cache: FeatureCache | None = None,
     ) -> None: ...
-
     def calculate_nearest_distances(
         self, query: AmenityQuery
     ) -> dict[HEX_ID_TYPE, float | None]: ...
-
     def count_pois_in_distance(
         self, query: AmenityQuery
     ) -> dict[HEX_ID_TYPE, int]: ...
-
     def determine_presence_in_distance(
         self, query: AmenityQuery
     ) -> dict[HEX_ID_TYPE, int]: ...
+    def run_sweep(
+        self, sweep: AmenitySweep
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]: ...
+    def get_point_features(
+        self,
+        query: PointFeaturesQuery,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+    ) -> pd.DataFrame: ...
@@ -0,0 +1,47 @@
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+
+@dataclass(frozen=True)
+class CachedValues:
+    h3_ints: npt.NDArray[np.uint64]
+    values: npt.NDArray[Any]
+    @classmethod
+    def from_hex_ids(
+        cls, hex_ids: Sequence[str], values: npt.ArrayLike
+    ) -> CachedValues: ...
+    @classmethod
+    def from_mapping(
+        cls, values: Mapping[str, float | int | None]
+    ) -> CachedValues: ...
+    @property
+    def hex_ids(self) -> list[str]: ...
+    @property
+    def nbytes(self) -> int: ...
+    def select(self, hex_ids: Sequence[str]) -> CachedValues: ...
+    def to_mapping(self) -> dict[str, float | int | None]: ...
+    def to_bytes(self) -> bytes: ...
+    @classmethod
+    def from_bytes(cls, data: bytes) -> CachedValues: ...
+
+class FeatureCache:
+    max_bytes: int
+    redis_service: RedisService | None
+    redis_ttl: int | None
+    def __init__(
+        self,
+        max_bytes: int = ...,
+        redis_service: RedisService | None = None,
+        redis_ttl: int | None = 3600,
+    ) -> None: ...
+    @property
+    def nbytes(self) -> int: ...
+    def key(self, generation: int, *query: Any) -> str: ...
+    def get(self, city: str, key: str) -> CachedValues | None: ...
+    def put(self, city: str, key: str, entry: CachedValues) -> None: ...
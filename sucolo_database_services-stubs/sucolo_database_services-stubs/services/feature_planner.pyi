@@ -0,0 +1,57 @@
+from dataclasses import dataclass, field
+from typing import Literal, TypeGuard
+
+from sucolo_database_services.services.fields_and_queries import (
+    AccessibilityFields as AccessibilityFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityFields as AmenityFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    KthNearestFields as KthNearestFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    MultipleFeaturesQuery as MultipleFeaturesQuery,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    PointFeaturesQuery as PointFeaturesQuery,
+)
+
+EngineFeatureKind = Literal["nearest", "count", "presence"]
+FeatureKind = Literal[EngineFeatureKind, "kth_nearest", "accessibility"]
+ENGINE_FEATURE_KINDS: tuple[EngineFeatureKind, ...]
+
+def is_engine_feature_kind(
+    kind: FeatureKind,
+) -> TypeGuard[EngineFeatureKind]: ...
+
+COLUMN_PREFIXES: dict[FeatureKind, str]
+
+@dataclass(frozen=True)
+class PlannedFeature:
+    kind: FeatureKind
+    radius: int
+    penalty: int | None = ...
+    approximate: bool = ...
+    min_radius: int = ...
+    k: int = ...
+    beta: float | None = ...
+    label: str = ...
+    order: int = ...
+    def column(self, amenity: str) -> str: ...
+
+@dataclass
+class AmenitySweep:
+    city: str
+    amenity: str
+    resolution: int
+    features: list[PlannedFeature] = field(default_factory=list)
+    hex_ids: list[str] | None = ...
+    @property
+    def radius(self) -> int: ...
+    @property
+    def count(self) -> int | None: ...
+
+def plan_features(
+    query: MultipleFeaturesQuery | PointFeaturesQuery,
+) -> list[AmenitySweep]: ...
@@ -1,39 +1,70 @@
-from pydantic import BaseModel, Field
+from typing import Literal
 
-HEX_ID_TYPE = str
+from pydantic import BaseModel
 
+HEX_ID_TYPE = str
 
 class Query(BaseModel):
-    city: str = Field(..., description="City name to query data for")
-    resolution: int = Field(..., description="Hexagon resolution level")
+    city: str
+    resolution: int
     def validate_city(cls, city: str) -> str: ...
     def validate_resolution(cls, resolution: int) -> int: ...
 
-
 class AmenityFields(BaseModel):
     amenity: str
     radius: int
-    penalty: int | None = None
+    penalty: int | None
+    radii: list[int]
+    bands: bool
+    approximate: bool
     def validate_radius(cls, radius: int) -> int: ...
+    def validate_radii(cls, radii: list[int]) -> list[int]: ...
+    def validate_bands(self) -> AmenityFields: ...
 
+class AmenityQuery(Query, AmenityFields): ...
 
-class AmenityQuery(Query, AmenityFields):
-    ...
+class KthNearestFields(AmenityFields):
+    k: int
 
+class AccessibilityFields(AmenityFields):
+    beta: float
+
+class MaterializedFeature(BaseModel):
+    amenity: str
+    radius: int
+    kind: Literal["nearest", "count", "presence"]
 
 class DistrictFeatureFields(BaseModel):
     features: list[str]
 
+class DistrictFeatureQuery(Query, DistrictFeatureFields): ...
 
-class DistrictFeatureQuery(Query, DistrictFeatureFields):
-    ...
-
+class BoundingBox(BaseModel):
+    min_lon: float
+    min_lat: float
+    max_lon: float
+    max_lat: float
+    def validate_bounds(self) -> BoundingBox: ...
+    def to_polygon(self) -> list[tuple[float, float]]: ...
 
-class MultipleFeaturesQuery(Query):
+class AmenityFeaturesFields(BaseModel):
     nearests: list[AmenityFields]
     counts: list[AmenityFields]
     presences: list[AmenityFields]
+    kth_nearests: list[KthNearestFields]
+    accessibilities: list[AccessibilityFields]
+    def validate_radii(self) -> AmenityFeaturesFields: ...
+
+class PointFeaturesQuery(AmenityFeaturesFields):
+    city: str
+
+class MultipleFeaturesQuery(Query, AmenityFeaturesFields):
     hexagons: DistrictFeatureFields | None
+    bbox: BoundingBox | None
+    polygon: list[tuple[float, float]] | None
+    hex_ids: list[HEX_ID_TYPE] | None
+    @property
+    def is_subset(self) -> bool: ...
     def __post_model_init__(self) -> None: ...
     @property
     def nearest_queries(self) -> list[AmenityQuery]: ...
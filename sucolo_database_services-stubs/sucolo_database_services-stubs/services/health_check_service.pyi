@@ -1,11 +1,10 @@
 from sucolo_database_services.services.base_service import (
-    BaseService
+    BaseService as BaseService,
 )
 from sucolo_database_services.services.base_service import (
-    BaseServiceDependencies
+    BaseServiceDependencies as BaseServiceDependencies,
 )
 
-
 class HealthCheckService(BaseService):
     def __init__(
         self, base_service_dependencies: BaseServiceDependencies
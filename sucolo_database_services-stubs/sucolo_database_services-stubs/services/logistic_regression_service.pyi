@@ -1,7 +1,16 @@
 from typing import Any
 
+RESOLUTION_TO_RADIUS: dict[int, int]
+MAX_COUNT: int
+LINEAR_SCALING_FACTOR: int
+DISTRICT_THRESHOLDS: dict[str, int]
+SLOPE_CLASS_TO_SCORE: dict[int, float]
 
 def logistic_regression(
-    features: list[dict[str, Any]] | None,
-    resolution: int = 9,
+    features: list[dict[str, Any]] | None, resolution: int = 9
 ) -> float: ...
+def score_hexagons_with_selected_features(
+    hexagon_feature_values: dict[str, dict[str, Any]],
+    selected_features: list[dict[str, Any]] | None,
+    resolution: int = 9,
+) -> list[dict[str, Any]]: ...
@@ -1,11 +1,16 @@
+from sucolo_database_services.redis_client.consts import (
+    HEX_SUFFIX as HEX_SUFFIX,
+)
+from sucolo_database_services.redis_client.consts import (
+    POIS_SUFFIX as POIS_SUFFIX,
+)
 from sucolo_database_services.services.base_service import (
-    BaseService
+    BaseService as BaseService,
 )
 from sucolo_database_services.services.base_service import (
-    BaseServiceDependencies
+    BaseServiceDependencies as BaseServiceDependencies,
 )
 
-
 class MetadataService(BaseService):
     def __init__(
         self, base_service_dependencies: BaseServiceDependencies
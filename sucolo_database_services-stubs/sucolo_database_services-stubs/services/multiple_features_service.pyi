@@ -1,35 +1,55 @@
+from typing import Iterator
+
 import pandas as pd
 
 from sucolo_database_services.services.base_service import (
-    BaseService
+    BaseService as BaseService,
 )
 from sucolo_database_services.services.base_service import (
-    BaseServiceDependencies
+    BaseServiceDependencies as BaseServiceDependencies,
 )
 from sucolo_database_services.services.district_features_service import (
-    DistrictFeaturesService
+    DistrictFeaturesService as DistrictFeaturesService,
+)
+from sucolo_database_services.services.dynamic_features_service import (
+    FEATURE_VALUES_TYPE as FEATURE_VALUES_TYPE,
 )
 from sucolo_database_services.services.dynamic_features_service import (
-    DynamicFeaturesService
+    DynamicFeaturesService as DynamicFeaturesService,
+)
+from sucolo_database_services.services.feature_planner import (
+    PlannedFeature as PlannedFeature,
+)
+from sucolo_database_services.services.feature_planner import (
+    plan_features as plan_features,
 )
 from sucolo_database_services.services.fields_and_queries import (
-    MultipleFeaturesQuery
+    MultipleFeaturesQuery as MultipleFeaturesQuery,
 )
 from sucolo_database_services.services.metadata_service import (
-    MetadataService
+    MetadataService as MetadataService,
+)
+from sucolo_database_services.utils.exceptions import (
+    CityNotFoundError as CityNotFoundError,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hexagons_in_polygon as hexagons_in_polygon,
 )
-
 
 class MultipleFeaturesService(BaseService):
     metadata_service: MetadataService
     dynamic_features_service: DynamicFeaturesService
     district_features_service: DistrictFeaturesService
-
+    max_concurrent_queries: int
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
         metadata_service: MetadataService,
         dynamic_features_service: DynamicFeaturesService,
         district_features_service: DistrictFeaturesService,
+        max_concurrent_queries: int = 4,
     ) -> None: ...
     def get_features(self, query: MultipleFeaturesQuery) -> pd.DataFrame: ...
+    def iter_features(
+        self, query: MultipleFeaturesQuery, batch_size: int = 10000
+    ) -> Iterator[pd.DataFrame]: ...
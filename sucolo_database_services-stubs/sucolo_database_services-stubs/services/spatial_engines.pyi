@@ -0,0 +1,109 @@
+import abc
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+from sucolo_database_services.services.feature_planner import (
+    EngineFeatureKind as EngineFeatureKind,
+)
+from sucolo_database_services.utils.point_index import PointIndex as PointIndex
+
+HEX_ID_TYPE = str
+
+class SpatialEngine(abc.ABC, metaclass=abc.ABCMeta):
+    computes_features: bool
+    @abc.abstractmethod
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]: ...
+    @abc.abstractmethod
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]: ...
+    def find_presence_near_hex_centers(
+        self, city: str, amenity: str, resolution: int, radius: int = 300
+    ) -> dict[HEX_ID_TYPE, int]: ...
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        kind: EngineFeatureKind,
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]]: ...
+    def invalidate(
+        self, city: str | None = None, amenity: str | None = None
+    ) -> None: ...
+
+class RedisSpatialEngine(SpatialEngine):
+    def __init__(self, redis_service: RedisService) -> None: ...
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]: ...
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]: ...
+    def find_presence_near_hex_centers(
+        self, city: str, amenity: str, resolution: int, radius: int = 300
+    ) -> dict[HEX_ID_TYPE, int]: ...
+
+class RedisScriptSpatialEngine(RedisSpatialEngine):
+    computes_features: bool
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        kind: EngineFeatureKind,
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]]: ...
+
+class LocalSpatialEngine(SpatialEngine):
+    def __init__(self, redis_service: RedisService) -> None: ...
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]: ...
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]: ...
+    def get_poi_index(self, city: str, amenity: str) -> PointIndex: ...
+    def invalidate(
+        self, city: str | None = None, amenity: str | None = None
+    ) -> None: ...
@@ -1,30 +1,68 @@
 from pytest_mock import MockerFixture as MockerFixture
 
-from sucolo_database_services.data_access import DataAccess
-
+from sucolo_database_services.data_access import DataAccess as DataAccess
+from sucolo_database_services.services.dynamic_features_service import (
+    FEATURE_VALUES_TYPE as FEATURE_VALUES_TYPE,
+)
+from sucolo_database_services.services.feature_planner import (
+    AmenitySweep as AmenitySweep,
+)
+from sucolo_database_services.services.feature_planner import (
+    PlannedFeature as PlannedFeature,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityFields as AmenityFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityQuery as AmenityQuery,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    BoundingBox as BoundingBox,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    DistrictFeatureFields as DistrictFeatureFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    MultipleFeaturesQuery as MultipleFeaturesQuery,
+)
+from sucolo_database_services.utils.exceptions import (
+    CityNotFoundError as CityNotFoundError,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
 
 def test_city_not_found(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None: ...
 def test_invalid_radius() -> None: ...
 def test_invalid_penalty() -> None: ...
-
-
+def test_invalid_bbox() -> None: ...
+def test_invalid_radii() -> None: ...
 def test_get_all_indices(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None: ...
-
-
 def test_get_hexagon_static_features(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None: ...
-
-
 def test_error_handling(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None: ...
-
-
 def test_get_multiple_features(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None: ...
+def test_get_multiple_features_runs_sweeps_concurrently(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None: ...
+def test_get_multiple_features_aligns_values_to_hexagons(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None: ...
+def test_iter_multiple_features_in_batches(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None: ...
+def test_iter_multiple_features_slices_materialized_features(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None: ...
+def test_get_multiple_features_for_hex_ids_subset(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None: ...
@@ -0,0 +1,53 @@
+from typing import Iterator
+
+import pytest
+import redis
+from _typeshed import Incomplete
+from pytest_mock import MockerFixture as MockerFixture
+
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService as ElasticsearchService,
+)
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+from sucolo_database_services.services.base_service import (
+    BaseServiceDependencies as BaseServiceDependencies,
+)
+from sucolo_database_services.services.data_management_service import (
+    DataManagementService as DataManagementService,
+)
+from sucolo_database_services.services.dynamic_features_service import (
+    DynamicFeaturesService as DynamicFeaturesService,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityQuery as AmenityQuery,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    MaterializedFeature as MaterializedFeature,
+)
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine as LocalSpatialEngine,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hexagons_near_point as hexagons_near_point,
+)
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
+)
+
+POI: Incomplete
+
+def test_hexagons_near_point_covers_radius() -> None: ...
+def test_upsert_poi_recomputes_only_nearby_hexagons() -> None: ...
+@pytest.fixture
+def real_redis_client() -> Iterator[redis.Redis]: ...
+def test_replace_city_data_replaces_redis_data(
+    real_redis_client: redis.Redis, mocker: MockerFixture
+) -> None: ...
@@ -7,18 +7,22 @@ from sucolo_database_services.services.base_service import (
 from sucolo_database_services.services.district_features_service import (
     DistrictFeaturesService as DistrictFeaturesService,
 )
-
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
+)
 
 @pytest.fixture
 def base_service_dependencies() -> BaseServiceDependencies: ...
-
-
 @pytest.fixture
 def district_features_service(
     mocker: MockerFixture, base_service_dependencies: BaseServiceDependencies
 ) -> DistrictFeaturesService: ...
-
-
 def test_get_hexagon_district_features_returns_dataframe(
     district_features_service: DistrictFeaturesService, mocker: MockerFixture
 ) -> None: ...
+def test_get_hexagon_district_features_joins_normalized_districts(
+    district_features_service: DistrictFeaturesService, mocker: MockerFixture
+) -> None: ...
+def test_cached_district_features_are_sliced_per_batch(
+    base_service_dependencies: BaseServiceDependencies, mocker: MockerFixture
+) -> None: ...
@@ -0,0 +1,76 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService as ElasticsearchService,
+)
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+from sucolo_database_services.services.base_service import (
+    BaseServiceDependencies as BaseServiceDependencies,
+)
+from sucolo_database_services.services.dynamic_features_service import (
+    DynamicFeaturesService as DynamicFeaturesService,
+)
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
+)
+from sucolo_database_services.services.feature_planner import (
+    plan_features as plan_features,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AccessibilityFields as AccessibilityFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityFields as AmenityFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityQuery as AmenityQuery,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    KthNearestFields as KthNearestFields,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    MultipleFeaturesQuery as MultipleFeaturesQuery,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    PointFeaturesQuery as PointFeaturesQuery,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisScriptSpatialEngine as RedisScriptSpatialEngine,
+)
+
+@pytest.fixture
+def redis_service() -> MagicMock: ...
+@pytest.fixture
+def base_service_dependencies(
+    redis_service: MagicMock,
+) -> BaseServiceDependencies: ...
+@pytest.fixture
+def dynamic_features_service(
+    base_service_dependencies: BaseServiceDependencies,
+) -> DynamicFeaturesService: ...
+def test_plan_features_groups_subqueries_by_amenity() -> None: ...
+def test_run_sweep_derives_features_from_one_query(
+    redis_service: MagicMock, dynamic_features_service: DynamicFeaturesService
+) -> None: ...
+def test_run_sweep_bins_multi_radius_counts(
+    redis_service: MagicMock, dynamic_features_service: DynamicFeaturesService
+) -> None: ...
+def test_run_sweep_computes_kth_nearest_and_accessibility(
+    redis_service: MagicMock, dynamic_features_service: DynamicFeaturesService
+) -> None: ...
+def test_script_engine_computes_each_feature(
+    redis_service: MagicMock, base_service_dependencies: BaseServiceDependencies
+) -> None: ...
+def test_run_sweep_serves_materialized_features(
+    redis_service: MagicMock, dynamic_features_service: DynamicFeaturesService
+) -> None: ...
+def test_get_point_features_returns_columns(
+    redis_service: MagicMock, dynamic_features_service: DynamicFeaturesService
+) -> None: ...
+def test_run_sweep_caches_features_per_generation(
+    redis_service: MagicMock, base_service_dependencies: BaseServiceDependencies
+) -> None: ...
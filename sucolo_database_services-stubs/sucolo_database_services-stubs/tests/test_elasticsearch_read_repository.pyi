@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture as MockerFixture
+
+from sucolo_database_services.elasticsearch_client.read_repository import (
+    ElasticsearchReadRepository as ElasticsearchReadRepository,
+)
+
+@pytest.fixture
+def es_client() -> MagicMock: ...
+def test_iter_hexagons_follows_search_after_until_last_page(
+    es_client: MagicMock,
+) -> None: ...
+def test_get_hexagons_stops_on_short_page(es_client: MagicMock) -> None: ...
+def test_point_in_time_closed_when_search_fails(
+    es_client: MagicMock,
+) -> None: ...
+def test_sliced_get_hexagons_merges_all_slices(
+    es_client: MagicMock,
+) -> None: ...
+def test_get_hexagon_columns_skips_source(es_client: MagicMock) -> None: ...
+def test_get_hexagon_columns_filters_area(es_client: MagicMock) -> None: ...
+def test_get_hexagon_columns_chunks_ids(
+    es_client: MagicMock, mocker: MockerFixture
+) -> None: ...
@@ -0,0 +1,29 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture as MockerFixture
+
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkSettings as BulkSettings,
+)
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    ElasticsearchWriteRepository as ElasticsearchWriteRepository,
+)
+
+@pytest.fixture
+def es_client() -> MagicMock: ...
+@pytest.fixture
+def streamed_chunks(mocker: MockerFixture) -> list[list[dict[str, Any]]]: ...
+def test_bulk_ingest_chunks_and_reports_failures(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None: ...
+def test_bulk_ingest_keeps_disabled_refresh(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None: ...
+def test_upload_districts_uses_district_as_id(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None: ...
+def test_upload_pois_adds_extra_features_per_poi(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None: ...
@@ -0,0 +1,17 @@
+from _typeshed import Incomplete
+
+from sucolo_database_services.redis_client.service import (
+    RedisService as RedisService,
+)
+from sucolo_database_services.services.feature_cache import (
+    CachedValues as CachedValues,
+)
+from sucolo_database_services.services.feature_cache import (
+    FeatureCache as FeatureCache,
+)
+
+HEX_IDS: Incomplete
+
+def test_cached_values_round_trip() -> None: ...
+def test_lru_is_bounded_in_bytes() -> None: ...
+def test_redis_tier_is_shared() -> None: ...
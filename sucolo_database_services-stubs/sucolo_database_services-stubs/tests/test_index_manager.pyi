@@ -0,0 +1,26 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    ElasticsearchIndexManager as ElasticsearchIndexManager,
+)
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    parse_versioned_index_name as parse_versioned_index_name,
+)
+
+@pytest.fixture
+def es_client() -> MagicMock: ...
+def test_parse_versioned_index_name() -> None: ...
+def test_create_versioned_index_uses_next_version_and_build_settings(
+    es_client: MagicMock,
+) -> None: ...
+def test_publish_version_swaps_alias_atomically(
+    es_client: MagicMock,
+) -> None: ...
+def test_publish_version_replaces_unversioned_index(
+    es_client: MagicMock,
+) -> None: ...
+def test_delete_stale_versions_keeps_published_and_newer(
+    es_client: MagicMock,
+) -> None: ...
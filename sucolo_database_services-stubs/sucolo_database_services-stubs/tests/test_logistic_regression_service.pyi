@@ -0,0 +1,11 @@
+from sucolo_database_services.services.logistic_regression_service import (
+    logistic_regression as logistic_regression,
+)
+from sucolo_database_services.services.logistic_regression_service import (
+    score_hexagons_with_selected_features as score_hexagons_with_selected_features,
+)
+
+def test_logistic_regression_returns_neutral_for_invalid_payload() -> None: ...
+def test_logistic_regression_returns_score_in_range() -> None: ...
+def test_logistic_regression_slope_penalty_effect() -> None: ...
+def test_score_hexagons_with_selected_features_returns_raw_values() -> None: ...
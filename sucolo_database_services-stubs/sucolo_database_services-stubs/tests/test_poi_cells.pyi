@@ -0,0 +1,15 @@
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
+from sucolo_database_services.utils.poi_cells import (
+    approximate_counts as approximate_counts,
+)
+from sucolo_database_services.utils.poi_cells import (
+    count_pois_per_cell as count_pois_per_cell,
+)
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
+)
+
+def test_approximate_counts_sum_over_grid_disk() -> None: ...
+def test_approximate_counts_match_exact_counts_for_small_radii() -> None: ...
@@ -0,0 +1,53 @@
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import pytest
+import redis
+from _typeshed import Incomplete
+from pytest_mock import MockerFixture as MockerFixture
+
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.hex_features_script import (
+    HexFeatureMode as HexFeatureMode,
+)
+from sucolo_database_services.redis_client.read_repository import (
+    RedisReadRepository as RedisReadRepository,
+)
+
+HEX_IDS: Incomplete
+
+@pytest.fixture
+def redis_client() -> MagicMock: ...
+def test_find_nearest_pois_derives_hex_centers_from_h3(
+    redis_client: MagicMock,
+) -> None: ...
+def test_hex_centers_are_cached_per_city_and_resolution(
+    redis_client: MagicMock,
+) -> None: ...
+def test_hex_catalogue_is_loaded_once_per_generation(
+    redis_client: MagicMock,
+) -> None: ...
+def test_hex_catalogue_round_trip() -> None: ...
+def test_find_nearest_pois_uses_hex_catalogue(
+    redis_client: MagicMock,
+) -> None: ...
+def test_compute_hex_feature_runs_script_per_chunk(
+    redis_client: MagicMock, mocker: MockerFixture
+) -> None: ...
+@pytest.fixture
+def real_redis_client() -> Iterator[redis.Redis]: ...
+def test_hex_features_script_runs_in_redis(
+    real_redis_client: redis.Redis,
+    mocker: MockerFixture,
+    mode: HexFeatureMode,
+    expected: list[int],
+) -> None: ...
+def test_compute_hex_feature_needs_catalogue(
+    redis_client: MagicMock,
+) -> None: ...
+def test_find_presence_uses_geosearch_any(redis_client: MagicMock) -> None: ...
+def test_find_nearest_pois_to_points_chunks_pipelines(
+    redis_client: MagicMock,
+) -> None: ...
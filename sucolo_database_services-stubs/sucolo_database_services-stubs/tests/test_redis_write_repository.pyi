@@ -0,0 +1,37 @@
+from unittest.mock import MagicMock
+
+import geopandas as gpd
+import pytest
+from _typeshed import Incomplete
+
+from sucolo_database_services.redis_client.hex_catalogue import (
+    HexCatalogue as HexCatalogue,
+)
+from sucolo_database_services.redis_client.write_repository import (
+    RedisWriteRepository as RedisWriteRepository,
+)
+
+DISTRICTS: Incomplete
+
+@pytest.fixture
+def redis_client() -> MagicMock: ...
+@pytest.fixture
+def pois() -> gpd.GeoDataFrame: ...
+def test_upload_pois_by_amenity_key_chunks_geoadd(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None: ...
+def test_upload_wheelchair_accessible_pois(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None: ...
+def test_upload_hex_centers_writes_geo_set_and_catalogue(
+    redis_client: MagicMock,
+) -> None: ...
+def test_upload_hex_centers_skips_existing_keys(
+    redis_client: MagicMock,
+) -> None: ...
+def test_upsert_poi_returns_previous_position(
+    redis_client: MagicMock,
+) -> None: ...
+def test_update_poi_cells_uses_stored_resolution(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None: ...
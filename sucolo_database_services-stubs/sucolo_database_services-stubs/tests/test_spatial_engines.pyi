@@ -0,0 +1,17 @@
+from sucolo_database_services.data_access import DataAccess as DataAccess
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine as LocalSpatialEngine,
+)
+from sucolo_database_services.utils.config import Config as Config
+from sucolo_database_services.utils.config import (
+    SpatialEngineType as SpatialEngineType,
+)
+from sucolo_database_services.utils.hex_centers import HexCenters as HexCenters
+from sucolo_database_services.utils.point_index import PointIndex as PointIndex
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
+)
+
+def test_point_index_matches_brute_force() -> None: ...
+def test_local_engine_loads_pois_once() -> None: ...
+def test_spatial_engine_is_selected_by_config(config: Config) -> None: ...
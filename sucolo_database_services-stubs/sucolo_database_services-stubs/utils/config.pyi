@@ -1,51 +1,52 @@
 from enum import Enum
 from pathlib import Path
 
-from pydantic import BaseModel, Field
-
+from pydantic import BaseModel
 
 class Environment(str, Enum):
     DEVELOPMENT = "development"
     TESTING = "testing"
     PRODUCTION = "production"
 
+class SpatialEngineType(str, Enum):
+    REDIS = "redis"
+    REDIS_SCRIPT = "redis_script"
+    LOCAL = "local"
 
 class DatabaseConfig(BaseModel):
     elastic_host: str
     elastic_user: str
     elastic_password: str
     elastic_timeout: int
+    elastic_bulk_thread_count: int
+    elastic_bulk_chunk_size: int
+    elastic_bulk_max_chunk_bytes: int
+    elastic_bulk_max_retries: int
     redis_host: str
     redis_port: int
     redis_db: int
-    ca_certs: Path = Field(
-        default=Path("certs/ca.crt"), description="Path to CA certificates file"
-    )
+    redis_geoadd_chunk_size: int
+    redis_pipeline_chunk_size: int
+    ca_certs: Path
     def validate_ca_certs(cls, v: Path) -> Path: ...
 
-
 class LoggingConfig(BaseModel):
-    level: str = Field(
-        default="INFO",
-        description="Logging level (DEBUG, INFO, WARNING, ERROR, CRITICAL)",
-    )
-    format: str = Field(
-        default="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        description="Logging format string",
-    )
-    file: Path | None = Field(
-        default=None, description="Optional log file path"
-    )
+    level: str
+    format: str
+    file: Path | None
 
+class FeaturesConfig(BaseModel):
+    spatial_engine: SpatialEngineType
+    max_concurrent_queries: int
+    feature_cache_max_bytes: int
+    feature_cache_redis: bool
+    feature_cache_redis_ttl: int
 
 class Config(BaseModel):
-    environment: Environment = Field(
-        default=Environment.DEVELOPMENT, description="Current environment"
-    )
+    environment: Environment
     database: DatabaseConfig
-    logging: LoggingConfig = Field(
-        default_factory=LoggingConfig, description="Logging configuration"
-    )
+    logging: LoggingConfig
+    features: FeaturesConfig
 
     class Config:
         env_prefix: str
@@ -0,0 +1,30 @@
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+CSR_TYPE = tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]
+
+def to_csr(nearest_distances: Iterable[list[float]]) -> CSR_TYPE: ...
+def nearest_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radius: float,
+) -> npt.NDArray[np.float64]: ...
+def counts_within_radii(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radii: Iterable[int],
+) -> dict[int, npt.NDArray[np.int64]]: ...
+def kth_nearest_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    k: int,
+    radius: float,
+) -> npt.NDArray[np.float64]: ...
+def accessibility_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radius: float,
+    beta: float,
+) -> npt.NDArray[np.float64]: ...
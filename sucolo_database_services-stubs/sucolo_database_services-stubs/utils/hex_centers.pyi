@@ -0,0 +1,31 @@
+from dataclasses import dataclass
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
+)
+
+@dataclass(frozen=True)
+class HexCenters:
+    hex_ids: list[str]
+    lon: npt.NDArray[np.float64]
+    lat: npt.NDArray[np.float64]
+
+def hex_ids_to_centers(
+    hex_ids: Sequence[str],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]: ...
+def hexagons_in_polygon(
+    polygon: Sequence[tuple[float, float]], resolution: int
+) -> set[str]: ...
+def hexagons_near_point(
+    lon: float, lat: float, resolution: int, radius: float
+) -> list[str]: ...
+
+class HexCentersCache:
+    def __init__(self) -> None: ...
+    def get(
+        self, city: str, resolution: int, hex_ids: list[str]
+    ) -> HexCenters: ...
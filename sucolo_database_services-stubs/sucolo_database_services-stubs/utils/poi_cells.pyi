@@ -0,0 +1,21 @@
+from typing import Sequence
+
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers as hex_ids_to_centers,
+)
+from sucolo_database_services.utils.point_index import (
+    haversine_distances as haversine_distances,
+)
+
+def count_pois_per_cell(
+    lon: npt.NDArray[np.float64], lat: npt.NDArray[np.float64], resolution: int
+) -> dict[str, int]: ...
+def approximate_counts(
+    cells: Sequence[str],
+    cell_counts: npt.NDArray[np.int64],
+    hex_ids: Sequence[str],
+    radius: float,
+) -> npt.NDArray[np.uint32]: ...
@@ -0,0 +1,27 @@
+import numpy as np
+import numpy.typing as npt
+
+EARTH_RADIUS_M: float
+
+def haversine_distances(
+    lon1: npt.NDArray[np.float64],
+    lat1: npt.NDArray[np.float64],
+    lon2: npt.NDArray[np.float64],
+    lat2: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]: ...
+
+class PointIndex:
+    lon: npt.NDArray[np.float64]
+    lat: npt.NDArray[np.float64]
+    def __init__(
+        self, lon: npt.NDArray[np.float64], lat: npt.NDArray[np.float64]
+    ) -> None: ...
+    def __len__(self) -> int: ...
+    def query_radius(
+        self,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: float,
+        count: int | None = None,
+        batch_size: int = 4096,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]: ...
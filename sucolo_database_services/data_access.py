@@ -6,6 +6,9 @@ from redis import Redis
 from sucolo_database_services.elasticsearch_client.service import (
     ElasticsearchService,
 )
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkSettings,
+)
 from sucolo_database_services.redis_client.service import RedisService
 from sucolo_database_services.services.base_service import (
     BaseServiceDependencies,
@@ -19,6 +22,7 @@ from sucolo_database_services.services.district_features_service import (
 from sucolo_database_services.services.dynamic_features_service import (
     DynamicFeaturesService,
 )
+from sucolo_database_services.services.feature_cache import FeatureCache
 from sucolo_database_services.services.health_check_service import (
     HealthCheckService,
 )
@@ -26,7 +30,42 @@ from sucolo_database_services.services.metadata_service import MetadataService
 from sucolo_database_services.services.multiple_features_service import (
     MultipleFeaturesService,
 )
-from sucolo_database_services.utils.config import Config, LoggingConfig
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine,
+    RedisScriptSpatialEngine,
+    RedisSpatialEngine,
+    SpatialEngine,
+)
+from sucolo_database_services.utils.config import (
+    Config,
+    DatabaseConfig,
+    FeaturesConfig,
+    LoggingConfig,
+    SpatialEngineType,
+)
+
+
+def create_elasticsearch_service(
+    database_config: DatabaseConfig,
+) -> ElasticsearchService:
+    """Connect to Elasticsearch with the given database settings."""
+    return ElasticsearchService(
+        Elasticsearch(
+            hosts=[database_config.elastic_host],
+            basic_auth=(
+                database_config.elastic_user,
+                database_config.elastic_password,
+            ),
+            ca_certs=str(database_config.ca_certs),
+            timeout=database_config.elastic_timeout,
+        ),
+        bulk_settings=BulkSettings(
+            thread_count=database_config.elastic_bulk_thread_count,
+            chunk_size=database_config.elastic_bulk_chunk_size,
+            max_chunk_bytes=database_config.elastic_bulk_max_chunk_bytes,
+            max_retries=database_config.elastic_bulk_max_retries,
+        ),
+    )
 
 
 class DataAccess:
@@ -50,23 +89,15 @@ class DataAccess:
         ), f"File {config.database.ca_certs} not found."
 
         self.logger = self._get_logger(config.logging)
-        self._es_service = ElasticsearchService(
-            Elasticsearch(
-                hosts=[config.database.elastic_host],
-                basic_auth=(
-                    config.database.elastic_user,
-                    config.database.elastic_password,
-                ),
-                ca_certs=str(config.database.ca_certs),
-                timeout=config.database.elastic_timeout,
-            )
-        )
+        self._es_service = create_elasticsearch_service(config.database)
         self._redis_service = RedisService(
             Redis(
                 host=config.database.redis_host,
                 port=config.database.redis_port,
                 db=config.database.redis_db,
-            )
+            ),
+            geoadd_chunk_size=config.database.redis_geoadd_chunk_size,
+            pipeline_chunk_size=config.database.redis_pipeline_chunk_size,
         )
 
         base_service_dependencies = BaseServiceDependencies(
@@ -74,13 +105,19 @@ class DataAccess:
             redis_service=self._redis_service,
             logger=self.logger,
         )
+        feature_cache = self._get_feature_cache(config.features)
         self.dynamic_features = DynamicFeaturesService(
-            base_service_dependencies
+            base_service_dependencies,
+            spatial_engine=self._get_spatial_engine(config.features),
+            feature_cache=feature_cache,
         )
         self.district_features = DistrictFeaturesService(
-            base_service_dependencies
+            base_service_dependencies, feature_cache=feature_cache
+        )
+        self.data_management = DataManagementService(
+            base_service_dependencies,
+            spatial_engine=self.dynamic_features.spatial_engine,
         )
-        self.data_management = DataManagementService(base_service_dependencies)
         self.metadata = MetadataService(base_service_dependencies)
         self.health_check = HealthCheckService(base_service_dependencies)
 
@@ -89,6 +126,36 @@ class DataAccess:
             metadata_service=self.metadata,
             dynamic_features_service=self.dynamic_features,
             district_features_service=self.district_features,
+            max_concurrent_queries=config.features.max_concurrent_queries,
+        )
+
+    def _get_spatial_engine(
+        self, features_config: FeaturesConfig
+    ) -> SpatialEngine:
+        """Create the engine computing dynamic features."""
+        if features_config.spatial_engine == SpatialEngineType.LOCAL:
+            return LocalSpatialEngine(self._redis_service)
+        if features_config.spatial_engine == SpatialEngineType.REDIS_SCRIPT:
+            return RedisScriptSpatialEngine(self._redis_service)
+        return RedisSpatialEngine(self._redis_service)
+
+    def _get_feature_cache(
+        self, features_config: FeaturesConfig
+    ) -> FeatureCache | None:
+        """Create the cache of computed features, if enabled."""
+        if (
+            features_config.feature_cache_max_bytes == 0
+            and not features_config.feature_cache_redis
+        ):
+            return None
+        return FeatureCache(
+            max_bytes=features_config.feature_cache_max_bytes,
+            redis_service=(
+                self._redis_service
+                if features_config.feature_cache_redis
+                else None
+            ),
+            redis_ttl=features_config.feature_cache_redis_ttl,
         )
 
     def _get_logger(self, logging_config: LoggingConfig) -> logging.Logger:
@@ -1,3 +1,5 @@
+import copy
+import re
 from typing import Any
 
 from elasticsearch import Elasticsearch
@@ -44,10 +46,32 @@ default_mapping = {
 }
 
 
+# Versioned indices are named "<alias>__v<N>" and served behind "<alias>".
+VERSION_SEPARATOR = "__v"
+_VERSIONED_INDEX_PATTERN = re.compile(
+    rf"^(?P<alias>.+){VERSION_SEPARATOR}(?P<version>\d+)$"
+)
+# Settings used while a new version is being built: nothing reads it yet,
+# so refreshes and replication are only overhead.
+BUILD_SETTINGS = {"refresh_interval": "-1", "number_of_replicas": 0}
+
+
 class IndexExistsError(Exception):
     pass
 
 
+def versioned_index_name(alias: str, version: int) -> str:
+    return f"{alias}{VERSION_SEPARATOR}{version}"
+
+
+def parse_versioned_index_name(index_name: str) -> tuple[str, int] | None:
+    """Return (alias, version) of a versioned index name or None."""
+    match = _VERSIONED_INDEX_PATTERN.match(index_name)
+    if match is None:
+        return None
+    return match["alias"], int(match["version"])
+
+
 class ElasticsearchIndexManager:
     def __init__(
         self,
@@ -70,7 +94,15 @@ class ElasticsearchIndexManager:
         index_name: str,
         ignore_if_index_not_exist: bool = True,
     ) -> None:
-        if self.es.indices.exists(index=index_name):
+        if self.alias_exists(index_name):
+            # Delete every version, including unpublished ones.
+            self.es.indices.delete(
+                index=",".join(
+                    versioned_index_name(index_name, version)
+                    for version in self.get_versions(index_name)
+                )
+            )
+        elif self.es.indices.exists(index=index_name):
             self.es.indices.delete(index=index_name)
         else:
             msg = f'Index "{index_name}" doesn\'t exist.'
@@ -83,3 +115,105 @@ class ElasticsearchIndexManager:
         return self.es.indices.exists(  # type: ignore[return-value]
             index=index_name
         )
+
+    def alias_exists(self, alias: str) -> bool:
+        return self.es.indices.exists_alias(  # type: ignore[return-value]
+            name=alias
+        )
+
+    def get_versions(self, alias: str) -> dict[int, bool]:
+        """Get existing versions of an alias.
+
+        Returns:
+            Mapping of version number to whether the alias
+            currently points to that version.
+        """
+        indices = self.es.indices.get_alias(
+            index=f"{alias}{VERSION_SEPARATOR}*"
+        )
+        versions = {}
+        for index_name, info in indices.items():
+            parsed = parse_versioned_index_name(index_name)
+            if parsed is not None and parsed[0] == alias:
+                versions[parsed[1]] = alias in info.get("aliases", {})
+        return versions
+
+    def create_versioned_index(
+        self,
+        alias: str,
+        mapping: dict[str, Any] = default_mapping,
+    ) -> str:
+        """Create the next version of an aliased index, tuned for loading.
+
+        The new index has refreshes disabled and no replicas
+        until it is published with `publish_version`.
+
+        Returns:
+            Name of the created index
+        """
+        versions = self.get_versions(alias)
+        version = max(versions, default=0) + 1
+        index_name = versioned_index_name(alias, version)
+        body = copy.deepcopy(mapping)
+        body.setdefault("settings", {}).update(BUILD_SETTINGS)
+        self.create_index(index_name=index_name, mapping=body)
+        return index_name
+
+    def publish_version(
+        self,
+        alias: str,
+        index_name: str,
+        mapping: dict[str, Any] = default_mapping,
+    ) -> None:
+        """Restore serving settings of a built version and atomically
+        point the alias to it.
+
+        If a plain (unversioned) index is named like the alias, it is
+        removed in the same atomic step.
+        """
+        settings = mapping.get("settings", {})
+        self.es.indices.put_settings(
+            index=index_name,
+            settings={
+                "index": {
+                    # None resets the setting to the cluster default.
+                    key: settings.get(key, settings.get(f"index.{key}"))
+                    for key in BUILD_SETTINGS
+                }
+            },
+        )
+        self.es.indices.refresh(index=index_name)
+
+        actions: list[dict[str, Any]] = []
+        if self.alias_exists(alias):
+            actions += [
+                {"remove": {"index": old_index, "alias": alias}}
+                for old_index in self.es.indices.get_alias(name=alias)
+            ]
+        elif self.index_exists(alias):
+            actions.append({"remove_index": {"index": alias}})
+        actions.append({"add": {"index": index_name, "alias": alias}})
+        self.es.indices.update_aliases(actions=actions)
+
+    def delete_stale_versions(self, alias: str, keep: int = 1) -> list[str]:
+        """Delete versions older than the published one,
+        keeping the `keep` newest versions (the published one included).
+
+        Versions newer than the published one may still be building
+        and are never deleted.
+
+        Returns:
+            Names of the deleted indices
+        """
+        versions = self.get_versions(alias)
+        published = [version for version, active in versions.items() if active]
+        if len(published) == 0:
+            return []
+        older = sorted(
+            (version for version in versions if version <= max(published)),
+            reverse=True,
+        )
+        stale = [versioned_index_name(alias, v) for v in older[keep:]]
+        if len(stale) > 0:
+            self.es.indices.delete(index=",".join(stale))
+        return stale
@@ -1,10 +1,21 @@
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any
+from typing import Any, Iterator
 
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
 from elasticsearch import Elasticsearch
 
 COORD_TYPE = dict[str, float]
 HIT_TYPE = dict[str, Any]
+SOURCE_TYPE = dict[str, str | int | float | COORD_TYPE]
+
+# How long Elasticsearch keeps a point in time alive between two pages.
+DEFAULT_KEEP_ALIVE = "1m"
+# Default `index.max_terms_count`, the most ids in one terms filter.
+MAX_TERMS_COUNT = 65_536
 
 
 @dataclass
@@ -14,8 +25,19 @@ class QueryConstructor:
     features: list[str] = field(default_factory=lambda: [])
     only_location: bool = False
     only_polygon: bool = False
+    # Page size - number of hits fetched per request.
     size: int = 10_000
     resolution: int | None = None
+    # Columnar mode: skip `_source`, read `features` from doc values
+    # and `string_features` (text fields without doc values) via `fields`.
+    columnar: bool = False
+    string_features: list[str] = field(default_factory=lambda: [])
+    # Spatial subset filters on the `location` of the documents:
+    # (min_lon, min_lat, max_lon, max_lat), an exterior ring of (lon, lat)
+    # points, and ids matched against id_name.
+    bbox: tuple[float, float, float, float] | None = None
+    polygon: list[tuple[float, float]] | None = None
+    ids: list[str] | None = None
 
     def __post_init__(self) -> None:
         if self.only_location and self.only_polygon:
@@ -26,6 +48,8 @@ class QueryConstructor:
             self.features = ["location"]
         elif self.only_polygon:
             self.features = ["polygon"]
+        if (self.columnar or self.ids is not None) and self.id_name is None:
+            raise ValueError("Columnar and ids queries require id_name.")
 
     def build(
         self,
@@ -35,27 +59,133 @@ class QueryConstructor:
         ]
         if self.resolution is not None:
             must.append({"term": {"resolution": self.resolution}})
-        query = {
+        query: dict[str, Any] = {
             "size": self.size,
             "query": {"bool": {"must": must}},
             "_source": [self.id_name, *self.features],
         }
-        if len(self.features) == 0:
+        if self.columnar:
+            query["_source"] = False
+            query["fields"] = [self.id_name, *self.string_features]
+            query["docvalue_fields"] = self.features
+        elif len(self.features) == 0:
             query.pop("_source")
+        filters = self._build_filters()
+        if len(filters) > 0:
+            query["query"]["bool"]["filter"] = filters
 
         return query
 
+    def _build_filters(self) -> list[dict[str, Any]]:
+        filters: list[dict[str, Any]] = []
+        if self.bbox is not None:
+            min_lon, min_lat, max_lon, max_lat = self.bbox
+            filters.append(
+                {
+                    "geo_bounding_box": {
+                        "location": {
+                            "top_left": {"lon": min_lon, "lat": max_lat},
+                            "bottom_right": {"lon": max_lon, "lat": min_lat},
+                        }
+                    }
+                }
+            )
+        if self.polygon is not None:
+            ring = [list(point) for point in self.polygon]
+            if ring[0] != ring[-1]:
+                ring.append(ring[0])
+            filters.append(
+                {
+                    "geo_shape": {
+                        "location": {
+                            "shape": {"type": "polygon", "coordinates": [ring]},
+                            "relation": "intersects",
+                        }
+                    }
+                }
+            )
+        if self.ids is not None:
+            filters.append({"terms": {self.id_name: self.ids}})
+        return filters
+
 
 class ElasticsearchReadRepository:
-    def __init__(self, es_client: Elasticsearch):
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        keep_alive: str = DEFAULT_KEEP_ALIVE,
+    ):
         self.es = es_client
+        self.keep_alive = keep_alive
+
+    def iter_pois(
+        self,
+        index_name: str,
+        features: list[str] = [],
+        only_location: bool = False,
+        page_size: int = 10_000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]:
+        """Stream POIs as (id, source) pairs, one page in memory at a time."""
+        return self._iter_query(
+            QueryConstructor(
+                type_name="poi",
+                id_name=None,
+                features=features,
+                only_location=only_location,
+                size=page_size,
+            ),
+            index_name=index_name,
+        )
+
+    def iter_hexagons(
+        self,
+        index_name: str,
+        resolution: int,
+        features: list[str] = [],
+        only_location: bool = False,
+        page_size: int = 10_000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]:
+        """Stream hexagons as (hex_id, source) pairs,
+        one page in memory at a time."""
+        return self._iter_query(
+            QueryConstructor(
+                type_name="hex_center",
+                id_name="hex_id",
+                resolution=resolution,
+                features=features,
+                only_location=only_location,
+                size=page_size,
+            ),
+            index_name=index_name,
+        )
+
+    def iter_districts(
+        self,
+        index_name: str,
+        features: list[str] = [],
+        only_polygon: bool = False,
+        page_size: int = 10_000,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]:
+        """Stream districts as (district, source) pairs,
+        one page in memory at a time."""
+        return self._iter_query(
+            QueryConstructor(
+                type_name="district",
+                id_name="district",
+                features=features,
+                only_polygon=only_polygon,
+                size=page_size,
+            ),
+            index_name=index_name,
+        )
 
     def get_pois(
         self,
         index_name: str,
         features: list[str] = [],
         only_location: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]:
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]:
         return self._query(
             QueryConstructor(
                 type_name="poi",
@@ -64,6 +194,7 @@ class ElasticsearchReadRepository:
                 only_location=only_location,
             ),
             index_name=index_name,
+            slices=slices,
         )
 
     def get_hexagons(
@@ -72,7 +203,13 @@ class ElasticsearchReadRepository:
         resolution: int,
         features: list[str] = [],
         only_location: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]:
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]:
+        """Get all hexagons of the given resolution.
+
+        With `slices` > 1 the hexagons are fetched with a parallel
+        sliced search, one thread per slice.
+        """
         return self._query(
             QueryConstructor(
                 type_name="hex_center",
@@ -82,6 +219,7 @@ class ElasticsearchReadRepository:
                 only_location=only_location,
             ),
             index_name=index_name,
+            slices=slices,
         )
 
     def get_districts(
@@ -89,7 +227,8 @@ class ElasticsearchReadRepository:
         index_name: str,
         features: list[str] = [],
         only_polygon: bool = False,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]:
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]:
         return self._query(
             QueryConstructor(
                 type_name="district",
@@ -98,29 +237,241 @@ class ElasticsearchReadRepository:
                 only_polygon=only_polygon,
             ),
             index_name=index_name,
+            slices=slices,
+        )
+
+    def get_hexagon_columns(
+        self,
+        index_name: str,
+        resolution: int,
+        features: list[str],
+        string_features: list[str] = [],
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: list[tuple[float, float]] | None = None,
+        hex_ids: list[str] | None = None,
+    ) -> pd.DataFrame:
+        """Get hexagon features as a DataFrame indexed by hex_id.
+
+        Unlike `get_hexagons`, `_source` isn't fetched nor parsed:
+        `features` (numeric fields) are read from doc values and
+        `string_features` (text fields) through the `fields` API, and hits
+        are written straight into one preallocated array per column.
+        Missing numeric values are NaN, missing strings are None.
+        With `bbox`, `polygon` or `hex_ids` only the hexagons whose
+        centers are in the area (and with the given ids) are read. Ids
+        are queried in chunks of at most MAX_TERMS_COUNT.
+        """
+        id_chunks: list[list[str] | None] = [None]
+        if hex_ids is not None:
+            id_chunks = [
+                hex_ids[start : start + MAX_TERMS_COUNT]
+                for start in range(0, max(len(hex_ids), 1), MAX_TERMS_COUNT)
+            ]
+        results = [
+            self._query_columns(
+                QueryConstructor(
+                    type_name="hex_center",
+                    id_name="hex_id",
+                    resolution=resolution,
+                    features=features,
+                    string_features=string_features,
+                    columnar=True,
+                    bbox=bbox,
+                    polygon=polygon,
+                    ids=id_chunk,
+                ),
+                index_name,
+            )
+            for id_chunk in id_chunks
+        ]
+        ids, columns = results[0]
+        if len(results) > 1:
+            ids = np.concatenate([result[0] for result in results])
+            columns = {
+                name: np.concatenate([result[1][name] for result in results])
+                for name in columns
+            }
+        return pd.DataFrame(
+            columns,
+            index=pd.Index(ids, name="hex_id"),
+            columns=[*features, *string_features],
+            copy=False,
         )
 
     def _query(
         self,
         query_constructor: QueryConstructor,
         index_name: str,
-    ) -> dict[str, dict[str, Any]]:
-        query = query_constructor.build()
+        slices: int = 1,
+    ) -> dict[str, SOURCE_TYPE]:
+        if slices <= 1:
+            return dict(self._iter_query(query_constructor, index_name))
+        return self._query_sliced(query_constructor, index_name, slices)
 
-        response = self.es.search(index=index_name, body=query)
+    def _iter_query(
+        self,
+        query_constructor: QueryConstructor,
+        index_name: str,
+    ) -> Iterator[tuple[str, SOURCE_TYPE]]:
+        with self._point_in_time(index_name) as pit:
+            for hits in self._iter_pages(query_constructor, pit):
+                yield from self._postprocess_response(
+                    hits=hits,
+                    id_name=query_constructor.id_name,
+                ).items()
 
-        result = self._postprocess_response(
-            hits=response["hits"]["hits"],
-            id_name=query_constructor.id_name,
-        )
+    def _query_sliced(
+        self,
+        query_constructor: QueryConstructor,
+        index_name: str,
+        slices: int,
+    ) -> dict[str, SOURCE_TYPE]:
+        """Fetch all hits with a sliced point in time search.
 
+        The query is split into `slices` disjoint slices of one point in
+        time, each slice is paged through in its own thread (so all shards
+        are busy at once) and the partial results are merged at the end.
+        """
+
+        def fetch_slice(slice_id: int) -> dict[str, SOURCE_TYPE]:
+            slice_pit = dict(pit)
+            slice_result: dict[str, SOURCE_TYPE] = {}
+            for hits in self._iter_pages(
+                query_constructor,
+                slice_pit,
+                slice_={"id": slice_id, "max": slices},
+            ):
+                slice_result.update(
+                    self._postprocess_response(
+                        hits=hits,
+                        id_name=query_constructor.id_name,
+                    )
+                )
+            return slice_result
+
+        result: dict[str, SOURCE_TYPE] = {}
+        with self._point_in_time(index_name) as pit:
+            with ThreadPoolExecutor(max_workers=slices) as executor:
+                for slice_result in executor.map(fetch_slice, range(slices)):
+                    result.update(slice_result)
         return result
 
+    def _query_columns(
+        self,
+        query_constructor: QueryConstructor,
+        index_name: str,
+    ) -> tuple[npt.NDArray[Any], dict[str, npt.NDArray[Any]]]:
+        """Read a columnar query into (ids, {column: values}) arrays.
+
+        Arrays are preallocated from a `count` request and grown if the
+        index receives more documents while it is being read.
+        """
+        id_name = query_constructor.id_name
+        assert id_name is not None
+        features = query_constructor.features
+        string_features = query_constructor.string_features
+        size = self.es.count(
+            index=index_name,
+            body={"query": query_constructor.build()["query"]},
+        )["count"]
+
+        def allocate(
+            n: int,
+        ) -> tuple[npt.NDArray[Any], dict[str, npt.NDArray[Any]]]:
+            arrays: dict[str, npt.NDArray[Any]] = {
+                name: np.full(n, np.nan) for name in features
+            }
+            arrays.update(
+                {
+                    name: np.full(n, None, dtype=object)
+                    for name in string_features
+                }
+            )
+            ids: npt.NDArray[Any] = np.empty(n, dtype=object)
+            return ids, arrays
+
+        ids, columns = allocate(size)
+        filled = 0
+        with self._point_in_time(index_name) as pit:
+            for hits in self._iter_pages(query_constructor, pit):
+                end = filled + len(hits)
+                if end > len(ids):
+                    extra_ids, extra_columns = allocate(end - len(ids))
+                    ids = np.concatenate([ids, extra_ids])
+                    columns = {
+                        name: np.concatenate([values, extra_columns[name]])
+                        for name, values in columns.items()
+                    }
+                hits_fields = [hit.get("fields", {}) for hit in hits]
+                ids[filled:end] = [fields[id_name][0] for fields in hits_fields]
+                for name, values in columns.items():
+                    missing = None if name in string_features else np.nan
+                    values[filled:end] = [
+                        fields[name][0] if name in fields else missing
+                        for fields in hits_fields
+                    ]
+                filled = end
+
+        filled_columns: dict[str, npt.NDArray[Any]] = {
+            name: values[:filled] for name, values in columns.items()
+        }
+        return ids[:filled], filled_columns
+
+    @contextmanager
+    def _point_in_time(self, index_name: str) -> Iterator[dict[str, str]]:
+        """Open a point in time for the index and close it on exit.
+
+        The yielded dict is the `pit` part of the search body. Its id
+        is refreshed by `_iter_pages`, as Elasticsearch may return a new
+        one with every response.
+        """
+        response = self.es.open_point_in_time(
+            index=index_name, keep_alive=self.keep_alive
+        )
+        pit = {"id": response["id"], "keep_alive": self.keep_alive}
+        try:
+            yield pit
+        finally:
+            self.es.close_point_in_time(id=pit["id"])
+
+    def _iter_pages(
+        self,
+        query_constructor: QueryConstructor,
+        pit: dict[str, str],
+        slice_: dict[str, int] | None = None,
+    ) -> Iterator[list[HIT_TYPE]]:
+        """Iterate over all hits matching the query, page by page.
+
+        A point in time (PIT) keeps the view of the index consistent
+        between pages and `search_after` on the `_shard_doc` tiebreaker
+        moves the cursor, so there is no 10k `size` limit and only one page
+        is held in memory at once.
+        """
+        query = query_constructor.build()
+        query["sort"] = [{"_shard_doc": "asc"}]
+        query["track_total_hits"] = False
+        if slice_ is not None:
+            query["slice"] = slice_
+        search_after: list[Any] | None = None
+        while True:
+            body = {**query, "pit": dict(pit)}
+            if search_after is not None:
+                body["search_after"] = search_after
+            response = self.es.search(body=body)
+            pit["id"] = response.get("pit_id", pit["id"])
+            hits = response["hits"]["hits"]
+            if len(hits) == 0:
+                break
+            yield hits
+            if len(hits) < query_constructor.size:
+                break
+            search_after = hits[-1]["sort"]
+
     def _postprocess_response(
         self,
         hits: list[HIT_TYPE],
         id_name: str | None = None,
-    ) -> dict[str, dict[str, str | int | float | COORD_TYPE]]:
+    ) -> dict[str, SOURCE_TYPE]:
         if id_name:
             result = {hit["_source"][id_name]: hit["_source"] for hit in hits}
         else:
@@ -2,11 +2,13 @@ from elasticsearch import Elasticsearch
 
 from sucolo_database_services.elasticsearch_client.index_manager import (
     ElasticsearchIndexManager,
+    parse_versioned_index_name,
 )
 from sucolo_database_services.elasticsearch_client.read_repository import (
     ElasticsearchReadRepository,
 )
 from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkSettings,
     ElasticsearchWriteRepository,
 )
 
@@ -15,6 +17,7 @@ class ElasticsearchService:
     def __init__(
         self,
         es_client: Elasticsearch,
+        bulk_settings: BulkSettings | None = None,
     ) -> None:
         self._es_client = es_client
         self.index_manager = ElasticsearchIndexManager(
@@ -25,14 +28,22 @@ class ElasticsearchService:
         )
         self.write = ElasticsearchWriteRepository(
             es_client=self._es_client,
+            bulk_settings=bulk_settings,
         )
 
     def get_all_indices(
         self,
     ) -> list[str]:
-        return self._es_client.indices.get_alias(  # type: ignore[return-value]
-            index="*"
-        )
+        """Get names of all indices. Versioned indices are reported
+        by their alias, unpublished versions are skipped."""
+        indices = self._es_client.indices.get_alias(index="*")
+        names: list[str] = []
+        for index_name, info in indices.items():
+            if parse_versioned_index_name(index_name) is None:
+                names.append(index_name)
+            else:
+                names += list(info.get("aliases", {}))
+        return list(dict.fromkeys(names))
 
     def check_health(self) -> bool:
         """Check if Elasticsearch is reachable."""
@@ -1,4 +1,10 @@
-from typing import Any, Iterator
+import itertools
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Iterable, Iterator
 
 import geopandas as gpd
 from elasticsearch import Elasticsearch, helpers
@@ -6,94 +12,119 @@ from elasticsearch import Elasticsearch, helpers
 from sucolo_database_services.utils.polygons2hexagons import polygons2hexagons
 
 
+@dataclass(frozen=True)
+class BulkSettings:
+    """Settings of the bulk ingest engine."""
+
+    # Number of bulk requests sent concurrently.
+    thread_count: int = 4
+    # Maximum number of documents and bytes in one bulk request.
+    chunk_size: int = 1000
+    max_chunk_bytes: int = 10 * 1024 * 1024
+    # Retries of documents rejected with 429 (Too Many Requests),
+    # with exponential backoff between initial_backoff and max_backoff.
+    max_retries: int = 3
+    initial_backoff: float = 2
+    max_backoff: float = 60
+
+
+@dataclass
+class BulkIngestResult:
+    """Summary of a bulk ingest."""
+
+    index_name: str
+    docs_indexed: int = 0
+    failures: list[dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def docs_per_second(self) -> float:
+        return self.docs_indexed / self.seconds if self.seconds > 0 else 0.0
+
+
 class ElasticsearchWriteRepository:
-    def __init__(self, es_client: Elasticsearch):
+    def __init__(
+        self,
+        es_client: Elasticsearch,
+        bulk_settings: BulkSettings | None = None,
+    ):
         self.es = es_client
+        self.bulk_settings = bulk_settings or BulkSettings()
 
     def upload_pois(
         self,
         index_name: str,
         gdf: gpd.GeoDataFrame,
         extra_features: list[str] = [],
-    ) -> None:
+    ) -> BulkIngestResult:
         def doc_stream() -> Iterator[dict[str, Any]]:
             if len(extra_features) > 0:
-                pois_features = gdf[extra_features].to_dict()
+                pois_features = gdf[extra_features].to_dict(orient="records")
             else:
-                pois_features = {}
-            for amenity, point in zip(gdf["amenity"], gdf["geometry"]):
+                pois_features = itertools.repeat({})
+            for amenity, point, features in zip(
+                gdf["amenity"], gdf["geometry"], pois_features
+            ):
                 data = {
                     "type": "poi",
                     "amenity": amenity,
                     "location": {"lon": point.x, "lat": point.y},
                 }
-                data.update(pois_features)
+                data.update(features)
                 yield data
 
-        for status_ok, response in helpers.streaming_bulk(
-            self.es,
-            actions=doc_stream(),
-            chunk_size=1000,
-            index=index_name,
-        ):
-            if not status_ok:
-                print(response)
+        return self.bulk_ingest(index_name=index_name, actions=doc_stream())
 
     def upload_districts(
         self,
         index_name: str,
         gdf: gpd.GeoDataFrame,
-    ) -> None:
+    ) -> BulkIngestResult:
         """Upload districts to Elasticsearch.
 
         Args:
             gdf (gpd.GeoDataFrame): GeoDataFrame containing district polygons
         """
-        gdf["polygon"] = gdf["geometry"].apply(lambda g: g.wkt)
+        gdf = gdf.assign(polygon=gdf["geometry"].apply(lambda g: g.wkt))
         gdf = gdf.drop(columns=["id", "geometry"])
 
-        print(f"Prepared {len(gdf)} documents for upload")
-
-        try:
-            for i, row in gdf.iterrows():
-                try:
-                    self.es.index(
-                        index=index_name,
-                        id=row["district"],
-                        document={
-                            "type": "district",
-                            **row.to_dict(),
-                        },
-                    )
-                    if i % 10 == 0:  # Log progress every 10 documents
-                        print(f"Uploaded {i+1}/{len(gdf)} districts")
-                except Exception as e:
-                    print(
-                        f"Error uploading district {row['district']}: {str(e)}"
-                    )
-
-            print("Upload completed")
-            # Verify the upload
-            count = self.es.count(index=index_name)
-            print(f"Total documents in index: {count['count']}")
+        def doc_stream() -> Iterator[dict[str, Any]]:
+            for row in gdf.to_dict(orient="records"):
+                yield {"_id": row["district"], "type": "district", **row}
 
-        except Exception as e:
-            print(f"Error during upload: {str(e)}")
+        return self.bulk_ingest(index_name=index_name, actions=doc_stream())
 
     def upload_hex_centers(
         self,
         index_name: str,
         districts: gpd.GeoDataFrame,
         hex_resolution: int,
-    ) -> None:
+        normalized: bool = True,
+    ) -> BulkIngestResult:
+        """Upload hexagon centers to Elasticsearch.
+
+        Args:
+            districts: GeoDataFrame containing district polygons
+            hex_resolution: H3 resolution of the hexagons
+            normalized: If True, hexagon documents only reference their
+                district by name and district features are read from
+                district documents. Otherwise every district feature is
+                copied onto each hexagon document.
+        """
         distric_hexagons = polygons2hexagons(
             districts, resolution=hex_resolution
         )
+        district_names = districts["district"]
         districts = districts.drop(columns=["district", "geometry"])
 
         def doc_stream() -> Iterator[dict[str, Any]]:
             for distric_id, hex_centers in distric_hexagons.items():
-                district_features = districts.loc[distric_id].to_dict()
+                if normalized:
+                    district_features = {
+                        "district": district_names.loc[distric_id]
+                    }
+                else:
+                    district_features = districts.loc[distric_id].to_dict()
                 for id_, center in hex_centers:
                     data = {
                         "type": "hex_center",
@@ -104,11 +135,109 @@ class ElasticsearchWriteRepository:
                     data.update(district_features)
                     yield data
 
+        return self.bulk_ingest(index_name=index_name, actions=doc_stream())
+
+    def bulk_ingest(
+        self,
+        index_name: str,
+        actions: Iterable[dict[str, Any]],
+    ) -> BulkIngestResult:
+        """Index documents with concurrent bulk requests.
+
+        Documents are split into chunks that are sent by a pool of
+        `thread_count` threads (like `helpers.parallel_bulk`), each chunk
+        with `helpers.streaming_bulk`, which retries documents rejected
+        with 429 using exponential backoff. Refreshes of the index are
+        suspended for the duration of the load.
+        """
+        settings = self.bulk_settings
+        result = BulkIngestResult(index_name=index_name)
+        start = time.perf_counter()
+
+        def collect(future: Future[tuple[int, list[dict[str, Any]]]]) -> None:
+            docs_indexed, failures = future.result()
+            result.docs_indexed += docs_indexed
+            result.failures += failures
+
+        with self._refresh_suspended(index_name):
+            with ThreadPoolExecutor(settings.thread_count) as executor:
+                in_flight: deque[
+                    Future[tuple[int, list[dict[str, Any]]]]
+                ] = deque()
+                for chunk in _chunked(actions, settings.chunk_size):
+                    in_flight.append(
+                        executor.submit(self._bulk_chunk, index_name, chunk)
+                    )
+                    # Bound the number of chunks held in memory.
+                    if len(in_flight) >= 2 * settings.thread_count:
+                        collect(in_flight.popleft())
+                while len(in_flight) > 0:
+                    collect(in_flight.popleft())
+
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _bulk_chunk(
+        self,
+        index_name: str,
+        chunk: list[dict[str, Any]],
+    ) -> tuple[int, list[dict[str, Any]]]:
+        settings = self.bulk_settings
+        docs_indexed = 0
+        failures = []
         for status_ok, response in helpers.streaming_bulk(
             self.es,
-            actions=doc_stream(),
-            chunk_size=1000,
+            actions=chunk,
             index=index_name,
+            chunk_size=settings.chunk_size,
+            max_chunk_bytes=settings.max_chunk_bytes,
+            max_retries=settings.max_retries,
+            initial_backoff=settings.initial_backoff,
+            max_backoff=settings.max_backoff,
+            raise_on_error=False,
+            raise_on_exception=False,
         ):
-            if not status_ok:
-                print(response)
+            if status_ok:
+                docs_indexed += 1
+            else:
+                failures.append(response)
+        return docs_indexed, failures
+
+    @contextmanager
+    def _refresh_suspended(self, index_name: str) -> Iterator[None]:
+        """Disable refreshes of the index and restore them afterwards."""
+        response = self.es.indices.get_settings(
+            index=index_name, name="index.refresh_interval"
+        )
+        refresh_interval: str | None = None
+        for index_settings in response.values():
+            refresh_interval = (
+                index_settings.get("settings", {})
+                .get("index", {})
+                .get("refresh_interval")
+            )
+        if refresh_interval == "-1":
+            # Already disabled, e.g. for a new index version.
+            yield
+            return
+
+        self.es.indices.put_settings(
+            index=index_name, settings={"index": {"refresh_interval": "-1"}}
+        )
+        try:
+            yield
+        finally:
+            # None resets the setting to the default.
+            self.es.indices.put_settings(
+                index=index_name,
+                settings={"index": {"refresh_interval": refresh_interval}},
+            )
+            self.es.indices.refresh(index=index_name)
+
+
+def _chunked(
+    actions: Iterable[dict[str, Any]], size: int
+) -> Iterator[list[dict[str, Any]]]:
+    iterator = iter(actions)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
@@ -1,3 +1,19 @@
 # sufficies
 HEX_SUFFIX = "_hex_centers"
+# packed hexagon ids and centers, see hex_catalogue.py
+HEX_CATALOGUE_SUFFIX = "_hex_catalogue"
 POIS_SUFFIX = "_pois"
+# amenity suffix of the wheelchair accessible POIs
+WHEELCHAIR_SUFFIX = "_wheelchair"
+# hash of materialized dynamic features per hexagon resolution
+FEATURES_SUFFIX = "_features"
+# hash of POI counts per H3 cell of an amenity, see poi_cells.py
+POI_CELLS_SUFFIX = "_poi_cells"
+# H3 resolution of the POI cells of a city
+POI_CELL_RESOLUTION_SUFFIX = "_poi_cell_resolution"
+# counter bumped whenever the data of a city changes, see feature_cache.py
+GENERATION_SUFFIX = "_generation"
+# cached feature values of a city, see feature_cache.py
+FEATURE_CACHE_SUFFIX = "_feature_cache"
+# city name suffix of data uploaded to replace a city, see keys_manager.py
+STAGING_SUFFIX = "_staging"
@@ -0,0 +1,98 @@
+from dataclasses import dataclass
+from functools import cached_property
+
+import h3
+import numpy as np
+import numpy.typing as npt
+
+# Packed layout (little-endian):
+#   header: uint64 flags
+#   ids:    N x uint64 (H3 cells as integers)
+#   [lon:   N x float64, lat: N x float64]  if flags & WITH_CENTERS
+_HEADER = np.dtype("<u8")
+_IDS = np.dtype("<u8")
+_COORDS = np.dtype("<f8")
+WITH_CENTERS = 1
+
+
+@dataclass(frozen=True)
+class HexCatalogue:
+    """Hexagons of a city and resolution, as packed in Redis.
+
+    Arrays are read-only views on the packed bytes (no copy is made).
+    """
+
+    h3_ints: npt.NDArray[np.uint64]
+    lon: npt.NDArray[np.float64] | None = None
+    lat: npt.NDArray[np.float64] | None = None
+
+    def __len__(self) -> int:
+        return len(self.h3_ints)
+
+    @cached_property
+    def hex_ids(self) -> list[str]:
+        """Hexagon ids as H3 strings, decoded once per catalogue.
+
+        H3 cells are 15 hex digits, the last 15 of the 16 digits of the
+        big-endian id, so they are sliced out of one hex dump.
+        """
+        if len(self) == 0:
+            return []
+        digits = self.h3_ints.astype(">u8").tobytes().hex().encode("ascii")
+        hex_ids: list[str] = (
+            np.ndarray(
+                shape=(len(self),),
+                dtype="S15",
+                buffer=digits,
+                offset=1,
+                strides=(16,),
+            )
+            .astype("U15")
+            .tolist()
+        )
+        return hex_ids
+
+    def to_bytes(self) -> bytes:
+        flags = 0 if self.lon is None or self.lat is None else WITH_CENTERS
+        parts = [
+            np.array([flags], dtype=_HEADER).tobytes(),
+            self.h3_ints.astype(_IDS, copy=False).tobytes(),
+        ]
+        if self.lon is not None and self.lat is not None:
+            parts.append(self.lon.astype(_COORDS, copy=False).tobytes())
+            parts.append(self.lat.astype(_COORDS, copy=False).tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "HexCatalogue":
+        flags = int(np.frombuffer(data, dtype=_HEADER, count=1)[0])
+        offset = _HEADER.itemsize
+        row_size = _IDS.itemsize
+        if flags & WITH_CENTERS:
+            row_size += 2 * _COORDS.itemsize
+        if (len(data) - offset) % row_size != 0:
+            raise ValueError("Malformed hexagon catalogue.")
+        n = (len(data) - offset) // row_size
+
+        h3_ints = np.frombuffer(data, dtype=_IDS, count=n, offset=offset)
+        if not flags & WITH_CENTERS:
+            return cls(h3_ints=h3_ints)
+        offset += n * _IDS.itemsize
+        lon = np.frombuffer(data, dtype=_COORDS, count=n, offset=offset)
+        offset += n * _COORDS.itemsize
+        lat = np.frombuffer(data, dtype=_COORDS, count=n, offset=offset)
+        return cls(h3_ints=h3_ints, lon=lon, lat=lat)
+
+    @classmethod
+    def from_hex_ids(
+        cls,
+        hex_ids: list[str],
+        lon: npt.NDArray[np.float64] | None = None,
+        lat: npt.NDArray[np.float64] | None = None,
+    ) -> "HexCatalogue":
+        h3_ints = np.fromiter(
+            (h3.str_to_int(hex_id) for hex_id in hex_ids),
+            dtype=_IDS,
+            count=len(hex_ids),
+        )
+        return cls(h3_ints=h3_ints, lon=lon, lat=lat)
@@ -0,0 +1,71 @@
+from typing import Literal
+
+import numpy as np
+
+HexFeatureMode = Literal["nearest", "count", "presence"]
+
+# Packed reply item per hexagon of each mode; nearest is NaN if no POI
+# is within the radius.
+REPLY_DTYPES: dict[HexFeatureMode, np.dtype[np.generic]] = {
+    "nearest": np.dtype("<f8"),
+    "count": np.dtype("<u4"),
+    "presence": np.dtype("u1"),
+}
+
+# Computes a feature for the hexagons [start, stop) of a packed hexagon
+# catalogue (see hex_catalogue.py) with centers, in a single call.
+#   KEYS[1]: hexagon catalogue, KEYS[2]: POIs GEO set
+#   ARGV: radius in meters, mode, start, stop
+# Returns one binary string with an item of REPLY_DTYPES per hexagon.
+HEX_FEATURES_SCRIPT = """
+local size = redis.call('STRLEN', KEYS[1])
+if size == 0 then
+    return redis.error_reply('hexagon catalogue not found')
+end
+local radius = tonumber(ARGV[1])
+local mode = ARGV[2]
+local start = tonumber(ARGV[3])
+local stop = tonumber(ARGV[4])
+if stop <= start then
+    return ''
+end
+local header = 8
+local n = (size - header) / 24
+-- Only the centers of the chunk are read, GETRANGE bounds are inclusive
+local lon_offset = header + 8 * n + 8 * start
+local lat_offset = header + 16 * n + 8 * start
+local length = 8 * (stop - start)
+local lons = redis.call(
+    'GETRANGE', KEYS[1], lon_offset, lon_offset + length - 1)
+local lats = redis.call(
+    'GETRANGE', KEYS[1], lat_offset, lat_offset + length - 1)
+local nan = 0 / 0
+local out = {}
+for i = 0, stop - start - 1 do
+    local lon = struct.unpack('<d', lons, 8 * i + 1)
+    local lat = struct.unpack('<d', lats, 8 * i + 1)
+    local item
+    if mode == 'count' then
+        local found = redis.call(
+            'GEOSEARCH', KEYS[2], 'FROMLONLAT', lon, lat,
+            'BYRADIUS', radius, 'm')
+        item = struct.pack('<I4', #found)
+    elseif mode == 'presence' then
+        local found = redis.call(
+            'GEOSEARCH', KEYS[2], 'FROMLONLAT', lon, lat,
+            'BYRADIUS', radius, 'm', 'COUNT', 1, 'ANY')
+        item = struct.pack('B', #found)
+    else
+        local found = redis.call(
+            'GEOSEARCH', KEYS[2], 'FROMLONLAT', lon, lat,
+            'BYRADIUS', radius, 'm', 'ASC', 'COUNT', 1, 'WITHDIST')
+        if #found > 0 then
+            item = struct.pack('<d', tonumber(found[1][2]))
+        else
+            item = struct.pack('<d', nan)
+        end
+    end
+    out[#out + 1] = item
+end
+return table.concat(out)
+"""
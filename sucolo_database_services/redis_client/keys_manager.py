@@ -1,5 +1,10 @@
 from redis import Redis
 
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX,
+    GENERATION_SUFFIX,
+)
+
 
 class RedisKeysManager:
     def __init__(
@@ -16,10 +21,60 @@ class RedisKeysManager:
         return city_keys
 
     def delete_city_keys(self, city: str) -> None:
-        city_keys = self.get_city_keys(city)
+        # Data generations outlive the city's data, so that features
+        # cached before a delete aren't served after a new upload.
+        city_keys = [
+            key
+            for key in self.get_city_keys(city)
+            if not key.endswith(GENERATION_SUFFIX)
+        ]
         if len(city_keys) == 0:
             print(f'Warning: no key with "{city}" in name found.')
             return
 
         for key in city_keys:
             self.redis_client.delete(key)
+
+    def delete_data_keys(self, city: str) -> None:
+        """Delete a city's POIs, hexagons and features, if any."""
+        data_keys = self._get_data_keys(city)
+        if len(data_keys) > 0:
+            self.redis_client.delete(*data_keys)
+
+    def replace_city_keys(self, city: str, staging_city: str) -> int:
+        """Swap in the data of a city uploaded under another name.
+
+        Data keys of `staging_city` are renamed to the matching keys of
+        `city` and data keys of `city` without a replacement are deleted,
+        in one transaction, so readers see either the old or the new data.
+        Data generations and cached features are kept.
+
+        Returns:
+            Number of keys swapped in
+        """
+        staging_keys = self._get_data_keys(staging_city)
+        new_keys = {
+            key: city + key[len(staging_city) :] for key in staging_keys
+        }
+        replaced = set(new_keys.values())
+        stale_keys = [
+            key
+            for key in self._get_data_keys(city)
+            if key not in replaced and not key.startswith(staging_city + "_")
+        ]
+        pipeline = self.redis_client.pipeline(transaction=True)
+        for key in stale_keys:
+            pipeline.delete(key)
+        for key, new_key in new_keys.items():
+            pipeline.rename(key, new_key)
+        pipeline.execute()
+        return len(new_keys)
+
+    def _get_data_keys(self, city: str) -> list[str]:
+        """Keys of a city's POIs, hexagons and features."""
+        kept_keys = (city + GENERATION_SUFFIX, city + FEATURE_CACHE_SUFFIX)
+        return [
+            key.decode("utf-8")
+            for key in self.redis_client.scan_iter(match=city + "_*")
+            if not key.decode("utf-8").startswith(kept_keys)
+        ]
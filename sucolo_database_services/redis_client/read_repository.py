@@ -1,18 +1,98 @@
+from typing import Any, Callable, Iterator, cast
+
+import numpy as np
+import numpy.typing as npt
 from redis import Redis
+from redis.client import Pipeline
+
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX,
+    FEATURES_SUFFIX,
+    GENERATION_SUFFIX,
+    HEX_CATALOGUE_SUFFIX,
+    HEX_SUFFIX,
+    POI_CELLS_SUFFIX,
+    POIS_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.hex_features_script import (
+    HEX_FEATURES_SCRIPT,
+    REPLY_DTYPES,
+    HexFeatureMode,
+)
+from sucolo_database_services.redis_client.utils import (
+    check_if_keys_exist,
+    hex_feature_field,
+    parse_hex_feature_field,
+)
+from sucolo_database_services.utils.hex_centers import (
+    HexCenters,
+    HexCentersCache,
+)
 
-from sucolo_database_services.redis_client.consts import HEX_SUFFIX, POIS_SUFFIX
-from sucolo_database_services.redis_client.utils import check_if_keys_exist
+# Maximum number of members passed to one GEOPOS command.
+GEOPOS_CHUNK_SIZE = 10_000
+# Hexagons handled by one call of the hexagon features script, so that a
+# single call doesn't block Redis for too long.
+HEX_FEATURES_CHUNK_SIZE = 10_000
 
 
 class RedisReadRepository:
-    def __init__(self, redis_client: Redis):
+    def __init__(self, redis_client: Redis, pipeline_chunk_size: int = 10_000):
         self.redis_client = redis_client
+        # Maximum number of commands sent in one pipeline.
+        self.pipeline_chunk_size = pipeline_chunk_size
+        self.hex_centers_cache = HexCentersCache()
+        # Last catalogue read per (city, resolution) with the city's data
+        # generation, reused while the generation doesn't change.
+        self._catalogues: dict[tuple[str, int], tuple[int, HexCatalogue]] = {}
+        self._hex_features_script = redis_client.register_script(
+            HEX_FEATURES_SCRIPT
+        )
 
     def key_exists(self, key: str) -> bool:
         """Check if a key exists in Redis."""
         return self.redis_client.exists(key) > 0  # type: ignore[operator]
 
+    def get_generation(self, city: str) -> int:
+        """Data generation of a city, 0 if its data never changed."""
+        generation = self.redis_client.get(city + GENERATION_SUFFIX)
+        return 0 if generation is None else int(generation)  # type: ignore
+
+    def get_cached_features(self, city: str, key: str) -> bytes | None:
+        """Packed feature values cached under a key, if any."""
+        return cast(
+            bytes | None,
+            self.redis_client.get(f"{city}{FEATURE_CACHE_SUFFIX}_{key}"),
+        )
+
+    def get_hex_catalogue(
+        self, city: str, resolution: int
+    ) -> HexCatalogue | None:
+        """Load the packed hexagon catalogue with one GET, if it exists.
+
+        Catalogues are kept per data generation of the city, which is
+        bumped whenever its hexagons are uploaded, so the catalogue is
+        only loaded again after a change.
+        """
+        generation = self.get_generation(city)
+        cached = self._catalogues.get((city, resolution))
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        data = self.redis_client.get(
+            f"{city}_{resolution}{HEX_CATALOGUE_SUFFIX}"
+        )
+        if data is None:
+            return None
+        catalogue = HexCatalogue.from_bytes(data)  # type: ignore[arg-type]
+        self._catalogues[(city, resolution)] = (generation, catalogue)
+        return catalogue
+
     def get_hexagons(self, city: str, resolution: int) -> list[str]:
+        catalogue = self.get_hex_catalogue(city=city, resolution=resolution)
+        if catalogue is not None:
+            return catalogue.hex_ids
+        # Cities uploaded before the catalogue existed
         hex_ids = [
             hex_id.decode("utf-8")
             for hex_id in self.redis_client.zrange(  # type: ignore[union-attr]
@@ -21,6 +101,73 @@ class RedisReadRepository:
         ]
         return hex_ids
 
+    def get_hex_centers(self, city: str, resolution: int) -> HexCenters:
+        """Get hexagon ids and centers, from the catalogue if possible."""
+        catalogue = self.get_hex_catalogue(city=city, resolution=resolution)
+        if catalogue is None:
+            check_if_keys_exist(
+                client=self.redis_client,
+                keys=f"{city}_{resolution}{HEX_SUFFIX}",
+            )
+            hex_ids = self.get_hexagons(city=city, resolution=resolution)
+        else:
+            hex_ids = catalogue.hex_ids
+            if catalogue.lon is not None and catalogue.lat is not None:
+                return HexCenters(hex_ids, catalogue.lon, catalogue.lat)
+        # Centers are derived from the H3 ids, no GEOPOS round trips.
+        return self.hex_centers_cache.get(
+            city=city, resolution=resolution, hex_ids=hex_ids
+        )
+
+    def get_poi_coordinates(
+        self, city: str, amenity: str
+    ) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+        """Get (lon, lat) arrays of all POIs of an amenity.
+
+        Coordinates are read back with GEOPOS, so they carry the same
+        geohash precision Redis uses in GEORADIUS.
+        """
+        pois_key = city + "_" + amenity + POIS_SUFFIX
+        check_if_keys_exist(client=self.redis_client, keys=pois_key)
+        members = cast(list[bytes], self.redis_client.zrange(pois_key, 0, -1))
+        starts = range(0, len(members), GEOPOS_CHUNK_SIZE)
+        positions = [
+            position
+            for chunk in self._iter_replies(
+                n_commands=len(starts),
+                add_command=lambda pipeline, i: pipeline.geopos(
+                    pois_key,
+                    *members[starts[i] : starts[i] + GEOPOS_CHUNK_SIZE],
+                ),
+            )
+            for position in chunk
+            if position is not None
+        ]
+        lon_lat = np.array(positions, dtype=np.float64).reshape(-1, 2)
+        return lon_lat[:, 0].copy(), lon_lat[:, 1].copy()
+
+    def get_poi_cells(
+        self, city: str, amenity: str
+    ) -> tuple[list[str], npt.NDArray[np.int64]] | None:
+        """Get the H3 cells of an amenity's POIs with their POI counts.
+
+        Returns:
+            Cells and aligned counts, None if the amenity has no POI cells
+        """
+        cell_counts = cast(
+            dict[bytes, bytes],
+            self.redis_client.hgetall(city + "_" + amenity + POI_CELLS_SUFFIX),
+        )
+        if len(cell_counts) == 0:
+            return None
+        cells = [cell.decode("utf-8") for cell in cell_counts]
+        counts = np.fromiter(
+            (int(count) for count in cell_counts.values()),
+            dtype=np.int64,
+            count=len(cell_counts),
+        )
+        return cells, counts
+
     def count_records_per_key(self, city: str) -> dict[str, int]:
         result = {}
         for key in self.redis_client.keys("*"):  # type: ignore[union-attr]
@@ -36,71 +183,314 @@ class RedisReadRepository:
         radius: int = 300,
         count: int | None = 1,
     ) -> dict[str, list[float]]:
-        hex_key = f"{city}_{resolution}{HEX_SUFFIX}"
         pois_key = city + "_" + amenity + POIS_SUFFIX
-        check_if_keys_exist(client=self.redis_client, keys=[hex_key, pois_key])
-
-        hex_ids = self.redis_client.zrange(hex_key, 0, -1)
-        hex_centers = self._get_hex_centers(
-            hex_key=hex_key,
-            hex_ids=hex_ids,  # type: ignore[arg-type]
-        )
-        nearest_pois = self._get_nearest_pois(
-            hex_centers=hex_centers,
+        check_if_keys_exist(client=self.redis_client, keys=pois_key)
+        hex_centers = self.get_hex_centers(city=city, resolution=resolution)
+        offsets, distances = self._get_nearest_distances(
+            lon=hex_centers.lon,
+            lat=hex_centers.lat,
             pois_key=pois_key,
             radius=radius,
             count=count,
         )
         processed_pois = self._pois_postprocessing(
-            nearest_pois=nearest_pois,
-            hex_ids=hex_ids,  # type: ignore[arg-type]
+            offsets=offsets,
+            distances=distances,
+            hex_ids=hex_centers.hex_ids,
         )
 
         return processed_pois
 
-    def _get_hex_centers(
-        self, hex_key: str, hex_ids: list[str]
-    ) -> list[list[tuple[float, float]]]:
-        pipeline = self.redis_client.pipeline()
-        for hex_id in hex_ids:
-            pipeline.geopos(hex_key, hex_id)
-        hex_centers = pipeline.execute()
-        return hex_centers
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Distances to the POIs within radius of arbitrary points.
+
+        GEORADIUS replies are streamed in pipelines of at most
+        `pipeline_chunk_size` commands, so no temporary key is needed and
+        replies are never buffered for all points at once.
+
+        Returns:
+            (offsets, distances) in CSR layout: the distances of point i,
+            sorted ascending, are distances[offsets[i]:offsets[i + 1]]
+        """
+        pois_key = city + "_" + amenity + POIS_SUFFIX
+        check_if_keys_exist(client=self.redis_client, keys=pois_key)
+        return self._get_nearest_distances(
+            lon=np.asarray(lon, dtype=np.float64),
+            lat=np.asarray(lat, dtype=np.float64),
+            pois_key=pois_key,
+            radius=radius,
+            count=count,
+        )
+
+    def find_presence_near_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+    ) -> dict[str, int]:
+        """Check for every hexagon if any POI is within the radius.
+
+        Uses GEOSEARCH with COUNT 1 ANY: Redis stops at the first match,
+        doesn't sort, and replies with at most one member per hexagon.
+
+        Returns:
+            Dictionary mapping hex_id to 1 if a POI is present, 0 if not
+        """
+        pois_key = city + "_" + amenity + POIS_SUFFIX
+        check_if_keys_exist(client=self.redis_client, keys=pois_key)
+        hex_centers = self.get_hex_centers(city=city, resolution=resolution)
+        lon, lat = hex_centers.lon.tolist(), hex_centers.lat.tolist()
+        presence = np.fromiter(
+            (
+                len(found) > 0
+                for found in self._iter_replies(
+                    n_commands=len(lon),
+                    add_command=lambda pipeline, i: pipeline.geosearch(
+                        name=pois_key,
+                        longitude=lon[i],
+                        latitude=lat[i],
+                        radius=radius,
+                        unit="m",
+                        count=1,
+                        any=True,
+                    ),
+                )
+            ),
+            dtype=np.uint8,
+            count=len(lon),
+        )
+        return dict(zip(hex_centers.hex_ids, presence.tolist()))
+
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        mode: HexFeatureMode,
+    ) -> tuple[list[str], npt.NDArray[Any]] | None:
+        """Compute a feature of all hexagons inside Redis.
+
+        Runs HEX_FEATURES_SCRIPT over chunks of the hexagon catalogue in
+        pipelines (not transactions), so the reply is a packed array
+        instead of the POIs of every hexagon.
+
+        Returns:
+            Hexagon ids and values aligned with them (see REPLY_DTYPES),
+            or None if the city has no hexagon catalogue with centers
+        """
+        pois_key = city + "_" + amenity + POIS_SUFFIX
+        check_if_keys_exist(client=self.redis_client, keys=pois_key)
+        catalogue = self.get_hex_catalogue(city=city, resolution=resolution)
+        if catalogue is None or catalogue.lon is None:
+            return None
+
+        catalogue_key = f"{city}_{resolution}{HEX_CATALOGUE_SUFFIX}"
+        starts = range(0, len(catalogue), HEX_FEATURES_CHUNK_SIZE)
+
+        def add_chunk(pipeline: Pipeline, i: int) -> None:
+            stop = min(starts[i] + HEX_FEATURES_CHUNK_SIZE, len(catalogue))
+            self._hex_features_script(
+                keys=[catalogue_key, pois_key],
+                args=[radius, mode, starts[i], stop],
+                client=pipeline,
+            )
+
+        replies = self._iter_replies(
+            n_commands=len(starts), add_command=add_chunk
+        )
+        values = np.frombuffer(b"".join(replies), dtype=REPLY_DTYPES[mode])
+        if len(values) != len(catalogue):
+            raise ValueError("Hexagon catalogue changed during the query.")
+        return catalogue.hex_ids, values
+
+    def get_hex_feature(
+        self,
+        city: str,
+        resolution: int,
+        amenity: str,
+        radius: int,
+        kind: HexFeatureMode,
+    ) -> tuple[list[str], npt.NDArray[Any]] | None:
+        """Load a materialized feature of all hexagons.
+
+        Returns:
+            Hexagon ids and values aligned with them (see REPLY_DTYPES),
+            or None if the feature isn't materialized or is out of date
+            with the hexagon catalogue
+        """
+        data = self.redis_client.hget(
+            f"{city}_{resolution}{FEATURES_SUFFIX}",
+            hex_feature_field(amenity=amenity, radius=radius, kind=kind),
+        )
+        if data is None:
+            return None
+        catalogue = self.get_hex_catalogue(city=city, resolution=resolution)
+        values = np.frombuffer(
+            data, dtype=REPLY_DTYPES[kind]  # type: ignore[call-overload]
+        )
+        if catalogue is None or len(values) != len(catalogue):
+            return None
+        return catalogue.hex_ids, values
+
+    def get_materialized_features(
+        self, city: str
+    ) -> dict[int, list[tuple[str, int, HexFeatureMode]]]:
+        """List the materialized features of a city.
+
+        Returns:
+            Dictionary mapping resolution to (amenity, radius, kind) of
+            its stored features
+        """
+        prefix = city + "_"
+        features: dict[int, list[tuple[str, int, HexFeatureMode]]] = {}
+        for key in self.redis_client.scan_iter(
+            match=f"{city}_*{FEATURES_SUFFIX}"
+        ):
+            resolution = key.decode("utf-8")[
+                len(prefix) : -len(FEATURES_SUFFIX)
+            ]
+            if not resolution.isdigit():
+                continue
+            features[int(resolution)] = [
+                parse_hex_feature_field(field.decode("utf-8"))
+                for field in self.redis_client.hkeys(key)  # type: ignore
+            ]
+        return features
+
+    def compute_feature_at_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int,
+        kind: HexFeatureMode,
+    ) -> npt.NDArray[Any]:
+        """Compute a feature at arbitrary points with GEORADIUS.
+
+        A missing POIs key is treated as an amenity without POIs.
+
+        Returns:
+            Values aligned with the points, packed as REPLY_DTYPES
+        """
+        nearest_pois = self._get_nearest_pois(
+            lon=lon,
+            lat=lat,
+            pois_key=city + "_" + amenity + POIS_SUFFIX,
+            radius=radius,
+            count=None if kind == "count" else 1,
+        )
+        if kind == "nearest":
+            return np.fromiter(
+                (pois[0][1] if pois else np.nan for pois in nearest_pois),
+                dtype=REPLY_DTYPES[kind],
+                count=len(lon),
+            )
+        return np.fromiter(
+            (len(pois) for pois in nearest_pois),
+            dtype=REPLY_DTYPES[kind],
+            count=len(lon),
+        )
+
+    def _iter_replies(
+        self,
+        n_commands: int,
+        add_command: Callable[[Pipeline, int], Any],
+    ) -> Iterator[Any]:
+        """Run commands in pipelines of at most `pipeline_chunk_size`.
+
+        Replies are yielded chunk by chunk, so only one chunk of commands
+        and replies is buffered at a time. Pipelines aren't transactions,
+        Redis serves other clients between the chunks.
+
+        Args:
+            n_commands: Number of commands
+            add_command: Adds the i-th command to a pipeline
+        """
+        for start in range(0, n_commands, self.pipeline_chunk_size):
+            pipeline = self.redis_client.pipeline(transaction=False)
+            for i in range(
+                start, min(start + self.pipeline_chunk_size, n_commands)
+            ):
+                add_command(pipeline, i)
+            yield from pipeline.execute()
 
     def _get_nearest_pois(
         self,
-        hex_centers: list[list[tuple[float, float]]],
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
         pois_key: str,
         radius: int,
         count: int | None = 1,
-    ) -> list[list[tuple[bytes, float]]]:
-        pipeline = self.redis_client.pipeline()
-        for lon_lat in hex_centers:
-            lon, lat = lon_lat[0]
-            pipeline.georadius(
+    ) -> Iterator[list[tuple[bytes, float]]]:
+        """Stream the GEORADIUS replies of every point."""
+        lon_list, lat_list = lon.tolist(), lat.tolist()
+        return self._iter_replies(
+            n_commands=len(lon_list),
+            add_command=lambda pipeline, i: pipeline.georadius(
                 name=pois_key,
-                longitude=lon,
-                latitude=lat,
+                longitude=lon_list[i],
+                latitude=lat_list[i],
                 radius=radius,
                 unit="m",
                 withdist=True,
                 count=count,
                 sort="ASC",
+            ),
+        )
+
+    def _get_nearest_distances(
+        self,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        pois_key: str,
+        radius: int,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Fill CSR offsets and distances directly from GEORADIUS replies.
+
+        The distances array is preallocated for `count` POIs per point,
+        or one without a count, and doubled when it's full.
+        """
+        offsets = np.zeros(len(lon) + 1, dtype=np.int64)
+        distances = np.empty(len(lon) * (count or 1), dtype=np.float64)
+        end = 0
+        for i, pois in enumerate(
+            self._get_nearest_pois(
+                lon=lon, lat=lat, pois_key=pois_key, radius=radius, count=count
             )
-        nearest_pois = pipeline.execute()
-        return nearest_pois
+        ):
+            if end + len(pois) > len(distances):
+                grown = np.empty(
+                    max(2 * len(distances), end + len(pois)), dtype=np.float64
+                )
+                grown[:end] = distances[:end]
+                distances = grown
+            for _, distance in pois:
+                distances[end] = distance
+                end += 1
+            offsets[i + 1] = end
+        return offsets, distances[:end]
 
     def _pois_postprocessing(
         self,
-        nearest_pois: list[list[tuple[bytes, float]]],
-        hex_ids: list[bytes],
+        offsets: npt.NDArray[np.int64],
+        distances: npt.NDArray[np.float64],
+        hex_ids: list[str],
     ) -> dict[str, list[float]]:
-        data = {
-            hex_id.decode("utf-8"): [
-                # poi_id.decode("utf-8"): distance
-                distance
-                for _, distance in hex_pois_distances
-            ]
-            for hex_id, hex_pois_distances in zip(hex_ids, nearest_pois)
+        bounds = offsets.tolist()
+        distance_list = distances.tolist()
+        return {
+            hex_id: distance_list[bounds[i] : bounds[i + 1]]
+            for i, hex_id in enumerate(hex_ids)
         }
-        return data
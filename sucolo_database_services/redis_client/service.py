@@ -13,6 +13,8 @@ class RedisService:
     def __init__(
         self,
         redis_client: Redis,
+        geoadd_chunk_size: int = 10_000,
+        pipeline_chunk_size: int = 10_000,
     ) -> None:
         self._redis_client = redis_client
 
@@ -21,9 +23,11 @@ class RedisService:
         )
         self.read = RedisReadRepository(
             redis_client=self._redis_client,
+            pipeline_chunk_size=pipeline_chunk_size,
         )
         self.write = RedisWriteRepository(
             redis_client=self._redis_client,
+            geoadd_chunk_size=geoadd_chunk_size,
         )
 
     def check_health(self) -> bool:
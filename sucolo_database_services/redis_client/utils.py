@@ -1,5 +1,12 @@
+from typing import cast
+
 from redis import Redis
 
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES,
+    HexFeatureMode,
+)
+
 
 class RedisKeyNotFoundError(Exception):
     """Exception raised when a Redis key is not found."""
@@ -12,3 +19,16 @@ def check_if_keys_exist(client: Redis, keys: str | list[str]) -> None:
     not_found_keys = list(filter(lambda key: not client.exists(key), keys))
     if len(not_found_keys) > 0:
         raise RedisKeyNotFoundError(f"Keys {not_found_keys} not found.")
+
+
+def hex_feature_field(amenity: str, radius: int, kind: str) -> str:
+    """Field of a materialized feature in the features hash."""
+    return f"{amenity}:{radius}:{kind}"
+
+
+def parse_hex_feature_field(field: str) -> tuple[str, int, HexFeatureMode]:
+    """(amenity, radius, kind) of a field of the features hash."""
+    amenity, radius, kind = field.rsplit(":", 2)
+    if kind not in REPLY_DTYPES:
+        raise ValueError(f'Unknown feature kind "{kind}".')
+    return amenity, int(radius), cast(HexFeatureMode, kind)
@@ -1,14 +1,42 @@
+from typing import Any, cast
+
 import geopandas as gpd
+import h3
+import numpy as np
+import numpy.typing as npt
 from redis import Redis
 from redis.typing import ResponseT
 
-from sucolo_database_services.redis_client.consts import HEX_SUFFIX, POIS_SUFFIX
+from sucolo_database_services.redis_client.consts import (
+    FEATURE_CACHE_SUFFIX,
+    FEATURES_SUFFIX,
+    GENERATION_SUFFIX,
+    HEX_CATALOGUE_SUFFIX,
+    HEX_SUFFIX,
+    POI_CELL_RESOLUTION_SUFFIX,
+    POI_CELLS_SUFFIX,
+    POIS_SUFFIX,
+    WHEELCHAIR_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES,
+    HexFeatureMode,
+)
+from sucolo_database_services.redis_client.utils import hex_feature_field
+from sucolo_database_services.utils.poi_cells import count_pois_per_cell
 from sucolo_database_services.utils.polygons2hexagons import polygons2hexagons
 
 
 class RedisWriteRepository:
-    def __init__(self, redis_client: Redis) -> None:
+    def __init__(
+        self,
+        redis_client: Redis,
+        geoadd_chunk_size: int = 10_000,
+    ) -> None:
         self.redis_client = redis_client
+        # Maximum number of members added by one GEOADD command.
+        self.geoadd_chunk_size = geoadd_chunk_size
 
     def upload_pois_by_amenity_key(
         self,
@@ -17,50 +45,249 @@ class RedisWriteRepository:
         only_wheelchair_accessible: bool = False,
         wheelchair_positive_values: list[str] = ["yes"],
     ) -> list[int]:
+        """Upload POIs into one GEO set per amenity.
+
+        POIs are grouped by amenity once and coordinates are taken from the
+        geometry column as arrays, then added with multi-member GEOADDs of
+        at most `geoadd_chunk_size` POIs. Amenities that already have
+        a key are skipped.
+
+        Returns:
+            Number of POIs added by every GEOADD command
+        """
         _check_dataframe(pois)
         wheelchair_suffix = ""
         if only_wheelchair_accessible:
             assert "wheelchair" in pois.columns, 'No column "wheelchair" found.'
             pois = pois[pois["wheelchair"].isin(wheelchair_positive_values)]
-            wheelchair_suffix = "_wheelchair"
-
-        pipe = self.redis_client.pipeline()
+            wheelchair_suffix = WHEELCHAIR_SUFFIX
 
+        responses = []
         # Upload pois for each amenity separately
-        for amenity in pois["amenity"].unique():
-            key_name = city + "_" + amenity + wheelchair_suffix + POIS_SUFFIX
+        for amenity, amenity_pois in pois.groupby("amenity", sort=False):
+            key_name = (
+                city + "_" + str(amenity) + wheelchair_suffix + POIS_SUFFIX
+            )
             if self.redis_client.exists(key_name):
                 continue
-            pois[pois["amenity"] == amenity].apply(
-                lambda row: pipe.geoadd(
-                    key_name,
-                    [row["geometry"].x, row["geometry"].y, row.name],
-                ),
-                axis=1,
+            values = np.empty((len(amenity_pois), 3), dtype=object)
+            values[:, 0] = amenity_pois["geometry"].x.to_numpy()
+            values[:, 1] = amenity_pois["geometry"].y.to_numpy()
+            values[:, 2] = amenity_pois.index.astype(str).to_numpy()
+            for start in range(0, len(values), self.geoadd_chunk_size):
+                chunk = values[start : start + self.geoadd_chunk_size]
+                responses.append(
+                    self.redis_client.geoadd(key_name, chunk.ravel().tolist())
+                )
+
+        return responses  # type: ignore[return-value]
+
+    def upload_poi_cells(
+        self,
+        city: str,
+        pois: gpd.GeoDataFrame,
+        resolution: int,
+        only_wheelchair_accessible: bool = False,
+        wheelchair_positive_values: list[str] = ["yes"],
+    ) -> list[int]:
+        """Upload the number of POIs per H3 cell of every amenity.
+
+        Each amenity gets a hash mapping its cells of the given resolution
+        to their POI counts, used for approximate counts. Amenities that
+        already have a key are skipped. The resolution is stored once per
+        city, all amenities of a city share it.
+
+        Returns:
+            Number of cells of every uploaded amenity
+        """
+        _check_dataframe(pois)
+        stored_resolution = self._get_poi_cell_resolution(city)
+        if stored_resolution not in (None, resolution):
+            raise ValueError(
+                f'POI cells of city "{city}" already have resolution '
+                f"{stored_resolution}, not {resolution}."
             )
+        self.redis_client.set(city + POI_CELL_RESOLUTION_SUFFIX, resolution)
+        wheelchair_suffix = ""
+        if only_wheelchair_accessible:
+            assert "wheelchair" in pois.columns, 'No column "wheelchair" found.'
+            pois = pois[pois["wheelchair"].isin(wheelchair_positive_values)]
+            wheelchair_suffix = WHEELCHAIR_SUFFIX
 
-        if len(pipe.command_stack) == 0:
-            return []
-        responses = pipe.execute()
+        responses = []
+        for amenity, amenity_pois in pois.groupby("amenity", sort=False):
+            key_name = (
+                city + "_" + str(amenity) + wheelchair_suffix + POI_CELLS_SUFFIX
+            )
+            if self.redis_client.exists(key_name):
+                continue
+            cell_counts = count_pois_per_cell(
+                lon=amenity_pois["geometry"].x.to_numpy(),
+                lat=amenity_pois["geometry"].y.to_numpy(),
+                resolution=resolution,
+            )
+            self.redis_client.hset(key_name, mapping=cell_counts)
+            responses.append(len(cell_counts))
         return responses
 
+    def update_poi_cells(
+        self,
+        city: str,
+        amenity: str,
+        removed: tuple[float, float] | None = None,
+        added: tuple[float, float] | None = None,
+    ) -> None:
+        """Move a POI between the cells of an amenity's POI cell counts.
+
+        Does nothing if the city has no POI cells.
+        """
+        resolution = self._get_poi_cell_resolution(city)
+        if resolution is None:
+            return
+        key_name = city + "_" + amenity + POI_CELLS_SUFFIX
+        pipeline = self.redis_client.pipeline()
+        for position, increment in [(removed, -1), (added, 1)]:
+            if position is not None:
+                pipeline.hincrby(
+                    key_name,
+                    h3.latlng_to_cell(position[0], position[1], resolution),
+                    increment,
+                )
+        pipeline.execute()
+
+    def _get_poi_cell_resolution(self, city: str) -> int | None:
+        resolution = cast(
+            bytes | None,
+            self.redis_client.get(city + POI_CELL_RESOLUTION_SUFFIX),
+        )
+        return None if resolution is None else int(resolution)
+
     def upload_hex_centers(
         self, city: str, districts: gpd.GeoDataFrame, resolution: int = 9
     ) -> ResponseT | bool:
+        """Upload hexagon centers into a GEO set and a packed catalogue.
+
+        The catalogue (see `HexCatalogue`) holds the hexagon ids and
+        centers as one binary string, so that the list of hexagons can be
+        loaded with a single GET. Each of the two keys is only written
+        if it doesn't exist yet.
+
+        Returns:
+            False if both keys already exist, otherwise the number of
+            hexagons added to the GEO set
+        """
         key_name = f"{city}_{resolution}{HEX_SUFFIX}"
-        if self.redis_client.exists(key_name):
+        catalogue_key = f"{city}_{resolution}{HEX_CATALOGUE_SUFFIX}"
+        geo_set_exists = self.redis_client.exists(key_name)
+        catalogue_exists = self.redis_client.exists(catalogue_key)
+        if geo_set_exists and catalogue_exists:
             return False
         hex_centers = polygons2hexagons(districts, resolution=resolution)
         assert len(hex_centers) > 0, "No hexagons were returned."
 
-        values: list[float | str] = []
+        centers: dict[str, tuple[float, float]] = {}
         for _, district_hex_centers in hex_centers.items():
             for hex_id, hex_center in district_hex_centers:
-                values += [hex_center.x, hex_center.y, hex_id]
+                centers[hex_id] = (hex_center.x, hex_center.y)
+        hex_ids = list(centers)
+        lon_lat = np.array(list(centers.values()), dtype=np.float64)
 
-        response = self.redis_client.geoadd(key_name, values)
+        response = 0
+        if not geo_set_exists:
+            values = np.empty((len(hex_ids), 3), dtype=object)
+            values[:, :2] = lon_lat
+            values[:, 2] = hex_ids
+            for start in range(0, len(values), self.geoadd_chunk_size):
+                chunk = values[start : start + self.geoadd_chunk_size]
+                response += self.redis_client.geoadd(  # type: ignore[operator]
+                    key_name, chunk.ravel().tolist()
+                )
+        if not catalogue_exists:
+            catalogue = HexCatalogue.from_hex_ids(
+                hex_ids, lon=lon_lat[:, 0], lat=lon_lat[:, 1]
+            )
+            self.redis_client.set(catalogue_key, catalogue.to_bytes())
         return response
 
+    def upload_hex_feature(
+        self,
+        city: str,
+        resolution: int,
+        amenity: str,
+        radius: int,
+        kind: HexFeatureMode,
+        values: npt.NDArray[Any],
+    ) -> None:
+        """Store a materialized feature of all hexagons.
+
+        Values must be aligned with the hexagon catalogue and are packed
+        the same way as the replies of the hexagon features script.
+        """
+        key_name = f"{city}_{resolution}{FEATURES_SUFFIX}"
+        field = hex_feature_field(amenity=amenity, radius=radius, kind=kind)
+        packed = np.asarray(values).astype(REPLY_DTYPES[kind]).tobytes()
+        self.redis_client.hset(key_name, field, packed)  # type: ignore
+
+    def upsert_poi(
+        self,
+        city: str,
+        amenity: str,
+        poi_id: str,
+        lon: float,
+        lat: float,
+    ) -> tuple[float, float] | None:
+        """Add a POI to the GEO set of its amenity, or move it.
+
+        Returns:
+            Previous (lon, lat) of the POI, None if it was added
+        """
+        key_name = city + "_" + amenity + POIS_SUFFIX
+        pipeline = self.redis_client.pipeline()
+        pipeline.geopos(key_name, poi_id)
+        pipeline.geoadd(key_name, [lon, lat, poi_id])
+        positions, _ = pipeline.execute()
+        return _first_position(positions)
+
+    def delete_poi(
+        self, city: str, amenity: str, poi_id: str
+    ) -> tuple[float, float] | None:
+        """Remove a POI from the GEO set of its amenity.
+
+        Returns:
+            Previous (lon, lat) of the POI, None if it didn't exist
+        """
+        key_name = city + "_" + amenity + POIS_SUFFIX
+        pipeline = self.redis_client.pipeline()
+        pipeline.geopos(key_name, poi_id)
+        pipeline.zrem(key_name, poi_id)
+        positions, _ = pipeline.execute()
+        return _first_position(positions)
+
+    def bump_generation(self, city: str) -> int:
+        """Mark the data of a city as changed.
+
+        Returns:
+            New data generation of the city
+        """
+        return cast(int, self.redis_client.incr(city + GENERATION_SUFFIX))
+
+    def cache_features(
+        self, city: str, key: str, data: bytes, ttl: int | None = None
+    ) -> None:
+        """Cache packed feature values under a key, for ttl seconds."""
+        self.redis_client.set(
+            f"{city}{FEATURE_CACHE_SUFFIX}_{key}", data, ex=ttl
+        )
+
+
+def _first_position(
+    positions: list[tuple[float, float] | None],
+) -> tuple[float, float] | None:
+    if len(positions) == 0 or positions[0] is None:
+        return None
+    lon, lat = positions[0]
+    return float(lon), float(lat)
+
 
 def _check_dataframe(gdf: gpd.GeoDataFrame) -> None:
     if "amenity" not in gdf.columns:
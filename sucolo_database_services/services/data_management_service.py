@@ -2,18 +2,58 @@ from pathlib import Path
 from typing import Any
 
 import geopandas as gpd
+import h3
+import numpy as np
+import numpy.typing as npt
 
 from sucolo_database_services.elasticsearch_client.index_manager import (
     IndexExistsError,
     default_mapping,
 )
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkIngestResult,
+)
+from sucolo_database_services.redis_client.consts import (
+    STAGING_SUFFIX,
+    WHEELCHAIR_SUFFIX,
+)
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.utils import RedisKeyNotFoundError
 from sucolo_database_services.services.base_service import (
     BaseService,
     BaseServiceDependencies,
 )
+from sucolo_database_services.services.fields_and_queries import (
+    MaterializedFeature,
+)
+from sucolo_database_services.services.spatial_engines import (
+    LocalSpatialEngine,
+    SpatialEngine,
+)
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers,
+    hexagons_near_point,
+)
+from sucolo_database_services.utils.point_index import haversine_distances
+
+# Margin in meters on the radius of a changed POI, POIs are stored at
+# the precision of their geohash.
+_UPDATE_RADIUS_MARGIN = 1.0
 
 
-class _Upload(BaseService):
+class _Base(BaseService):
+    # Engine of the dynamic features service, its cached POIs are
+    # dropped when the city's data changes.
+    spatial_engine: SpatialEngine | None = None
+
+    def _data_changed(self, city: str) -> None:
+        """Mark the city's cached features and POI indices out of date."""
+        self._redis_service.write.bump_generation(city)
+        if self.spatial_engine is not None:
+            self.spatial_engine.invalidate(city=city)
+
+
+class _Upload(_Base):
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
@@ -28,8 +68,28 @@ class _Upload(BaseService):
         hex_resolutions: int | list[int] = 9,
         ignore_if_index_exists: bool = True,
         es_index_mapping: dict[str, Any] = default_mapping,
+        replace_if_index_exists: bool = False,
+        materialized_features: list[MaterializedFeature] = [],
+        poi_cell_resolution: int | None = None,
     ) -> None:
-        """Upload complete city data including POIs, districts, and hexagons."""
+        """Upload complete city data including POIs, districts, and hexagons.
+
+        Elasticsearch data is loaded into a new index version
+        ("<city>__v<N>") and published under the "<city>" alias once
+        complete, so readers never see a partially loaded index.
+
+        Args:
+            ignore_if_index_exists: Skip the Elasticsearch upload (instead
+                of raising IndexExistsError) if the city already exists.
+            replace_if_index_exists: Build a new version of an existing
+                city and swap it in, replacing the current one. This
+                also replaces the city's Redis data.
+            materialized_features: Dynamic features to precompute for every
+                hex resolution, see `materialize_features`.
+            poi_cell_resolution: Resolution of the H3 cells to count POIs
+                in for approximate counts (at least the finest hex
+                resolution), no POI cells are uploaded if None.
+        """
         if isinstance(hex_resolutions, int):
             hex_resolutions = [hex_resolutions]
         if len(hex_resolutions) == 0:
@@ -45,6 +105,7 @@ class _Upload(BaseService):
                 district_gdf=district_gdf,
                 hex_resolutions=hex_resolutions,
                 es_index_mapping=es_index_mapping,
+                replace_if_index_exists=replace_if_index_exists,
             )
         except IndexExistsError as e:
             if ignore_if_index_exists:
@@ -64,18 +125,83 @@ class _Upload(BaseService):
             raise e
 
         try:
+            # A replaced city is uploaded under another name and swapped
+            # in once complete, existing keys are kept otherwise.
+            redis_city = city
+            if replace_if_index_exists:
+                redis_city = city + STAGING_SUFFIX
+                self._redis_service.keys_manager.delete_data_keys(redis_city)
+                self._redis_service.write.bump_generation(redis_city)
             self._upload_city_data_redis(
-                city=city,
+                city=redis_city,
                 pois_gdf=pois_gdf,
                 district_gdf=district_gdf,
                 hex_resolutions=hex_resolutions,
+                poi_cell_resolution=poi_cell_resolution,
+            )
+            self.materialize_features(
+                city=redis_city,
+                hex_resolutions=hex_resolutions,
+                features=materialized_features,
             )
+            if redis_city != city:
+                self._redis_service.keys_manager.replace_city_keys(
+                    city=city, staging_city=redis_city
+                )
+                self._logger.info(f'Redis data for city "{city}" replaced.')
+            self._data_changed(city)
         except Exception as e:
             self._logger.error(
                 f"Error uploading city data for {city}: " f"{str(e)}"
             )
             raise e
 
+    def materialize_features(
+        self,
+        city: str,
+        hex_resolutions: int | list[int],
+        features: list[MaterializedFeature],
+    ) -> None:
+        """Precompute dynamic features of all hexagons and store them.
+
+        Values are computed from the city's Redis data and stored per
+        (resolution, amenity, radius, kind) next to the hexagons, from
+        where `DynamicFeaturesService` serves matching queries. Features
+        of amenities without POIs in the city are skipped.
+        """
+        if isinstance(hex_resolutions, int):
+            hex_resolutions = [hex_resolutions]
+        # POIs of an amenity are loaded once for all resolutions and radii
+        engine = LocalSpatialEngine(self._redis_service)
+        for hex_resolution in hex_resolutions:
+            for feature in features:
+                try:
+                    hex_ids, values = engine.compute_hex_feature(
+                        city=city,
+                        amenity=feature.amenity,
+                        resolution=hex_resolution,
+                        radius=feature.radius,
+                        kind=feature.kind,
+                    )
+                except RedisKeyNotFoundError as e:
+                    self._logger.warning(
+                        f"Feature {feature} not materialized: {str(e)}"
+                    )
+                    continue
+                self._redis_service.write.upload_hex_feature(
+                    city=city,
+                    resolution=hex_resolution,
+                    amenity=feature.amenity,
+                    radius=feature.radius,
+                    kind=feature.kind,
+                    values=values,
+                )
+        if len(features) > 0:
+            self._logger.info(
+                f"{len(features)} features materialized in redis "
+                f"for resolutions {hex_resolutions}."
+            )
+
     def _upload_city_data_elasticsearch(
         self,
         city: str,
@@ -83,35 +209,80 @@ class _Upload(BaseService):
         district_gdf: gpd.GeoDataFrame,
         hex_resolutions: list[int],
         es_index_mapping: dict[str, Any],
+        replace_if_index_exists: bool = False,
     ) -> None:
         """Upload city data to Elasticsearch
         (index, POIs, districts, hexagons)."""
-        self._logger.info(f'Creating index "{city}" in elasticsearch.')
-        self._es_service.index_manager.create_index(
-            index_name=city,
+        index_manager = self._es_service.index_manager
+        if index_manager.index_exists(city) and not replace_if_index_exists:
+            raise IndexExistsError(f'Index "{city}" already exists.')
+
+        index_name = index_manager.create_versioned_index(
+            alias=city,
+            mapping=es_index_mapping,
+        )
+        self._logger.info(f'Index "{index_name}" created in elasticsearch.')
+        try:
+            self._upload_index_data_elasticsearch(
+                index_name=index_name,
+                pois_gdf=pois_gdf,
+                district_gdf=district_gdf,
+                hex_resolutions=hex_resolutions,
+            )
+        except Exception:
+            index_manager.delete_index(index_name)
+            raise
+
+        index_manager.publish_version(
+            alias=city,
+            index_name=index_name,
             mapping=es_index_mapping,
         )
-        self._logger.info(f'Index "{city}" created in elasticsearch.')
+        self._logger.info(f'Index "{index_name}" published as "{city}".')
+        stale_indices = index_manager.delete_stale_versions(alias=city)
+        if len(stale_indices) > 0:
+            self._logger.info(f"Stale indices {stale_indices} deleted.")
 
+    def _upload_index_data_elasticsearch(
+        self,
+        index_name: str,
+        pois_gdf: gpd.GeoDataFrame,
+        district_gdf: gpd.GeoDataFrame,
+        hex_resolutions: list[int],
+    ) -> None:
+        """Upload POIs, districts and hexagons to an existing index."""
         self._logger.info("Uploading POIs to elasticsearch.")
-        self._es_service.write.upload_pois(index_name=city, gdf=pois_gdf)
-        self._logger.info("PoIs uploaded to elasticsearch.")
+        result = self._es_service.write.upload_pois(
+            index_name=index_name, gdf=pois_gdf
+        )
+        self._log_bulk_result(result, "PoIs")
         self._logger.info("Uploading districts to elasticsearch.")
-        self._es_service.write.upload_districts(
-            index_name=city, gdf=district_gdf
+        result = self._es_service.write.upload_districts(
+            index_name=index_name, gdf=district_gdf
         )
-        self._logger.info("Districts uploaded to elasticsearch.")
+        self._log_bulk_result(result, "Districts")
         for hex_resolution in hex_resolutions:
             self._logger.info(
                 "Uploading hexagons to elasticsearch "
                 f"with resolution {hex_resolution}."
             )
-            self._es_service.write.upload_hex_centers(
-                index_name=city,
+            result = self._es_service.write.upload_hex_centers(
+                index_name=index_name,
                 districts=district_gdf,
                 hex_resolution=hex_resolution,
             )
-        self._logger.info("Hexagons uploaded to elasticsearch.")
+            self._log_bulk_result(result, "Hexagons")
+
+    def _log_bulk_result(self, result: BulkIngestResult, name: str) -> None:
+        self._logger.info(
+            f"{result.docs_indexed} {name} uploaded to elasticsearch "
+            f"in {result.seconds:.1f}s ({result.docs_per_second:.0f} docs/s)."
+        )
+        if len(result.failures) > 0:
+            self._logger.warning(
+                f"{len(result.failures)} {name} failed to upload to "
+                f"elasticsearch, first failure: {result.failures[0]}"
+            )
 
     def _upload_city_data_redis(
         self,
@@ -119,8 +290,10 @@ class _Upload(BaseService):
         pois_gdf: gpd.GeoDataFrame,
         district_gdf: gpd.GeoDataFrame,
         hex_resolutions: list[int],
+        poi_cell_resolution: int | None = None,
     ) -> None:
-        """Upload city data to Redis (POIs, wheelchair POIs, hexagons)."""
+        """Upload city data to Redis (POIs, wheelchair POIs, hexagons
+        and optionally POI cells)."""
         self._logger.info(f'Creating keys for city "{city}" in redis.')
         responses = self._redis_service.write.upload_pois_by_amenity_key(
             city=city, pois=pois_gdf
@@ -136,6 +309,19 @@ class _Upload(BaseService):
             f"{sum(responses)} new wheelchair "
             "accessible PoIs uploaded to redis."
         )
+        if poi_cell_resolution is not None:
+            responses = []
+            for only_wheelchair_accessible in [False, True]:
+                responses += self._redis_service.write.upload_poi_cells(
+                    city=city,
+                    pois=pois_gdf,
+                    resolution=poi_cell_resolution,
+                    only_wheelchair_accessible=only_wheelchair_accessible,
+                )
+            self._logger.info(
+                f"{sum(responses)} POI cells with resolution "
+                f"{poi_cell_resolution} uploaded to redis."
+            )
 
         for hex_resolution in hex_resolutions:
             self._logger.info(
@@ -206,7 +392,187 @@ class _Upload(BaseService):
         return pois_gdf, district_gdf
 
 
-class _Delete(BaseService):
+class _Update(_Base):
+    def upsert_poi(
+        self,
+        city: str,
+        amenity: str,
+        poi_id: str,
+        lon: float,
+        lat: float,
+        wheelchair_accessible: bool = False,
+    ) -> None:
+        """Add a POI or move an existing one.
+
+        Materialized features are only recomputed for the hexagons
+        within their radius of the old or new position of the POI.
+
+        Args:
+            wheelchair_accessible: Whether the POI is also one of the
+                wheelchair accessible POIs of the amenity.
+        """
+        self._upsert_poi(
+            city=city, amenity=amenity, poi_id=poi_id, lon=lon, lat=lat
+        )
+        wheelchair_amenity = amenity + WHEELCHAIR_SUFFIX
+        if wheelchair_accessible:
+            self._upsert_poi(
+                city=city,
+                amenity=wheelchair_amenity,
+                poi_id=poi_id,
+                lon=lon,
+                lat=lat,
+            )
+        else:
+            self._delete_poi(
+                city=city, amenity=wheelchair_amenity, poi_id=poi_id
+            )
+        self._data_changed(city)
+
+    def delete_poi(self, city: str, amenity: str, poi_id: str) -> None:
+        """Delete a POI, updating the materialized features around it."""
+        found = self._delete_poi(city=city, amenity=amenity, poi_id=poi_id)
+        self._delete_poi(
+            city=city, amenity=amenity + WHEELCHAIR_SUFFIX, poi_id=poi_id
+        )
+        if not found:
+            self._logger.warning(
+                f'POI "{poi_id}" of amenity "{amenity}" not found in redis.'
+            )
+        self._data_changed(city)
+
+    def _upsert_poi(
+        self, city: str, amenity: str, poi_id: str, lon: float, lat: float
+    ) -> None:
+        previous = self._redis_service.write.upsert_poi(
+            city=city, amenity=amenity, poi_id=poi_id, lon=lon, lat=lat
+        )
+        self._redis_service.write.update_poi_cells(
+            city=city, amenity=amenity, removed=previous, added=(lon, lat)
+        )
+        positions = [(lon, lat)]
+        if previous is not None:
+            positions.append(previous)
+        self._refresh_features(city=city, amenity=amenity, positions=positions)
+
+    def _delete_poi(self, city: str, amenity: str, poi_id: str) -> bool:
+        previous = self._redis_service.write.delete_poi(
+            city=city, amenity=amenity, poi_id=poi_id
+        )
+        if previous is None:
+            return False
+        self._redis_service.write.update_poi_cells(
+            city=city, amenity=amenity, removed=previous
+        )
+        self._refresh_features(city=city, amenity=amenity, positions=[previous])
+        return True
+
+    def _refresh_features(
+        self,
+        city: str,
+        amenity: str,
+        positions: list[tuple[float, float]],
+    ) -> None:
+        """Recompute materialized features near changed POI positions."""
+        materialized = self._redis_service.read.get_materialized_features(city)
+        for resolution, features in materialized.items():
+            features = [f for f in features if f[0] == amenity]
+            if len(features) == 0:
+                continue
+            catalogue = self._redis_service.read.get_hex_catalogue(
+                city=city, resolution=resolution
+            )
+            if catalogue is None:
+                continue
+            indices, distances = _hexagons_near_positions(
+                catalogue=catalogue,
+                resolution=resolution,
+                positions=positions,
+                radius=max(radius for _, radius, _ in features),
+            )
+            for _, radius, kind in features:
+                changed = indices[distances <= radius + _UPDATE_RADIUS_MARGIN]
+                if len(changed) == 0:
+                    continue
+                stored = self._redis_service.read.get_hex_feature(
+                    city=city,
+                    resolution=resolution,
+                    amenity=amenity,
+                    radius=radius,
+                    kind=kind,
+                )
+                if stored is None:
+                    continue
+                values = stored[1].copy()
+                lon, lat = _catalogue_centers(catalogue, changed)
+                updated = self._redis_service.read.compute_feature_at_points(
+                    city=city,
+                    amenity=amenity,
+                    lon=lon,
+                    lat=lat,
+                    radius=radius,
+                    kind=kind,
+                )
+                values[changed] = updated
+                self._redis_service.write.upload_hex_feature(
+                    city=city,
+                    resolution=resolution,
+                    amenity=amenity,
+                    radius=radius,
+                    kind=kind,
+                    values=values,
+                )
+                self._logger.info(
+                    f"Feature {amenity}:{radius}:{kind} recomputed for "
+                    f"{len(changed)} hexagons with resolution {resolution}."
+                )
+
+
+def _hexagons_near_positions(
+    catalogue: HexCatalogue,
+    resolution: int,
+    positions: list[tuple[float, float]],
+    radius: float,
+) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+    """Catalogue positions of the hexagons around changed POIs.
+
+    Returns:
+        Indices into the catalogue and the distance of each hexagon
+        center to the closest position
+    """
+    candidates = {
+        h3.str_to_int(hex_id)
+        for lon, lat in positions
+        for hex_id in hexagons_near_point(
+            lon, lat, resolution=resolution, radius=radius
+        )
+    }
+    indices = np.flatnonzero(
+        np.isin(catalogue.h3_ints, np.fromiter(candidates, dtype=np.uint64))
+    )
+    lon, lat = _catalogue_centers(catalogue, indices)
+    distances = np.full(len(indices), np.inf)
+    for poi_lon, poi_lat in positions:
+        distances = np.minimum(
+            distances,
+            haversine_distances(
+                lon, lat, np.full(len(lon), poi_lon), np.full(len(lat), poi_lat)
+            ),
+        )
+    return indices, distances
+
+
+def _catalogue_centers(
+    catalogue: HexCatalogue, indices: npt.NDArray[np.int64]
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    if catalogue.lon is not None and catalogue.lat is not None:
+        return catalogue.lon[indices], catalogue.lat[indices]
+    return hex_ids_to_centers(
+        [format(h3_int, "x") for h3_int in catalogue.h3_ints[indices].tolist()]
+    )
+
+
+class _Delete(_Base):
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
@@ -233,6 +599,7 @@ class _Delete(BaseService):
             self._logger.info(f'Elasticsearch data for city "{city}" deleted.')
 
             self._redis_service.keys_manager.delete_city_keys(city)
+            self._data_changed(city)
             self._logger.info(f'Redis data for city "{city}" deleted.')
         except Exception as e:
             self._logger.error(
@@ -241,15 +608,18 @@ class _Delete(BaseService):
             raise
 
 
-class DataManagementService(_Upload, _Delete):
+class DataManagementService(_Upload, _Update, _Delete):
     """Service for managing data in the database.
 
     This service provides methods to upload and delete city data
-    (POIs, districts, hexagons) in both Elasticsearch and Redis.
+    (POIs, districts, hexagons) in both Elasticsearch and Redis, and to
+    update single POIs in Redis.
     """
 
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
+        spatial_engine: SpatialEngine | None = None,
     ) -> None:
         super(DataManagementService, self).__init__(base_service_dependencies)
+        self.spatial_engine = spatial_engine
@@ -1,44 +1,177 @@
+from typing import Any
+
 import pandas as pd
 
 from sucolo_database_services.services.base_service import (
     BaseService,
     BaseServiceDependencies,
 )
+from sucolo_database_services.services.feature_cache import (
+    CachedValues,
+    FeatureCache,
+)
+from sucolo_database_services.utils.hex_centers import hexagons_in_polygon
 
 
 class DistrictFeaturesService(BaseService):
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
+        feature_cache: FeatureCache | None = None,
     ) -> None:
         super(DistrictFeaturesService, self).__init__(base_service_dependencies)
+        self.feature_cache = feature_cache
 
     def get_hexagon_district_features(
         self,
         city: str,
         feature_columns: list[str],
         resolution: int,
+        bbox: tuple[float, float, float, float] | None = None,
+        polygon: list[tuple[float, float]] | None = None,
+        hex_ids: list[str] | None = None,
     ) -> pd.DataFrame:
         """Get static features for hexagons.
 
+        Features are read column by column from doc values, without
+        building a dict per hexagon. Hexagons uploaded in the normalized
+        layout only store their district name, so district features are
+        read once per district and joined to the hexagons in memory.
+        With a feature cache, the features of all hexagons are cached
+        until the city's data changes and the area is selected from them
+        by the hexagons' centers.
+
         Args:
             city: City name
             feature_columns: List of feature columns to retrieve
+            resolution: Hexagon resolution level
+            bbox: Only hexagons centered in (min_lon, min_lat, max_lon,
+                max_lat)
+            polygon: Only hexagons centered in this ring of (lon, lat)
+            hex_ids: Only these hexagons
 
         Returns:
-            DataFrame containing the requested features
+            DataFrame containing the requested features indexed by hex_id
         """
-        district_data = self._es_service.read.get_hexagons(
+        if self.feature_cache is None:
+            return self._get_hexagon_district_features(
+                city=city,
+                feature_columns=feature_columns,
+                resolution=resolution,
+                bbox=bbox,
+                polygon=polygon,
+                hex_ids=hex_ids,
+            )
+        # The features of all hexagons are cached and sliced to the area,
+        # so that the batches of a query share one entry.
+        area = _area_hexagons(
+            resolution=resolution, bbox=bbox, polygon=polygon, hex_ids=hex_ids
+        )
+        key = self.feature_cache.key(
+            self._redis_service.read.get_generation(city),
+            "district",
+            resolution,
+            feature_columns,
+        )
+        entry = self.feature_cache.get(city, key)
+        if entry is None:
+            features = self._get_hexagon_district_features(
+                city=city,
+                feature_columns=feature_columns,
+                resolution=resolution,
+                bbox=None,
+                polygon=None,
+                hex_ids=None,
+            )
+            values = features.to_numpy()
+            # Only numeric features are packed
+            if values.dtype == object:
+                if area is None:
+                    return features
+                return features[features.index.isin(area)]
+            entry = CachedValues.from_hex_ids(features.index.tolist(), values)
+            self.feature_cache.put(city, key, entry)
+        if area is not None:
+            entry = entry.select(area)
+        return pd.DataFrame(
+            entry.values.reshape(len(entry.h3_ints), len(feature_columns)),
+            index=pd.Index(entry.hex_ids, name="hex_id"),
+            columns=feature_columns,
+            copy=True,
+        )
+
+    def _get_hexagon_district_features(
+        self,
+        city: str,
+        feature_columns: list[str],
+        resolution: int,
+        bbox: tuple[float, float, float, float] | None,
+        polygon: list[tuple[float, float]] | None,
+        hex_ids: list[str] | None,
+    ) -> pd.DataFrame:
+        # Only the area filters that are set are forwarded
+        area_filters: dict[str, Any] = {
+            name: value
+            for name, value in [
+                ("bbox", bbox),
+                ("polygon", polygon),
+                ("hex_ids", hex_ids),
+            ]
+            if value is not None
+        }
+        hexagons = self._es_service.read.get_hexagon_columns(
             index_name=city,
-            features=feature_columns,
             resolution=resolution,
+            features=feature_columns,
+            string_features=["district"],
+            **area_filters,
         )
-        df = pd.DataFrame.from_dict(district_data, orient="index")
-        df = df.drop(
-            columns=[
-                col
-                for col in df.columns
-                if col in ["hex_id", "type", "location", "polygon"]
-            ]
+        normalized = hexagons["district"].notna()
+        if normalized.any():
+            districts = self._es_service.read.get_districts(
+                index_name=city,
+                features=feature_columns,
+            )
+            district_features = pd.DataFrame.from_dict(
+                districts, orient="index"
+            ).reindex(columns=feature_columns)
+            hexagon_districts = hexagons.loc[normalized, "district"]
+            hexagons.loc[
+                normalized, feature_columns
+            ] = district_features.reindex(hexagon_districts).to_numpy()
+        return hexagons[feature_columns]
+
+
+def _area_hexagons(
+    resolution: int,
+    bbox: tuple[float, float, float, float] | None,
+    polygon: list[tuple[float, float]] | None,
+    hex_ids: list[str] | None,
+) -> list[str] | None:
+    """Hexagons within all given area filters, None without filters."""
+    areas: list[set[str]] = []
+    if bbox is not None:
+        min_lon, min_lat, max_lon, max_lat = bbox
+        areas.append(
+            hexagons_in_polygon(
+                [
+                    (min_lon, min_lat),
+                    (max_lon, min_lat),
+                    (max_lon, max_lat),
+                    (min_lon, max_lat),
+                ],
+                resolution,
+            )
         )
-        return df
+    if polygon is not None:
+        areas.append(hexagons_in_polygon(polygon, resolution))
+    if hex_ids is not None:
+        # Keep the order of the requested hexagons
+        return [
+            hex_id
+            for hex_id in hex_ids
+            if all(hex_id in area for area in areas)
+        ]
+    if len(areas) == 0:
+        return None
+    return list(set.intersection(*areas))
@@ -1,10 +1,48 @@
+from dataclasses import replace
+from typing import Any, Callable, Literal, Mapping, cast
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from sucolo_database_services.redis_client.hex_features_script import (
+    REPLY_DTYPES,
+)
 from sucolo_database_services.services.base_service import (
     BaseService,
     BaseServiceDependencies,
 )
-from sucolo_database_services.services.fields_and_queries import AmenityQuery
+from sucolo_database_services.services.feature_cache import (
+    CachedValues,
+    FeatureCache,
+)
+from sucolo_database_services.services.feature_planner import (
+    AmenitySweep,
+    PlannedFeature,
+    is_engine_feature_kind,
+    plan_features,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityQuery,
+    PointFeaturesQuery,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisSpatialEngine,
+    SpatialEngine,
+)
+from sucolo_database_services.utils.distance_features import (
+    CSR_TYPE,
+    accessibility_within,
+    counts_within_radii,
+    kth_nearest_within,
+    nearest_within,
+    to_csr,
+)
+from sucolo_database_services.utils.hex_centers import hex_ids_to_centers
+from sucolo_database_services.utils.poi_cells import approximate_counts
 
 HEX_ID_TYPE = str
+FEATURE_VALUES_TYPE = Mapping[HEX_ID_TYPE, float | int | None]
 
 
 class DynamicFeaturesService(BaseService):
@@ -16,8 +54,14 @@ class DynamicFeaturesService(BaseService):
     def __init__(
         self,
         base_service_dependencies: BaseServiceDependencies,
+        spatial_engine: SpatialEngine | None = None,
+        feature_cache: FeatureCache | None = None,
     ) -> None:
         super(DynamicFeaturesService, self).__init__(base_service_dependencies)
+        if spatial_engine is None:
+            spatial_engine = RedisSpatialEngine(self._redis_service)
+        self.spatial_engine = spatial_engine
+        self.feature_cache = feature_cache
 
     def calculate_nearest_distances(
         self,
@@ -34,8 +78,26 @@ class DynamicFeaturesService(BaseService):
         Returns:
             Dictionary mapping hex_id to nearest distance.
         """
+        return cast(
+            dict[HEX_ID_TYPE, float | None],
+            self._cached(
+                query,
+                kind="nearest",
+                compute=lambda: self._calculate_nearest_distances(query),
+            ),
+        )
+
+    def _calculate_nearest_distances(
+        self,
+        query: AmenityQuery,
+    ) -> dict[HEX_ID_TYPE, float | None]:
+        arrays = self._get_feature_arrays(query, kind="nearest")
+        if arrays is not None:
+            return self._nearest_from_values(
+                *arrays, radius=query.radius, penalty=query.penalty
+            )
         nearest_distances = (
-            self._redis_service.read.find_nearest_pois_to_hex_centers(
+            self.spatial_engine.find_nearest_pois_to_hex_centers(
                 city=query.city,
                 amenity=query.amenity,
                 resolution=query.resolution,
@@ -57,11 +119,12 @@ class DynamicFeaturesService(BaseService):
         penalty: int | None,
     ) -> dict[str, float | None]:
         """Post-process nearest distances with optional penalty.
-        If POI is found, return the first distance;
+        If POI is found within the radius, return the first distance;
         if not found, return radius + penalty or None if penalty is None.
 
         Args:
-            nearest_distances: Dictionary of hex_id to list of distances
+            nearest_distances: Dictionary of hex_id to list of distances,
+                sorted ascending (possibly queried with a larger radius)
             radius: Search radius
             penalty: Optional penalty to add when no POI is found
 
@@ -70,7 +133,7 @@ class DynamicFeaturesService(BaseService):
         """
 
         def _get_distance(dists: list[float]) -> float | None:
-            if len(dists) > 0:
+            if len(dists) > 0 and dists[0] <= radius:
                 return dists[0]
             else:
                 if penalty is not None:
@@ -97,17 +160,50 @@ class DynamicFeaturesService(BaseService):
         Returns:
             Dictionary mapping hex_id to count of POIs
         """
-        nearest_pois = (
-            self._redis_service.read.find_nearest_pois_to_hex_centers(
-                city=query.city,
-                amenity=query.amenity,
-                resolution=query.resolution,
-                radius=query.radius,
-                count=None,
-            )
+        return cast(
+            dict[HEX_ID_TYPE, int],
+            self._cached(
+                query,
+                kind="count",
+                compute=lambda: self._count_pois_in_distance(query),
+            ),
         )
-        counts = {hex_id: len(pois) for hex_id, pois in nearest_pois.items()}
-        return counts
+
+    def _count_pois_in_distance(
+        self,
+        query: AmenityQuery,
+    ) -> dict[HEX_ID_TYPE, int]:
+        arrays = self._get_feature_arrays(query, kind="count")
+        if arrays is not None:
+            return self._counts_from_values(*arrays)
+        nearest_pois = self.spatial_engine.find_nearest_pois_to_hex_centers(
+            city=query.city,
+            amenity=query.amenity,
+            resolution=query.resolution,
+            radius=query.radius,
+            count=None,
+        )
+        counts = self._count_post_processing(nearest_pois, radii=[query.radius])
+        return counts[query.radius]
+
+    def _count_post_processing(
+        self,
+        nearest_distances: dict[str, list[float]],
+        radii: list[int],
+    ) -> dict[int, dict[str, int]]:
+        """Count the sorted distances within each radius.
+
+        Returns:
+            Dictionary mapping radius to the counts of every hexagon
+        """
+        counts = counts_within_radii(
+            *to_csr(nearest_distances.values()), radii=radii
+        )
+        hex_ids = list(nearest_distances)
+        return {
+            radius: dict(zip(hex_ids, radius_counts.tolist()))
+            for radius, radius_counts in counts.items()
+        }
 
     def determine_presence_in_distance(
         self,
@@ -123,17 +219,589 @@ class DynamicFeaturesService(BaseService):
             Dictionary mapping hex_id to presence indicator
             (1 if present, 0 if not)
         """
-        nearest_pois = (
-            self._redis_service.read.find_nearest_pois_to_hex_centers(
-                city=query.city,
-                amenity=query.amenity,
-                resolution=query.resolution,
+        return cast(
+            dict[HEX_ID_TYPE, int],
+            self._cached(
+                query,
+                kind="presence",
+                compute=lambda: self._determine_presence_in_distance(query),
+            ),
+        )
+
+    def _determine_presence_in_distance(
+        self,
+        query: AmenityQuery,
+    ) -> dict[HEX_ID_TYPE, int]:
+        arrays = self._get_feature_arrays(query, kind="presence")
+        if arrays is not None:
+            return self._counts_from_values(*arrays)
+        return self.spatial_engine.find_presence_near_hex_centers(
+            city=query.city,
+            amenity=query.amenity,
+            resolution=query.resolution,
+            radius=query.radius,
+        )
+
+    def _presence_post_processing(
+        self,
+        nearest_distances: dict[str, list[float]],
+        radius: int,
+    ) -> dict[str, int]:
+        """1 if the nearest distance is within the radius, 0 otherwise."""
+        return {
+            hex_id: (1 if len(dists) > 0 and dists[0] <= radius else 0)
+            for hex_id, dists in nearest_distances.items()
+        }
+
+    def run_sweep(
+        self,
+        sweep: AmenitySweep,
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]:
+        """Compute all features of a sweep from a single Redis query.
+
+        Approximate features are computed from the POI cells and
+        materialized features are loaded from the feature store, the
+        others are computed live. With a feature cache, only the features
+        that aren't cached are computed. Sweeps limited to some hexagons
+        (see `AmenitySweep.hex_ids`) take the same path for those
+        hexagons, and read but don't fill the cache.
+
+        Args:
+            sweep: AmenitySweep planned by `plan_features`
+
+        Returns:
+            List of (feature, mapping of hex_id to value), in the order of
+            the sweep's features
+        """
+        if self.feature_cache is None:
+            return self._compute_sweep(sweep)
+        generation = self._redis_service.read.get_generation(sweep.city)
+        keys = {
+            id(feature): self._feature_cache_key(
+                generation=generation,
+                resolution=sweep.resolution,
+                amenity=sweep.amenity,
+                feature=feature,
+            )
+            for feature in sweep.features
+        }
+        values: dict[int, FEATURE_VALUES_TYPE] = {}
+        missing: list[PlannedFeature] = []
+        for feature in sweep.features:
+            entry = self.feature_cache.get(sweep.city, keys[id(feature)])
+            if entry is None:
+                missing.append(feature)
+            elif sweep.hex_ids is None:
+                values[id(feature)] = entry.to_mapping()
+            else:
+                values[id(feature)] = entry.select(sweep.hex_ids).to_mapping()
+        if len(missing) > 0:
+            for feature, feature_values in self._compute_sweep(
+                replace(sweep, features=missing)
+            ):
+                # Entries hold the values of all hexagons of the city
+                if sweep.hex_ids is None:
+                    self.feature_cache.put(
+                        sweep.city,
+                        keys[id(feature)],
+                        CachedValues.from_mapping(feature_values),
+                    )
+                values[id(feature)] = feature_values
+        return [(feature, values[id(feature)]) for feature in sweep.features]
+
+    def _compute_sweep(
+        self,
+        sweep: AmenitySweep,
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]:
+        # Counts of a distance band are the difference of the counts
+        # within its outer and inner radius
+        features = [f for f in sweep.features if f.min_radius == 0]
+        bands: dict[int, tuple[PlannedFeature, PlannedFeature]] = {}
+        for feature in sweep.features:
+            if feature.min_radius > 0:
+                inner, outer = (
+                    PlannedFeature(
+                        kind="count",
+                        radius=radius,
+                        approximate=feature.approximate,
+                    )
+                    for radius in (feature.min_radius, feature.radius)
+                )
+                bands[id(feature)] = (inner, outer)
+                features += [inner, outer]
+        values = {
+            id(feature): feature_values
+            for feature, feature_values in self._run_features(sweep, features)
+        }
+
+        results: list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]] = []
+        for feature in sweep.features:
+            if id(feature) in bands:
+                inner, outer = bands[id(feature)]
+                inner_values = values[id(inner)]
+                results.append(
+                    (
+                        feature,
+                        {
+                            hex_id: count - inner_values[hex_id]  # type: ignore
+                            for hex_id, count in values[id(outer)].items()
+                        },
+                    )
+                )
+            else:
+                results.append((feature, values[id(feature)]))
+        return results
+
+    def _run_features(
+        self,
+        sweep: AmenitySweep,
+        features: list[PlannedFeature],
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]:
+        """Compute features of a sweep, precomputed ones first."""
+        results: list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]] = []
+        live_features: list[PlannedFeature] = []
+        for feature in features:
+            stored = None
+            if is_engine_feature_kind(feature.kind):
+                stored = self._get_precomputed_arrays(
+                    city=sweep.city,
+                    amenity=sweep.amenity,
+                    resolution=sweep.resolution,
+                    radius=feature.radius,
+                    kind=feature.kind,
+                    approximate=feature.approximate,
+                    hex_ids=sweep.hex_ids,
+                )
+            if stored is None:
+                live_features.append(feature)
+            else:
+                results.append(
+                    (feature, self._feature_from_values(feature, *stored))
+                )
+        if len(live_features) > 0:
+            results += self._run_live_sweep(
+                replace(sweep, features=live_features)
+            )
+        return results
+
+    def _run_live_sweep(
+        self,
+        sweep: AmenitySweep,
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]:
+        """Compute the features of a sweep with the spatial engine.
+
+        K-th nearest distances and accessibilities are always derived
+        from the distances of one search. Sweeps limited to some hexagons
+        always search from their centers, as engines compute features and
+        presences for all hexagons.
+        """
+        results: list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]] = []
+        if self.spatial_engine.computes_features and sweep.hex_ids is None:
+            for feature in sweep.features:
+                if not is_engine_feature_kind(feature.kind):
+                    continue
+                computed = self.spatial_engine.compute_hex_feature(
+                    city=sweep.city,
+                    amenity=sweep.amenity,
+                    resolution=sweep.resolution,
+                    radius=feature.radius,
+                    kind=feature.kind,
+                )
+                hex_ids, feature_values = computed
+                results.append(
+                    (
+                        feature,
+                        self._feature_from_values(
+                            feature, hex_ids, feature_values
+                        ),
+                    )
+                )
+            sweep = replace(
+                sweep,
+                features=[
+                    f
+                    for f in sweep.features
+                    if not is_engine_feature_kind(f.kind)
+                ],
+            )
+            if len(sweep.features) == 0:
+                return results
+        if sweep.hex_ids is None and all(
+            feature.kind == "presence" for feature in sweep.features
+        ):
+            # Presence alone doesn't need distances
+            return [
+                (
+                    feature,
+                    self.spatial_engine.find_presence_near_hex_centers(
+                        city=sweep.city,
+                        amenity=sweep.amenity,
+                        resolution=sweep.resolution,
+                        radius=feature.radius,
+                    ),
+                )
+                for feature in sweep.features
+            ]
+        distances = self._find_sweep_distances(sweep)
+        count_radii = [f.radius for f in sweep.features if f.kind == "count"]
+        counts = (
+            self._count_post_processing(distances, radii=count_radii)
+            if len(count_radii) > 0
+            else {}
+        )
+        csr = None
+        if any(
+            f.kind in ("kth_nearest", "accessibility") for f in sweep.features
+        ):
+            csr = to_csr(distances.values())
+        for feature in sweep.features:
+            values: FEATURE_VALUES_TYPE
+            if feature.kind == "nearest":
+                values = self._nearest_post_processing(
+                    nearest_distances=distances,
+                    radius=feature.radius,
+                    penalty=feature.penalty,
+                )
+            elif feature.kind == "count":
+                values = counts[feature.radius]
+            elif feature.kind == "presence":
+                values = self._presence_post_processing(
+                    distances, radius=feature.radius
+                )
+            elif feature.kind == "kth_nearest":
+                assert csr is not None
+                values = self._kth_nearest_post_processing(
+                    hex_ids=list(distances),
+                    csr=csr,
+                    k=feature.k,
+                    radius=feature.radius,
+                    penalty=feature.penalty,
+                )
+            else:
+                assert csr is not None and feature.beta is not None
+                values = dict(
+                    zip(
+                        distances,
+                        accessibility_within(
+                            *csr, radius=feature.radius, beta=feature.beta
+                        ).tolist(),
+                    )
+                )
+            results.append((feature, values))
+        return results
+
+    def _find_sweep_distances(
+        self, sweep: AmenitySweep
+    ) -> dict[HEX_ID_TYPE, list[float]]:
+        """Distances to the POIs within the sweep's radius per hexagon."""
+        if sweep.hex_ids is None:
+            return self.spatial_engine.find_nearest_pois_to_hex_centers(
+                city=sweep.city,
+                amenity=sweep.amenity,
+                resolution=sweep.resolution,
+                radius=sweep.radius,
+                count=sweep.count,
+            )
+        lon, lat = hex_ids_to_centers(sweep.hex_ids)
+        offsets, distances = self.spatial_engine.find_nearest_pois_to_points(
+            city=sweep.city,
+            amenity=sweep.amenity,
+            lon=lon,
+            lat=lat,
+            radius=sweep.radius,
+            count=sweep.count,
+        )
+        bounds = offsets.tolist()
+        distance_list = distances.tolist()
+        return {
+            hex_id: distance_list[bounds[i] : bounds[i + 1]]
+            for i, hex_id in enumerate(sweep.hex_ids)
+        }
+
+    def _kth_nearest_post_processing(
+        self,
+        hex_ids: list[HEX_ID_TYPE],
+        csr: CSR_TYPE,
+        k: int,
+        radius: int,
+        penalty: int | None,
+    ) -> dict[HEX_ID_TYPE, float | None]:
+        """Distance to the k-th nearest POI of every hexagon, or
+        radius + penalty (None if penalty is None) if there is none."""
+        return self._nearest_from_values(
+            hex_ids,
+            kth_nearest_within(*csr, k=k, radius=radius),
+            radius=radius,
+            penalty=penalty,
+        )
+
+    def get_point_features(
+        self,
+        query: PointFeaturesQuery,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+    ) -> pd.DataFrame:
+        """Compute amenity features of arbitrary points.
+
+        Each amenity is searched once for all points with the spatial
+        engine (chunked Redis pipelines or in-process), and the features
+        are computed on the columnar distances with NumPy.
+
+        Args:
+            query: PointFeaturesQuery with the city and amenity features
+            lon: Longitudes of the points
+            lat: Latitudes of the points
+
+        Returns:
+            DataFrame with one row per point and one column per feature;
+            missing distances without penalty are NaN
+        """
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        if lon.shape != lat.shape:
+            raise ValueError("lon and lat must have the same shape.")
+        columns: list[tuple[int, str, npt.NDArray[Any]]] = []
+        for sweep in plan_features(query):
+            nearest = self.spatial_engine.find_nearest_pois_to_points(
+                city=sweep.city,
+                amenity=sweep.amenity,
+                lon=lon,
+                lat=lat,
+                radius=sweep.radius,
+                count=sweep.count,
+            )
+            offsets, distances = nearest
+            count_radii = [
+                radius
+                for f in sweep.features
+                if f.kind == "count"
+                for radius in (f.min_radius, f.radius)
+                if radius > 0
+            ]
+            counts = (
+                counts_within_radii(offsets, distances, count_radii)
+                if len(count_radii) > 0
+                else {}
+            )
+            for feature in sweep.features:
+                values: npt.NDArray[Any]
+                if feature.kind in ("nearest", "kth_nearest"):
+                    if feature.kind == "nearest":
+                        values = nearest_within(
+                            offsets, distances, radius=feature.radius
+                        )
+                    else:
+                        values = kth_nearest_within(
+                            offsets,
+                            distances,
+                            k=feature.k,
+                            radius=feature.radius,
+                        )
+                    if feature.penalty is not None:
+                        values[np.isnan(values)] = (
+                            feature.radius + feature.penalty
+                        )
+                elif feature.kind == "count":
+                    values = counts[feature.radius]
+                    if feature.min_radius > 0:
+                        values = values - counts[feature.min_radius]
+                elif feature.kind == "presence":
+                    values = (
+                        ~np.isnan(
+                            nearest_within(
+                                offsets, distances, radius=feature.radius
+                            )
+                        )
+                    ).astype(np.uint8)
+                else:
+                    assert feature.beta is not None
+                    values = accessibility_within(
+                        offsets,
+                        distances,
+                        radius=feature.radius,
+                        beta=feature.beta,
+                    )
+                columns.append(
+                    (feature.order, feature.column(sweep.amenity), values)
+                )
+        columns.sort(key=lambda column: column[0])
+        return pd.DataFrame(
+            {name: values for _, name, values in columns},
+            index=pd.RangeIndex(len(lon)),
+        )
+
+    def _cached(
+        self,
+        query: AmenityQuery,
+        kind: Literal["nearest", "count", "presence"],
+        compute: Callable[[], FEATURE_VALUES_TYPE],
+    ) -> FEATURE_VALUES_TYPE:
+        """Feature of an AmenityQuery, from the feature cache if possible.
+
+        Entries are shared with the same features of sweeps.
+        """
+        if self.feature_cache is None:
+            return compute()
+        key = self._feature_cache_key(
+            generation=self._redis_service.read.get_generation(query.city),
+            resolution=query.resolution,
+            amenity=query.amenity,
+            feature=PlannedFeature(
+                kind=kind,
                 radius=query.radius,
-                count=None,
+                penalty=query.penalty,
+                approximate=query.approximate and kind != "nearest",
+            ),
+        )
+        entry = self.feature_cache.get(query.city, key)
+        if entry is not None:
+            return entry.to_mapping()
+        values = compute()
+        self.feature_cache.put(
+            query.city, key, CachedValues.from_mapping(values)
+        )
+        return values
+
+    def _feature_cache_key(
+        self,
+        generation: int,
+        resolution: int,
+        amenity: str,
+        feature: PlannedFeature,
+    ) -> str:
+        """Cache key of the values of a feature of all hexagons."""
+        assert self.feature_cache is not None
+        return self.feature_cache.key(
+            generation,
+            "dynamic",
+            resolution,
+            amenity,
+            feature.kind,
+            feature.radius,
+            feature.min_radius,
+            (
+                feature.penalty
+                if feature.kind in ("nearest", "kth_nearest")
+                else None
+            ),
+            feature.approximate,
+            feature.k,
+            feature.beta,
+        )
+
+    def _get_feature_arrays(
+        self,
+        query: AmenityQuery,
+        kind: Literal["nearest", "count", "presence"],
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]] | None:
+        """Feature values of all hexagons as arrays, if available.
+
+        Returns the approximate or materialized values if available (see
+        `_get_precomputed_arrays`), the values computed by the spatial
+        engine if it computes features, and None if the feature has to be
+        derived from distances.
+        """
+        stored = self._get_precomputed_arrays(
+            city=query.city,
+            amenity=query.amenity,
+            resolution=query.resolution,
+            radius=query.radius,
+            kind=kind,
+            approximate=query.approximate and kind != "nearest",
+        )
+        if stored is not None or not self.spatial_engine.computes_features:
+            return stored
+        return self.spatial_engine.compute_hex_feature(
+            city=query.city,
+            amenity=query.amenity,
+            resolution=query.resolution,
+            radius=query.radius,
+            kind=kind,
+        )
+
+    def _get_precomputed_arrays(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        kind: Literal["nearest", "count", "presence"],
+        approximate: bool = False,
+        hex_ids: list[HEX_ID_TYPE] | None = None,
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]] | None:
+        """Feature values that don't need a search per hexagon.
+
+        Approximate counts and presences come from the POI cells, other
+        features from the feature store if they are materialized. Values
+        are returned for `hex_ids` if given, else for all hexagons.
+        """
+        if approximate:
+            poi_cells = self._redis_service.read.get_poi_cells(
+                city=city, amenity=amenity
+            )
+            if poi_cells is not None:
+                if hex_ids is None:
+                    hex_ids = self._redis_service.read.get_hexagons(
+                        city=city, resolution=resolution
+                    )
+                counts = approximate_counts(
+                    cells=poi_cells[0],
+                    cell_counts=poi_cells[1],
+                    hex_ids=hex_ids,
+                    radius=radius,
+                )
+                values = counts > 0 if kind == "presence" else counts
+                return hex_ids, values.astype(REPLY_DTYPES[kind])
+            self._logger.warning(
+                f'No POI cells for amenity "{amenity}" in city "{city}", '
+                "computing exact values."
             )
+        stored = self._redis_service.read.get_hex_feature(
+            city=city,
+            resolution=resolution,
+            amenity=amenity,
+            radius=radius,
+            kind=kind,
         )
-        presence = {
-            hex_id: (1 if len(pois) > 0 else 0)
-            for hex_id, pois in nearest_pois.items()
+        if stored is None or hex_ids is None:
+            return stored
+        rows = pd.Index(stored[0]).get_indexer(hex_ids)
+        found = rows >= 0
+        return (
+            [hex_id for hex_id, is_found in zip(hex_ids, found) if is_found],
+            stored[1][rows[found]],
+        )
+
+    def _feature_from_values(
+        self,
+        feature: PlannedFeature,
+        hex_ids: list[HEX_ID_TYPE],
+        values: npt.NDArray[Any],
+    ) -> FEATURE_VALUES_TYPE:
+        if feature.kind == "nearest":
+            return self._nearest_from_values(
+                hex_ids, values, radius=feature.radius, penalty=feature.penalty
+            )
+        return self._counts_from_values(hex_ids, values)
+
+    def _nearest_from_values(
+        self,
+        hex_ids: list[HEX_ID_TYPE],
+        values: npt.NDArray[Any],
+        radius: int,
+        penalty: int | None,
+    ) -> dict[HEX_ID_TYPE, float | None]:
+        """Map nearest distances (NaN if none) to hexagons with penalty."""
+        missing = radius + penalty if penalty is not None else None
+        return {
+            hex_id: (missing if np.isnan(distance) else distance)
+            for hex_id, distance in zip(hex_ids, values.tolist())
         }
-        return presence
+
+    def _counts_from_values(
+        self,
+        hex_ids: list[HEX_ID_TYPE],
+        values: npt.NDArray[Any],
+    ) -> dict[HEX_ID_TYPE, int]:
+        """Map counts or presences to hexagons."""
+        return dict(zip(hex_ids, values.tolist()))
@@ -0,0 +1,155 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Mapping, Sequence
+
+import numpy as np
+import numpy.typing as npt
+import pandas as pd
+
+from sucolo_database_services.redis_client.service import RedisService
+
+
+@dataclass(frozen=True)
+class CachedValues:
+    """Feature values of hexagons, with the hexagons packed as H3 integers.
+
+    `values` has one row per hexagon, and one column per feature if the
+    entry holds several features.
+    """
+
+    h3_ints: npt.NDArray[np.uint64]
+    values: npt.NDArray[Any]
+
+    @classmethod
+    def from_hex_ids(
+        cls, hex_ids: Sequence[str], values: npt.ArrayLike
+    ) -> "CachedValues":
+        h3_ints = np.fromiter(
+            (int(hex_id, 16) for hex_id in hex_ids),
+            dtype=np.uint64,
+            count=len(hex_ids),
+        )
+        return cls(h3_ints, np.asarray(values))
+
+    @classmethod
+    def from_mapping(
+        cls, values: Mapping[str, float | int | None]
+    ) -> "CachedValues":
+        """Pack a mapping of hex_id to value, None is stored as NaN."""
+        array = np.asarray(list(values.values()))
+        if array.dtype == object:
+            array = array.astype(np.float64)
+        return cls.from_hex_ids(list(values), array)
+
+    @property
+    def hex_ids(self) -> list[str]:
+        """Hexagon ids as H3 strings."""
+        return [format(h3_int, "x") for h3_int in self.h3_ints.tolist()]
+
+    @property
+    def nbytes(self) -> int:
+        return self.h3_ints.nbytes + self.values.nbytes
+
+    def select(self, hex_ids: Sequence[str]) -> "CachedValues":
+        """Values of the given hexagons, skipping hexagons without one."""
+        h3_ints = np.fromiter(
+            (int(hex_id, 16) for hex_id in hex_ids),
+            dtype=np.uint64,
+            count=len(hex_ids),
+        )
+        rows = pd.Index(self.h3_ints).get_indexer(h3_ints)
+        rows = rows[rows >= 0]
+        return CachedValues(self.h3_ints[rows], self.values[rows])
+
+    def to_mapping(self) -> dict[str, float | int | None]:
+        """Mapping of hex_id to value, NaN is returned as None."""
+        values: list[Any] = self.values.tolist()
+        if self.values.dtype.kind == "f":
+            values = [None if np.isnan(value) else value for value in values]
+        return dict(zip(self.hex_ids, values))
+
+    def to_bytes(self) -> bytes:
+        buffer = io.BytesIO()
+        np.savez(buffer, h3_ints=self.h3_ints, values=self.values)
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedValues":
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            return cls(arrays["h3_ints"], arrays["values"])
+
+
+class FeatureCache:
+    """Cache of computed feature values, keyed by normalized queries.
+
+    Entries are kept in an in-process LRU bounded in bytes and, with a
+    Redis service, packed in Redis for `redis_ttl` seconds, so that they
+    are shared by all processes. Keys include the data generation of the
+    city, which `DataManagementService` bumps whenever the city's data
+    changes: entries of older generations are never hit again and are
+    evicted or expire.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int = 256 * 1024 * 1024,
+        redis_service: RedisService | None = None,
+        redis_ttl: int | None = 3600,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.redis_service = redis_service
+        self.redis_ttl = redis_ttl
+        self._entries = OrderedDict[tuple[str, str], CachedValues]()
+        self._nbytes = 0
+        self._lock = threading.Lock()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the entries held in process."""
+        return self._nbytes
+
+    def key(self, generation: int, *query: Any) -> str:
+        """Cache key of a normalized query on a data generation."""
+        digest = hashlib.sha1(
+            json.dumps(query, default=str).encode("utf-8")
+        ).hexdigest()
+        return f"{generation}_{digest}"
+
+    def get(self, city: str, key: str) -> CachedValues | None:
+        with self._lock:
+            entry = self._entries.get((city, key))
+            if entry is not None:
+                self._entries.move_to_end((city, key))
+                return entry
+        if self.redis_service is None:
+            return None
+        data = self.redis_service.read.get_cached_features(city=city, key=key)
+        if data is None:
+            return None
+        entry = CachedValues.from_bytes(data)
+        self._put_local((city, key), entry)
+        return entry
+
+    def put(self, city: str, key: str, entry: CachedValues) -> None:
+        self._put_local((city, key), entry)
+        if self.redis_service is not None:
+            self.redis_service.write.cache_features(
+                city=city, key=key, data=entry.to_bytes(), ttl=self.redis_ttl
+            )
+
+    def _put_local(self, key: tuple[str, str], entry: CachedValues) -> None:
+        if entry.nbytes > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._entries[key] = entry
+            self._nbytes += entry.nbytes
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._nbytes -= evicted.nbytes
@@ -0,0 +1,168 @@
+from dataclasses import dataclass, field
+from typing import Literal, Sequence, TypeGuard, get_args
+
+from sucolo_database_services.services.fields_and_queries import (
+    AccessibilityFields,
+    AmenityFields,
+    KthNearestFields,
+    MultipleFeaturesQuery,
+    PointFeaturesQuery,
+)
+
+# Kinds which spatial engines can compute and which can be materialized
+EngineFeatureKind = Literal["nearest", "count", "presence"]
+FeatureKind = Literal[EngineFeatureKind, "kth_nearest", "accessibility"]
+ENGINE_FEATURE_KINDS: tuple[EngineFeatureKind, ...] = get_args(
+    EngineFeatureKind
+)
+
+
+def is_engine_feature_kind(kind: FeatureKind) -> TypeGuard[EngineFeatureKind]:
+    return kind in ENGINE_FEATURE_KINDS
+
+
+COLUMN_PREFIXES: dict[FeatureKind, str] = {
+    "nearest": "nearest_",
+    "count": "count_",
+    "presence": "present_",
+    "kth_nearest": "nearest_",
+    "accessibility": "accessibility_",
+}
+
+
+@dataclass(frozen=True)
+class PlannedFeature:
+    """A single output column derived from the distances of a sweep."""
+
+    kind: FeatureKind
+    radius: int
+    penalty: int | None = None
+    # Counts and presences from the POI cells, see `approximate_counts`
+    approximate: bool = False
+    # Counts of a distance band only count POIs further than min_radius
+    min_radius: int = 0
+    # Rank of the POI of k-th nearest distances
+    k: int = 1
+    # Decay distance of accessibilities
+    beta: float | None = None
+    # Appended to the column name, e.g. the radius of multi-radius counts
+    label: str = ""
+    # Position of the column in the output (nearests, counts, presences)
+    order: int = 0
+
+    def column(self, amenity: str) -> str:
+        return COLUMN_PREFIXES[self.kind] + amenity + self.label
+
+
+@dataclass
+class AmenitySweep:
+    """One Redis sweep over all hexagons for an amenity.
+
+    The sweep runs at the largest radius of its features. Features with
+    a smaller radius are derived by filtering the returned distances.
+    """
+
+    city: str
+    amenity: str
+    resolution: int
+    features: list[PlannedFeature] = field(default_factory=list)
+    # Hexagons to compute the features for, all hexagons of the city
+    # if None
+    hex_ids: list[str] | None = None
+
+    @property
+    def radius(self) -> int:
+        return max(feature.radius for feature in self.features)
+
+    @property
+    def count(self) -> int | None:
+        """Maximum number of POIs returned per hexagon.
+
+        Nearest distances and presences only need the closest POI, k-th
+        nearest distances the k closest ones, counts and accessibilities
+        need all of them.
+        """
+        if any(
+            feature.kind in ("count", "accessibility")
+            for feature in self.features
+        ):
+            return None
+        return max(feature.k for feature in self.features)
+
+
+def plan_features(
+    query: MultipleFeaturesQuery | PointFeaturesQuery,
+) -> list[AmenitySweep]:
+    """Group the amenity subqueries of a query into sweeps.
+
+    Subqueries for the same (amenity, resolution) share one sweep, in the
+    order their amenities first appear in the query. Counts with several
+    radii are planned as one feature per radius or distance band.
+    Sweeps of point queries have no resolution (0).
+    """
+    sweeps: dict[tuple[str, int], AmenitySweep] = {}
+    order = 0
+    resolution = (
+        query.resolution if isinstance(query, MultipleFeaturesQuery) else 0
+    )
+
+    def add(kind: FeatureKind, fields_list: Sequence[AmenityFields]) -> None:
+        nonlocal order
+        for fields in fields_list:
+            key = (fields.amenity, resolution)
+            if key not in sweeps:
+                sweeps[key] = AmenitySweep(
+                    city=query.city,
+                    amenity=fields.amenity,
+                    resolution=resolution,
+                )
+            if kind == "count" and len(fields.radii) > 0:
+                # One count per radius (or band), all from the same sweep
+                radii = sorted({fields.radius, *fields.radii})
+                min_radii = [0] * len(radii)
+                if fields.bands:
+                    min_radii = [0] + radii[:-1]
+                for min_radius, radius in zip(min_radii, radii):
+                    sweeps[key].features.append(
+                        PlannedFeature(
+                            kind=kind,
+                            radius=radius,
+                            approximate=fields.approximate,
+                            min_radius=min_radius,
+                            label=(
+                                f"_{min_radius}_{radius}"
+                                if fields.bands
+                                else f"_{radius}"
+                            ),
+                            order=order,
+                        )
+                    )
+                    order += 1
+                continue
+            k = fields.k if isinstance(fields, KthNearestFields) else 1
+            sweeps[key].features.append(
+                PlannedFeature(
+                    kind=kind,
+                    radius=fields.radius,
+                    penalty=fields.penalty,
+                    approximate=(
+                        fields.approximate and kind in ("count", "presence")
+                    ),
+                    k=k,
+                    beta=(
+                        fields.beta
+                        if isinstance(fields, AccessibilityFields)
+                        else None
+                    ),
+                    label=f"_k{k}" if kind == "kth_nearest" else "",
+                    order=order,
+                )
+            )
+            order += 1
+
+    add("nearest", query.nearests)
+    add("count", query.counts)
+    add("presence", query.presences)
+    add("kth_nearest", query.kth_nearests)
+    add("accessibility", query.accessibilities)
+    return list(sweeps.values())
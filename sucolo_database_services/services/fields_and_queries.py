@@ -1,6 +1,12 @@
-from typing import Literal
+from typing import Literal, Sequence
 
-from pydantic import BaseModel, Field, ValidationError, field_validator
+from pydantic import (
+    BaseModel,
+    Field,
+    ValidationError,
+    field_validator,
+    model_validator,
+)
 
 HEX_ID_TYPE = str
 
@@ -32,6 +38,27 @@ class AmenityFields(BaseModel):
     penalty: int | None = Field(
         default=None, ge=0, description="Penalty must be non-negative"
     )
+    radii: list[int] = Field(
+        default=[],
+        description=(
+            "Further radii of counts from the same search; all count"
+            " columns are then suffixed with their radius"
+        ),
+    )
+    bands: bool = Field(
+        default=False,
+        description=(
+            "With radii, count POIs between consecutive radii instead of"
+            " within each radius"
+        ),
+    )
+    approximate: bool = Field(
+        default=False,
+        description=(
+            "Approximate counts and presences from POI counts per H3 cell"
+            " (if uploaded), without a search per hexagon"
+        ),
+    )
 
     @field_validator("radius")
     def validate_radius(cls, radius: int) -> int:
@@ -39,11 +66,49 @@ class AmenityFields(BaseModel):
             raise ValidationError("Radius must be positive")
         return radius
 
+    @field_validator("radii")
+    def validate_radii(cls, radii: list[int]) -> list[int]:
+        if any(radius <= 0 for radius in radii):
+            raise ValueError("Radii must be positive")
+        return radii
+
+    @model_validator(mode="after")
+    def validate_bands(self) -> "AmenityFields":
+        if self.bands and len(self.radii) == 0:
+            raise ValueError("Bands need further radii")
+        return self
+
 
 class AmenityQuery(Query, AmenityFields):
     pass
 
 
+class KthNearestFields(AmenityFields):
+    """Distance to the k-th nearest POI of an amenity. If fewer than k
+    POIs are within the radius, radius + penalty (or None) is returned."""
+
+    k: int = Field(ge=1, description="Rank of the POI, 1 is the nearest")
+
+
+class AccessibilityFields(AmenityFields):
+    """Gravity accessibility of an amenity: the sum of exp(-d / beta)
+    over the distances d of the POIs within the radius."""
+
+    beta: float = Field(gt=0, description="Decay distance in meters")
+
+
+class MaterializedFeature(BaseModel):
+    """Dynamic feature precomputed for all hexagons when uploading a city.
+
+    Queries with the same amenity, radius and kind are served from the
+    stored values instead of being computed.
+    """
+
+    amenity: str
+    radius: int = Field(gt=0, description="Radius must be positive")
+    kind: Literal["nearest", "count", "presence"]
+
+
 class DistrictFeatureFields(BaseModel):
     """District static features query fields (for each hexagons).
     These values are comming from districts and are the same for all
@@ -56,15 +121,86 @@ class DistrictFeatureQuery(Query, DistrictFeatureFields):
     pass
 
 
-class MultipleFeaturesQuery(Query):
+class BoundingBox(BaseModel):
+    """Longitude and latitude bounds of an area, e.g. a map viewport."""
+
+    min_lon: float = Field(ge=-180, le=180)
+    min_lat: float = Field(ge=-90, le=90)
+    max_lon: float = Field(ge=-180, le=180)
+    max_lat: float = Field(ge=-90, le=90)
+
+    @model_validator(mode="after")
+    def validate_bounds(self) -> "BoundingBox":
+        if self.min_lon > self.max_lon or self.min_lat > self.max_lat:
+            raise ValueError("Minimum bounds must not exceed maximum bounds")
+        return self
+
+    def to_polygon(self) -> list[tuple[float, float]]:
+        """Exterior ring of the box as (lon, lat) points."""
+        return [
+            (self.min_lon, self.min_lat),
+            (self.max_lon, self.min_lat),
+            (self.max_lon, self.max_lat),
+            (self.min_lon, self.max_lat),
+        ]
+
+
+class AmenityFeaturesFields(BaseModel):
+    """Dynamic features query fields of several amenities."""
+
     nearests: list[AmenityFields] = []
     counts: list[AmenityFields] = []
     presences: list[AmenityFields] = []
+    kth_nearests: list[KthNearestFields] = []
+    accessibilities: list[AccessibilityFields] = []
+
+    @model_validator(mode="after")
+    def validate_radii(self) -> "AmenityFeaturesFields":
+        # Only counts are computed for further radii
+        for type_ in [
+            "nearests",
+            "presences",
+            "kth_nearests",
+            "accessibilities",
+        ]:
+            if any(len(fields.radii) > 0 for fields in getattr(self, type_)):
+                raise ValueError(
+                    f"Radii are only supported for counts, not {type_}"
+                )
+        return self
+
+
+class PointFeaturesQuery(AmenityFeaturesFields):
+    """Dynamic features of arbitrary points instead of hexagons.
+    Approximate counts and presences aren't available for points."""
+
+    city: str = Field(..., description="City name to query data for")
+
+
+class MultipleFeaturesQuery(Query, AmenityFeaturesFields):
     hexagons: DistrictFeatureFields | None = None
+    # Spatial subset of the city, all given filters apply. Hexagons are
+    # selected by their centers.
+    bbox: BoundingBox | None = None
+    polygon: list[tuple[float, float]] | None = Field(
+        default=None,
+        min_length=3,
+        description="Exterior ring of the area as (lon, lat) points",
+    )
+    hex_ids: list[HEX_ID_TYPE] | None = None
+
+    @property
+    def is_subset(self) -> bool:
+        """Whether the query covers only part of the city."""
+        return (
+            self.bbox is not None
+            or self.polygon is not None
+            or self.hex_ids is not None
+        )
 
     def __post_model_init__(self) -> None:
         def check(
-            l_q: list[AmenityFields] | DistrictFeatureFields | None,
+            l_q: Sequence[AmenityFields] | DistrictFeatureFields | None,
         ) -> bool:
             return l_q is None or (
                 not isinstance(l_q, DistrictFeatureFields) and len(l_q) == 0
@@ -74,6 +210,8 @@ class MultipleFeaturesQuery(Query):
             check(self.nearests)
             and check(self.counts)
             and check(self.presences)
+            and check(self.kth_nearests)
+            and check(self.accessibilities)
             and check(self.hexagons)
         ):
             raise ValueError(
@@ -107,6 +245,9 @@ class MultipleFeaturesQuery(Query):
                 amenity=fields.amenity,
                 radius=fields.radius,
                 penalty=fields.penalty,
+                radii=fields.radii,
+                bands=fields.bands,
+                approximate=fields.approximate,
             )
             for fields in getattr(self, type_)
         ]
@@ -1,3 +1,9 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import replace
+from typing import Any, Iterator
+
+import numpy as np
+import numpy.typing as npt
 import pandas as pd
 
 from sucolo_database_services.services.base_service import (
@@ -8,13 +14,19 @@ from sucolo_database_services.services.district_features_service import (
     DistrictFeaturesService,
 )
 from sucolo_database_services.services.dynamic_features_service import (
+    FEATURE_VALUES_TYPE,
     DynamicFeaturesService,
 )
+from sucolo_database_services.services.feature_planner import (
+    PlannedFeature,
+    plan_features,
+)
 from sucolo_database_services.services.fields_and_queries import (
     MultipleFeaturesQuery,
 )
 from sucolo_database_services.services.metadata_service import MetadataService
 from sucolo_database_services.utils.exceptions import CityNotFoundError
+from sucolo_database_services.utils.hex_centers import hexagons_in_polygon
 
 
 class MultipleFeaturesService(BaseService):
@@ -24,17 +36,22 @@ class MultipleFeaturesService(BaseService):
         metadata_service: MetadataService,
         dynamic_features_service: DynamicFeaturesService,
         district_features_service: DistrictFeaturesService,
+        max_concurrent_queries: int = 4,
     ) -> None:
         super().__init__(base_service_dependencies)
         self.metadata_service = metadata_service
         self.dynamic_features_service = dynamic_features_service
         self.district_features_service = district_features_service
+        # Sweeps and district feature reads of one query run at once.
+        self.max_concurrent_queries = max_concurrent_queries
 
     def get_features(self, query: MultipleFeaturesQuery) -> pd.DataFrame:
         """Get multiple features for a given city based on the query parameters.
 
         This method combines different types of features (nearest distances,
         counts, presences, and hexagon features) into a single DataFrame.
+        If the query has a bbox, polygon or hex_ids, only the hexagons in
+        that area are computed and returned.
 
         Args:
             query: DataQuery object containing the query parameters
@@ -46,62 +63,187 @@ class MultipleFeaturesService(BaseService):
         if query.city not in self.metadata_service.get_cities():
             raise CityNotFoundError(f"City {query.city} not found")
 
+        hex_ids = None
+        district_filters = None
+        if query.is_subset:
+            # Only the hexagons of the area are computed and read
+            hex_ids = self._filter_hexagons(
+                query,
+                self._redis_service.read.get_hexagons(
+                    city=query.city, resolution=query.resolution
+                ),
+            )
+            district_filters = self._area_filters(query)
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent_queries
+        ) as executor:
+            return self._get_frame(
+                query,
+                executor,
+                hex_ids=hex_ids,
+                district_filters=district_filters,
+            )
+
+    def iter_features(
+        self, query: MultipleFeaturesQuery, batch_size: int = 10_000
+    ) -> Iterator[pd.DataFrame]:
+        """Get multiple features in batches of hexagons.
+
+        The hexagons are walked in batches and the features of a batch
+        are computed as in `get_features`, limited to the hexagons of the
+        batch: approximate, materialized and cached features are sliced,
+        other amenity features are searched from the batch's hexagon
+        centers and district features are read for the batch's hexagons.
+        Area filters of the query apply as in `get_features`.
+
+        Args:
+            query: DataQuery object containing the query parameters
+            batch_size: Number of hexagons per batch
+
+        Yields:
+            DataFrames of at most `batch_size` hexagons, with the same
+            columns as `get_features`, indexed by hex_id
+        """
+        if batch_size <= 0:
+            raise ValueError("batch_size must be positive.")
+        if query.city not in self.metadata_service.get_cities():
+            raise CityNotFoundError(f"City {query.city} not found")
+
         hex_ids = self._redis_service.read.get_hexagons(
             city=query.city, resolution=query.resolution
         )
-        df = pd.DataFrame(index=pd.Index(hex_ids))
-
-        # Process nearest distances
-        for subquery in query.nearest_queries:
-            nearest_feature = (
-                self.dynamic_features_service.calculate_nearest_distances(
-                    query=subquery
-                )
-            )
-            df = df.join(
-                pd.Series(
-                    nearest_feature,
-                    name="nearest_" + subquery.amenity,
+        if query.is_subset:
+            hex_ids = self._filter_hexagons(query, hex_ids)
+        with ThreadPoolExecutor(
+            max_workers=self.max_concurrent_queries
+        ) as executor:
+            for start in range(0, len(hex_ids), batch_size):
+                batch = hex_ids[start : start + batch_size]
+                yield self._get_frame(
+                    query,
+                    executor,
+                    hex_ids=batch,
+                    district_filters={"hex_ids": batch},
                 )
-            )
 
-        # Process counts
-        for subquery in query.count_queries:
-            count_feature = (
-                self.dynamic_features_service.count_pois_in_distance(
-                    query=subquery,
-                )
+    def _get_frame(
+        self,
+        query: MultipleFeaturesQuery,
+        executor: ThreadPoolExecutor,
+        hex_ids: list[str] | None = None,
+        district_filters: dict[str, Any] | None = None,
+    ) -> pd.DataFrame:
+        """Features of the given hexagons, of all hexagons if None.
+
+        Amenity sweeps and the district features read are independent,
+        so they run concurrently on the (thread-safe) sync clients.
+        """
+        hex_ids_future: Future[list[str]] | None = None
+        if hex_ids is None:
+            hex_ids_future = executor.submit(
+                self._redis_service.read.get_hexagons,
+                city=query.city,
+                resolution=query.resolution,
             )
-            df = df.join(
-                pd.Series(
-                    count_feature,
-                    name="count_" + subquery.amenity,
-                )
+        hexagon_features_future: Future[pd.DataFrame] | None = None
+        if query.hexagons is not None:
+            hexagon_features_future = executor.submit(
+                self.district_features_service.get_hexagon_district_features,
+                city=query.city,
+                resolution=query.resolution,
+                feature_columns=query.hexagons.features,
+                **(district_filters or {}),
             )
 
-        # Process presences
-        for subquery in query.presence_queries:
-            presence_feature = (
-                self.dynamic_features_service.determine_presence_in_distance(
-                    query=subquery,
-                )
-            )
-            df = df.join(
-                pd.Series(
-                    presence_feature,
-                    name="present_" + subquery.amenity,
-                )
+        # Nearest distances, counts and presences of the same amenity
+        # share one Redis sweep
+        sweeps = [
+            replace(sweep, hex_ids=hex_ids) for sweep in plan_features(query)
+        ]
+        sweep_futures = [
+            executor.submit(self.dynamic_features_service.run_sweep, sweep)
+            for sweep in sweeps
+        ]
+        if hex_ids_future is not None:
+            hex_ids = hex_ids_future.result()
+        assert hex_ids is not None
+        index = pd.Index(hex_ids)
+        amenity_features: list[
+            tuple[PlannedFeature, str, FEATURE_VALUES_TYPE]
+        ] = [
+            (feature, feature.column(sweep.amenity), values)
+            for sweep, future in zip(sweeps, sweep_futures)
+            for feature, values in future.result()
+        ]
+        # Columns are filled by row position and the DataFrame is built
+        # once, instead of joining (and copying) it once per feature
+        amenity_features.sort(key=lambda item: item[0].order)
+        columns = {
+            column: _align_values(index, values)
+            for _, column, values in amenity_features
+        }
+
+        if hexagon_features_future is not None:
+            hexagon_features = hexagon_features_future.result().reindex(index)
+            for column in hexagon_features.columns:
+                columns[column] = hexagon_features[column].to_numpy()
+
+        return pd.DataFrame(columns, index=index)
+
+    def _filter_hexagons(
+        self, query: MultipleFeaturesQuery, hex_ids: list[str]
+    ) -> list[str]:
+        """Hexagons of the city within the query's area, in city order.
+
+        The bbox and polygon are resolved to H3 cells by their centers, so
+        the cost depends on the size of the area, not of the city.
+        """
+        areas: list[set[str]] = []
+        if query.bbox is not None:
+            areas.append(
+                hexagons_in_polygon(query.bbox.to_polygon(), query.resolution)
             )
+        if query.polygon is not None:
+            areas.append(hexagons_in_polygon(query.polygon, query.resolution))
+        if query.hex_ids is not None:
+            areas.append(set(query.hex_ids))
+        if len(areas) == 0:
+            return hex_ids
+        area = set.intersection(*areas)
+        return [hex_id for hex_id in hex_ids if hex_id in area]
 
-        # Process hexagon features
-        if query.hexagons is not None:
-            hexagon_features = (
-                self.district_features_service.get_hexagon_district_features(
-                    city=query.city,
-                    resolution=query.resolution,
-                    feature_columns=query.hexagons.features,
+    def _area_filters(self, query: MultipleFeaturesQuery) -> dict[str, Any]:
+        """Area filters of the district features read."""
+        return {
+            "bbox": (
+                (
+                    query.bbox.min_lon,
+                    query.bbox.min_lat,
+                    query.bbox.max_lon,
+                    query.bbox.max_lat,
                 )
-            )
-            df = df.join(hexagon_features)
+                if query.bbox is not None
+                else None
+            ),
+            "polygon": query.polygon,
+            "hex_ids": query.hex_ids,
+        }
+
+
+def _align_values(
+    index: "pd.Index[str]", values: FEATURE_VALUES_TYPE
+) -> npt.NDArray[Any]:
+    """Array of the values of a feature in the order of the index.
 
-        return df
+    Hexagons missing from the values (or with None) are NaN.
+    """
+    array = np.asarray(list(values.values()))
+    if array.dtype == object:
+        array = array.astype(np.float64)
+    if len(values) == len(index) and index.equals(pd.Index(values.keys())):
+        return array
+    rows = index.get_indexer(list(values.keys()))
+    found = rows >= 0
+    aligned = np.full(len(index), np.nan, dtype=np.result_type(array, np.nan))
+    aligned[rows[found]] = array[found]
+    return aligned
@@ -0,0 +1,314 @@
+import abc
+import threading
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.redis_client.service import RedisService
+from sucolo_database_services.services.feature_planner import EngineFeatureKind
+from sucolo_database_services.utils.point_index import PointIndex
+
+HEX_ID_TYPE = str
+
+
+class SpatialEngine(abc.ABC):
+    """Finds the POIs near hexagon centers for dynamic features."""
+
+    # Whether compute_hex_feature is cheaper than deriving several
+    # features from one find_nearest_pois_to_hex_centers call.
+    computes_features: bool = False
+
+    @abc.abstractmethod
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]:
+        """Distances to the POIs within radius of every hexagon center.
+
+        Args:
+            city: City name
+            amenity: Amenity key of the POIs
+            resolution: Hexagon resolution level
+            radius: Search radius in meters
+            count: Maximum number of POIs per hexagon, all if None
+
+        Returns:
+            Dictionary mapping hex_id to distances sorted ascending
+        """
+        pass
+
+    @abc.abstractmethod
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Distances to the POIs within radius of arbitrary points.
+
+        Returns:
+            (offsets, distances) in CSR layout: the distances of point i,
+            sorted ascending, are distances[offsets[i]:offsets[i + 1]]
+        """
+        pass
+
+    def find_presence_near_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+    ) -> dict[HEX_ID_TYPE, int]:
+        """Check for every hexagon if any POI is within the radius.
+
+        Returns:
+            Dictionary mapping hex_id to 1 if a POI is present, 0 if not
+        """
+        nearest = self.find_nearest_pois_to_hex_centers(
+            city=city,
+            amenity=amenity,
+            resolution=resolution,
+            radius=radius,
+            count=1,
+        )
+        return {
+            hex_id: 1 if len(dists) > 0 else 0
+            for hex_id, dists in nearest.items()
+        }
+
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        kind: EngineFeatureKind,
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]]:
+        """Compute a feature of all hexagons as an array.
+
+        Returns:
+            Hexagon ids and aligned values: nearest distances (NaN if no
+            POI is within the radius), counts or presences (0 or 1)
+        """
+        if kind == "presence":
+            presence = self.find_presence_near_hex_centers(
+                city=city,
+                amenity=amenity,
+                resolution=resolution,
+                radius=radius,
+            )
+            return list(presence), np.fromiter(
+                presence.values(), dtype=np.uint8, count=len(presence)
+            )
+        distances = self.find_nearest_pois_to_hex_centers(
+            city=city,
+            amenity=amenity,
+            resolution=resolution,
+            radius=radius,
+            count=None if kind == "count" else 1,
+        )
+        values: npt.NDArray[Any]
+        if kind == "nearest":
+            values = np.fromiter(
+                (dists[0] if dists else np.nan for dists in distances.values()),
+                dtype=np.float64,
+                count=len(distances),
+            )
+        else:
+            values = np.fromiter(
+                (len(dists) for dists in distances.values()),
+                dtype=np.uint32,
+                count=len(distances),
+            )
+        return list(distances), values
+
+    def invalidate(
+        self, city: str | None = None, amenity: str | None = None
+    ) -> None:
+        """Drop cached POIs of a city and amenity (all if None)."""
+        pass
+
+
+class RedisSpatialEngine(SpatialEngine):
+    """Runs one GEORADIUS per hexagon in Redis."""
+
+    def __init__(self, redis_service: RedisService) -> None:
+        self._redis_service = redis_service
+
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]:
+        return self._redis_service.read.find_nearest_pois_to_hex_centers(
+            city=city,
+            amenity=amenity,
+            resolution=resolution,
+            radius=radius,
+            count=count,
+        )
+
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        return self._redis_service.read.find_nearest_pois_to_points(
+            city=city,
+            amenity=amenity,
+            lon=lon,
+            lat=lat,
+            radius=radius,
+            count=count,
+        )
+
+    def find_presence_near_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+    ) -> dict[HEX_ID_TYPE, int]:
+        return self._redis_service.read.find_presence_near_hex_centers(
+            city=city,
+            amenity=amenity,
+            resolution=resolution,
+            radius=radius,
+        )
+
+
+class RedisScriptSpatialEngine(RedisSpatialEngine):
+    """Computes each feature of all hexagons in a Redis script.
+
+    Falls back to GEORADIUS queries for cities uploaded without a
+    hexagon catalogue.
+    """
+
+    computes_features = True
+
+    def compute_hex_feature(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int,
+        kind: EngineFeatureKind,
+    ) -> tuple[list[HEX_ID_TYPE], npt.NDArray[Any]]:
+        result = self._redis_service.read.compute_hex_feature(
+            city=city,
+            amenity=amenity,
+            resolution=resolution,
+            radius=radius,
+            mode=kind,
+        )
+        if result is None:
+            return super().compute_hex_feature(
+                city=city,
+                amenity=amenity,
+                resolution=resolution,
+                radius=radius,
+                kind=kind,
+            )
+        return result
+
+
+class LocalSpatialEngine(SpatialEngine):
+    """Answers all hexagons of a query in-process with NumPy.
+
+    The POIs of an amenity are loaded from Redis once per data
+    generation of the city and kept in a `PointIndex`. Distances follow
+    GEORADIUS: haversine on the Redis earth radius, POIs at their
+    geohash precision and distances rounded to 4 decimals, so the
+    results match `RedisSpatialEngine`.
+    """
+
+    def __init__(self, redis_service: RedisService) -> None:
+        self._redis_service = redis_service
+        # (city, amenity) -> (data generation, index)
+        self._poi_indices: dict[tuple[str, str], tuple[int, PointIndex]] = {}
+        self._lock = threading.Lock()
+
+    def find_nearest_pois_to_hex_centers(
+        self,
+        city: str,
+        amenity: str,
+        resolution: int,
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> dict[HEX_ID_TYPE, list[float]]:
+        poi_index = self.get_poi_index(city=city, amenity=amenity)
+        hex_centers = self._redis_service.read.get_hex_centers(
+            city=city, resolution=resolution
+        )
+        offsets, distances = poi_index.query_radius(
+            lon=hex_centers.lon,
+            lat=hex_centers.lat,
+            radius=radius,
+            count=count,
+        )
+        bounds = offsets.tolist()
+        distance_list = np.round(distances, 4).tolist()
+        return {
+            hex_id: distance_list[bounds[i] : bounds[i + 1]]
+            for i, hex_id in enumerate(hex_centers.hex_ids)
+        }
+
+    def find_nearest_pois_to_points(
+        self,
+        city: str,
+        amenity: str,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: int = 300,
+        count: int | None = 1,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        poi_index = self.get_poi_index(city=city, amenity=amenity)
+        offsets, distances = poi_index.query_radius(
+            lon=lon, lat=lat, radius=radius, count=count
+        )
+        return offsets, np.round(distances, 4)
+
+    def get_poi_index(self, city: str, amenity: str) -> PointIndex:
+        """Get the index of an amenity's POIs, loading it on first use.
+
+        The index is reloaded when the data generation of the city
+        changed, so that writes from other processes are picked up too.
+        """
+        key = (city, amenity)
+        generation = self._redis_service.read.get_generation(city)
+        with self._lock:
+            cached = self._poi_indices.get(key)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        lon, lat = self._redis_service.read.get_poi_coordinates(
+            city=city, amenity=amenity
+        )
+        poi_index = PointIndex(lon=lon, lat=lat)
+        with self._lock:
+            self._poi_indices[key] = (generation, poi_index)
+        return poi_index
+
+    def invalidate(
+        self, city: str | None = None, amenity: str | None = None
+    ) -> None:
+        with self._lock:
+            for key in list(self._poi_indices):
+                if (city is None or key[0] == city) and (
+                    amenity is None or key[1] == amenity
+                ):
+                    del self._poi_indices[key]
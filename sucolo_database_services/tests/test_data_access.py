@@ -1,16 +1,28 @@
+import threading
+
+import numpy as np
 import pandas as pd
 import pytest
 from pydantic import ValidationError
 from pytest_mock import MockerFixture
 
 from sucolo_database_services.data_access import DataAccess
+from sucolo_database_services.services.dynamic_features_service import (
+    FEATURE_VALUES_TYPE,
+)
+from sucolo_database_services.services.feature_planner import (
+    AmenitySweep,
+    PlannedFeature,
+)
 from sucolo_database_services.services.fields_and_queries import (
     AmenityFields,
     AmenityQuery,
+    BoundingBox,
     DistrictFeatureFields,
     MultipleFeaturesQuery,
 )
 from sucolo_database_services.utils.exceptions import CityNotFoundError
+from sucolo_database_services.utils.hex_centers import hex_ids_to_centers
 
 
 def test_city_not_found(data_access: DataAccess, mocker: MockerFixture) -> None:
@@ -54,6 +66,22 @@ def test_invalid_penalty() -> None:
         )
 
 
+def test_invalid_bbox() -> None:
+    with pytest.raises(ValidationError):
+        BoundingBox(min_lon=12.4, min_lat=51.3, max_lon=12.3, max_lat=51.4)
+
+
+def test_invalid_radii() -> None:
+    with pytest.raises(ValidationError):
+        AmenityFields(amenity="shop", radius=500, bands=True)
+    with pytest.raises(ValidationError):
+        MultipleFeaturesQuery(
+            city="leipzig",
+            resolution=9,
+            nearests=[AmenityFields(amenity="shop", radius=500, radii=[1000])],
+        )
+
+
 def test_get_all_indices(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None:
@@ -70,44 +98,34 @@ def test_get_all_indices(
 def test_get_hexagon_static_features(
     data_access: DataAccess, mocker: MockerFixture
 ) -> None:
-    # Mock the get_hexagon_static_features method
+    # Mock the Elasticsearch client behind the columnar hexagon read
+    es = data_access._es_service.read.es
+    mocker.patch.object(es, "count", return_value={"count": 3})
+    mocker.patch.object(es, "open_point_in_time", return_value={"id": "pit"})
+    mocker.patch.object(es, "close_point_in_time")
     mocker.patch.object(
-        data_access._es_service.read,
-        "get_hexagons",
+        es,
+        "search",
         return_value={
-            "hex1": {
-                "type": "hexagon",
-                "polygon": {
-                    "type": "Polygon",
-                    "coordinates": [
-                        [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
-                    ],
-                },
-                "Employed income": 10000,
-                "Average age": 30,
-            },
-            "hex2": {
-                "type": "hexagon",
-                "polygon": {
-                    "type": "Polygon",
-                    "coordinates": [
-                        [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
-                    ],
-                },
-                "Employed income": 20000,
-                "Average age": 40,
-            },
-            "hex3": {
-                "type": "hexagon",
-                "polygon": {
-                    "type": "Polygon",
-                    "coordinates": [
-                        [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
-                    ],
-                },
-                "Employed income": 30000,
-                "Average age": 50,
-            },
+            "hits": {
+                "hits": [
+                    {
+                        "fields": {
+                            "hex_id": [hex_id],
+                            "Employed income": [income],
+                            "Average age": [age],
+                        },
+                        "sort": [i],
+                    }
+                    for i, (hex_id, income, age) in enumerate(
+                        [
+                            ("hex1", 10000.0, 30.0),
+                            ("hex2", 20000.0, 40.0),
+                            ("hex3", 30000.0, 50.0),
+                        ]
+                    )
+                ]
+            }
         },
     )
 
@@ -124,6 +142,8 @@ def test_get_hexagon_static_features(
     assert isinstance(result, pd.DataFrame)
     assert len(result.columns) == len(feature_columns)
     assert result.columns.isin(feature_columns).all()
+    assert result.index.tolist() == ["hex1", "hex2", "hex3"]
+    assert result["Employed income"].tolist() == [10000, 20000, 30000]
 
 
 def test_error_handling(data_access: DataAccess, mocker: MockerFixture) -> None:
@@ -175,32 +195,26 @@ def test_get_multiple_features(
             "8963b1071d7ffff",
         ],
     )
-    mock_calculate_nearests_distances = mocker.patch.object(
-        data_access.dynamic_features,
-        "calculate_nearest_distances",
-        return_value={
-            "8963b10664bffff": 150,
-            "8963b10625bffff": 100,
-            "8963b1071d7ffff": 200,
-        },
+    distances = {
+        "education": [[150.0], [], [200.0]],
+        "hospital": [[150.0], [100.0], [200.0]],
+        "local_business": [[10.0] * 10, [20.0] * 5, [30.0] * 15],
+    }
+    hex_ids = mock_get_hex_centers.return_value
+    mock_find_nearest_pois = mocker.patch.object(
+        data_access._redis_service.read,
+        "find_nearest_pois_to_hex_centers",
+        side_effect=lambda amenity, **kwargs: dict(
+            zip(hex_ids, distances[amenity])
+        ),
     )
-    mock_count_pois_in_distance = mocker.patch.object(
-        data_access.dynamic_features,
-        "count_pois_in_distance",
-        return_value={
-            "8963b10664bffff": 10,
-            "8963b10625bffff": 5,
-            "8963b1071d7ffff": 15,
-        },
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hex_feature", return_value=None
     )
-    mock_determine_presence_in_distance = mocker.patch.object(
-        data_access.dynamic_features,
-        "determine_presence_in_distance",
-        return_value={
-            "8963b10664bffff": 1,
-            "8963b10625bffff": 0,
-            "8963b1071d7ffff": 1,
-        },
+    mock_find_presence = mocker.patch.object(
+        data_access._redis_service.read,
+        "find_presence_near_hex_centers",
+        return_value=dict(zip(hex_ids, [1, 0, 1])),
     )
     mock_get_hexagon_district_features = mocker.patch.object(
         data_access.district_features,
@@ -233,7 +247,7 @@ def test_get_multiple_features(
             "Average age",
         ]
     ).all()
-    assert df["nearest_education"].tolist() == [150, 100, 200]
+    assert df["nearest_education"].tolist() == [150, 600, 200]
     assert df["nearest_hospital"].tolist() == [150, 100, 200]
     assert df["count_local_business"].tolist() == [10, 5, 15]
     assert df["present_station"].tolist() == [1, 0, 1]
@@ -243,7 +257,239 @@ def test_get_multiple_features(
     # Verify each service method was called with correct parameters
     mock_get_cities.assert_called()
     mock_get_hex_centers.assert_called()
-    mock_calculate_nearests_distances.assert_called()
-    mock_count_pois_in_distance.assert_called()
-    mock_determine_presence_in_distance.assert_called()
+    assert mock_find_nearest_pois.call_count == 3
+    mock_find_presence.assert_called_once_with(
+        city="leipzig", amenity="station", resolution=9, radius=200
+    )
     mock_get_hexagon_district_features.assert_called()
+
+
+def test_get_multiple_features_runs_sweeps_concurrently(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None:
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="education", radius=500)],
+        counts=[AmenityFields(amenity="hospital", radius=1000)],
+    )
+    hex_ids = ["8963b10664bffff", "8963b10625bffff"]
+    mocker.patch.object(
+        data_access.metadata, "get_cities", return_value=["leipzig"]
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hexagons", return_value=hex_ids
+    )
+    # Each sweep waits for the other one, so they only finish if they run
+    # at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def run_sweep(
+        sweep: AmenitySweep,
+    ) -> list[tuple[PlannedFeature, FEATURE_VALUES_TYPE]]:
+        barrier.wait()
+        return [
+            (feature, dict(zip(hex_ids, [1.0, 2.0])))
+            for feature in sweep.features
+        ]
+
+    mocker.patch.object(
+        data_access.dynamic_features, "run_sweep", side_effect=run_sweep
+    )
+
+    df = data_access.multiple_features.get_features(query)
+
+    assert df.columns.tolist() == ["nearest_education", "count_hospital"]
+    assert df["count_hospital"].tolist() == [1.0, 2.0]
+
+
+def test_get_multiple_features_aligns_values_to_hexagons(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None:
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        counts=[AmenityFields(amenity="hospital", radius=1000)],
+        hexagons=DistrictFeatureFields(features=["Average age"]),
+    )
+    hex_ids = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+    mocker.patch.object(
+        data_access.metadata, "get_cities", return_value=["leipzig"]
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hexagons", return_value=hex_ids
+    )
+    mocker.patch.object(
+        data_access.dynamic_features,
+        "run_sweep",
+        side_effect=lambda sweep: [
+            (sweep.features[0], {hex_ids[2]: 7, hex_ids[0]: 3})
+        ],
+    )
+    mocker.patch.object(
+        data_access.district_features,
+        "get_hexagon_district_features",
+        return_value=pd.DataFrame(
+            {"Average age": [40, 30]},
+            index=pd.Index([hex_ids[1], hex_ids[0]], name="hex_id"),
+        ),
+    )
+
+    df = data_access.multiple_features.get_features(query)
+
+    assert df.index.tolist() == hex_ids
+    assert df["count_hospital"].tolist()[::2] == [3, 7]
+    assert df["Average age"].tolist()[:2] == [30, 40]
+    assert df.isna().sum().to_dict() == {"count_hospital": 1, "Average age": 1}
+
+
+def test_iter_multiple_features_in_batches(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None:
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="education", radius=500, penalty=100)],
+        hexagons=DistrictFeatureFields(features=["Average age"]),
+    )
+    hex_ids = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+    mocker.patch.object(
+        data_access.metadata, "get_cities", return_value=["leipzig"]
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hexagons", return_value=hex_ids
+    )
+    mock_find_nearest_pois = mocker.patch.object(
+        data_access._redis_service.read,
+        "find_nearest_pois_to_points",
+        side_effect=[
+            (np.array([0, 1, 1]), np.array([150.0])),
+            (np.array([0, 1]), np.array([200.0])),
+        ],
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hex_feature", return_value=None
+    )
+    district_features = pd.DataFrame(
+        {"Average age": [30, 40, 50]},
+        index=pd.Index(hex_ids, name="hex_id"),
+    )
+    mock_get_district_features = mocker.patch.object(
+        data_access.district_features,
+        "get_hexagon_district_features",
+        side_effect=lambda hex_ids, **kwargs: district_features.loc[hex_ids],
+    )
+
+    batches = list(
+        data_access.multiple_features.iter_features(query, batch_size=2)
+    )
+
+    assert [batch.index.tolist() for batch in batches] == [
+        hex_ids[:2],
+        hex_ids[2:],
+    ]
+    df = pd.concat(batches)
+    assert df.columns.tolist() == ["nearest_education", "Average age"]
+    assert df["nearest_education"].tolist() == [150.0, 600.0, 200.0]
+    assert df["Average age"].tolist() == [30, 40, 50]
+    # Each batch only searches and reads its own hexagons
+    lon, _ = hex_ids_to_centers(hex_ids[2:])
+    assert mock_find_nearest_pois.call_args.kwargs["lon"].tolist() == list(lon)
+    assert [
+        call.kwargs["hex_ids"]
+        for call in mock_get_district_features.call_args_list
+    ] == [hex_ids[:2], hex_ids[2:]]
+
+
+def test_iter_multiple_features_slices_materialized_features(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None:
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        counts=[AmenityFields(amenity="education", radius=500)],
+    )
+    hex_ids = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+    mocker.patch.object(
+        data_access.metadata, "get_cities", return_value=["leipzig"]
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hexagons", return_value=hex_ids
+    )
+    mocker.patch.object(
+        data_access._redis_service.read,
+        "get_hex_feature",
+        return_value=(hex_ids, np.array([3, 0, 7], dtype=np.uint32)),
+    )
+    mock_find_nearest_pois = mocker.patch.object(
+        data_access._redis_service.read, "find_nearest_pois_to_points"
+    )
+
+    batches = list(
+        data_access.multiple_features.iter_features(query, batch_size=2)
+    )
+
+    assert [batch["count_education"].tolist() for batch in batches] == [
+        [3, 0],
+        [7],
+    ]
+    mock_find_nearest_pois.assert_not_called()
+
+
+def test_get_multiple_features_for_hex_ids_subset(
+    data_access: DataAccess, mocker: MockerFixture
+) -> None:
+    hex_ids = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="education", radius=500)],
+        counts=[AmenityFields(amenity="school", radius=500, approximate=True)],
+        hexagons=DistrictFeatureFields(features=["Average age"]),
+        hex_ids=[hex_ids[2], hex_ids[0], "8963b1071c3ffff"],
+    )
+    mocker.patch.object(
+        data_access.metadata, "get_cities", return_value=["leipzig"]
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hexagons", return_value=hex_ids
+    )
+    mocker.patch.object(
+        data_access._redis_service.read, "get_hex_feature", return_value=None
+    )
+    # One school in the cell of the first hexagon
+    mocker.patch.object(
+        data_access._redis_service.read,
+        "get_poi_cells",
+        return_value=([hex_ids[0]], np.array([1])),
+    )
+    mock_find_nearest_pois = mocker.patch.object(
+        data_access._redis_service.read,
+        "find_nearest_pois_to_points",
+        return_value=(np.array([0, 1, 2]), np.array([150.0, 200.0])),
+    )
+    mock_find_nearest_pois_to_hex_centers = mocker.patch.object(
+        data_access._redis_service.read, "find_nearest_pois_to_hex_centers"
+    )
+    mock_get_district_features = mocker.patch.object(
+        data_access.district_features,
+        "get_hexagon_district_features",
+        return_value=pd.DataFrame(
+            {"Average age": [50, 30]},
+            index=pd.Index([hex_ids[2], hex_ids[0]], name="hex_id"),
+        ),
+    )
+
+    df = data_access.multiple_features.get_features(query)
+
+    assert df.index.tolist() == [hex_ids[0], hex_ids[2]]
+    assert df["nearest_education"].tolist() == [150.0, 200.0]
+    assert df["count_school"].tolist() == [1, 0]
+    assert df["Average age"].tolist() == [30, 50]
+    # Approximate counts are taken from the POI cells, not searched
+    mock_find_nearest_pois.assert_called_once()
+    assert len(mock_find_nearest_pois.call_args.kwargs["lon"]) == 2
+    mock_find_nearest_pois_to_hex_centers.assert_not_called()
+    assert (
+        mock_get_district_features.call_args.kwargs["hex_ids"] == query.hex_ids
+    )
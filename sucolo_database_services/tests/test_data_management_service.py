@@ -0,0 +1,203 @@
+import logging
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import geopandas as gpd
+import h3
+import numpy as np
+import pytest
+import redis
+from pytest_mock import MockerFixture
+from shapely.geometry import Point, Polygon
+
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService,
+)
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.service import RedisService
+from sucolo_database_services.services.base_service import (
+    BaseServiceDependencies,
+)
+from sucolo_database_services.services.data_management_service import (
+    DataManagementService,
+)
+from sucolo_database_services.services.dynamic_features_service import (
+    DynamicFeaturesService,
+)
+from sucolo_database_services.services.fields_and_queries import (
+    AmenityQuery,
+    MaterializedFeature,
+)
+from sucolo_database_services.services.spatial_engines import LocalSpatialEngine
+from sucolo_database_services.utils.hex_centers import (
+    hex_ids_to_centers,
+    hexagons_near_point,
+)
+from sucolo_database_services.utils.point_index import haversine_distances
+
+POI = (12.38, 51.34)
+
+
+def _catalogue() -> HexCatalogue:
+    cell = h3.latlng_to_cell(*POI, 9)
+    hex_ids = list(h3.grid_disk(cell, 8))
+    return HexCatalogue.from_hex_ids(hex_ids, *hex_ids_to_centers(hex_ids))
+
+
+def test_hexagons_near_point_covers_radius() -> None:
+    catalogue = _catalogue()
+    assert catalogue.lon is not None and catalogue.lat is not None
+    distances = haversine_distances(
+        catalogue.lon,
+        catalogue.lat,
+        np.full(len(catalogue), POI[0]),
+        np.full(len(catalogue), POI[1]),
+    )
+    hex_ids = np.array(catalogue.hex_ids)
+
+    for radius in [50, 300, 800]:
+        near = set(hexagons_near_point(*POI, resolution=9, radius=radius))
+        assert set(hex_ids[distances <= radius]) <= near
+
+
+def test_upsert_poi_recomputes_only_nearby_hexagons() -> None:
+    catalogue = _catalogue()
+    redis_service = MagicMock(spec=RedisService)
+    redis_service.read = MagicMock()
+    redis_service.write = MagicMock()
+    redis_service.write.upsert_poi.return_value = None
+    redis_service.write.delete_poi.return_value = None
+    redis_service.read.get_materialized_features.return_value = {
+        9: [("school", 300, "count"), ("cafe", 300, "count")]
+    }
+    redis_service.read.get_hex_catalogue.return_value = catalogue
+    redis_service.read.get_hex_feature.return_value = (
+        catalogue.hex_ids,
+        np.zeros(len(catalogue), dtype=np.uint32),
+    )
+    redis_service.read.compute_feature_at_points.side_effect = (
+        lambda lon, **kwargs: np.ones(len(lon), dtype=np.uint32)
+    )
+    spatial_engine = MagicMock()
+    service = DataManagementService(
+        BaseServiceDependencies(
+            es_service=MagicMock(spec=ElasticsearchService),
+            redis_service=redis_service,
+            logger=logging.getLogger(__name__),
+        ),
+        spatial_engine=spatial_engine,
+    )
+
+    service.upsert_poi(
+        city="leipzig", amenity="school", poi_id="10", lon=POI[0], lat=POI[1]
+    )
+
+    spatial_engine.invalidate.assert_called_once_with(city="leipzig")
+    # Only the school feature is updated, for hexagons within 300 m
+    redis_service.write.upload_hex_feature.assert_called_once()
+    call = redis_service.write.upload_hex_feature.call_args.kwargs
+    assert (call["amenity"], call["radius"], call["kind"]) == (
+        "school",
+        300,
+        "count",
+    )
+    assert 0 < call["values"].sum() < len(catalogue) / 10
+    lon = redis_service.read.compute_feature_at_points.call_args.kwargs["lon"]
+    assert len(lon) == call["values"].sum()
+    redis_service.write.bump_generation.assert_called_once_with("leipzig")
+
+
+@pytest.fixture
+def real_redis_client() -> Iterator[redis.Redis]:
+    client = redis.Redis(host="localhost", port=6379, db=15)
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not available.")
+    client.flushdb()
+    yield client
+    client.flushdb()
+    client.close()
+
+
+def test_replace_city_data_replaces_redis_data(
+    real_redis_client: redis.Redis, mocker: MockerFixture
+) -> None:
+    mocker.patch.object(
+        DataManagementService, "_upload_city_data_elasticsearch"
+    )
+    redis_service = RedisService(real_redis_client)
+    dependencies = BaseServiceDependencies(
+        es_service=MagicMock(spec=ElasticsearchService),
+        redis_service=redis_service,
+        logger=logging.getLogger(__name__),
+    )
+    dynamic_features = DynamicFeaturesService(
+        dependencies, spatial_engine=LocalSpatialEngine(redis_service)
+    )
+    service = DataManagementService(
+        dependencies, spatial_engine=dynamic_features.spatial_engine
+    )
+    districts = gpd.GeoDataFrame(
+        {"district": ["Mitte"]},
+        geometry=[
+            Polygon(
+                [
+                    (12.37, 51.33),
+                    (12.39, 51.33),
+                    (12.39, 51.35),
+                    (12.37, 51.35),
+                ]
+            )
+        ],
+    )
+    old_pois = gpd.GeoDataFrame(
+        {"amenity": ["school", "bench"], "wheelchair": ["yes", "no"]},
+        geometry=[Point(12.375, 51.335), Point(12.38, 51.34)],
+    )
+    new_pois = gpd.GeoDataFrame(
+        {"amenity": ["school", "school"], "wheelchair": ["no", "no"]},
+        geometry=[Point(12.385, 51.345), Point(12.385, 51.345)],
+    )
+    query = AmenityQuery(
+        city="leipzig", resolution=9, amenity="school", radius=300
+    )
+
+    counts = []
+    for pois in [old_pois, new_pois]:
+        service.upload_city_data(
+            city="leipzig",
+            pois_gdf=pois,
+            district_gdf=districts,
+            replace_if_index_exists=True,
+            materialized_features=[
+                MaterializedFeature(amenity="school", radius=300, kind="count")
+            ],
+            poi_cell_resolution=10,
+        )
+        # Materialized, approximate and computed counts
+        counts.append(
+            [
+                dynamic_features.count_pois_in_distance(query),
+                dynamic_features.count_pois_in_distance(
+                    query.model_copy(update={"approximate": True})
+                ),
+                dynamic_features.count_pois_in_distance(
+                    query.model_copy(update={"radius": 200})
+                ),
+            ]
+        )
+
+    for old, new in zip(*counts):
+        old_hexagons = {hex_id for hex_id, count in old.items() if count > 0}
+        new_hexagons = {hex_id for hex_id, count in new.items() if count > 0}
+        # The replaced and the new school are far apart
+        assert len(old_hexagons) > 0 and len(new_hexagons) > 0
+        assert old_hexagons.isdisjoint(new_hexagons)
+    assert set(counts[1][0].values()) == {0, 2}
+    keys = {key.decode() for key in real_redis_client.scan_iter()}
+    assert "leipzig_bench_pois" not in keys
+    assert "leipzig_school_wheelchair_pois" not in keys
+    assert not any(
+        "staging" in key for key in keys - {"leipzig_staging_generation"}
+    )
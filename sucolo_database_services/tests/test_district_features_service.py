@@ -10,6 +10,7 @@ from sucolo_database_services.services.base_service import (
 from sucolo_database_services.services.district_features_service import (
     DistrictFeaturesService,
 )
+from sucolo_database_services.services.feature_cache import FeatureCache
 
 
 @pytest.fixture
@@ -37,31 +38,20 @@ def test_get_hexagon_district_features_returns_dataframe(
     city = "testcity"
     feature_columns = ["population", "area"]
     resolution = 9
-    # Mocked data returned by es_service.read.get_hexagons
-    mock_data = {
-        "hex1": {
-            "population": 100,
-            "area": 50,
-            "hex_id": "hex1",
-            "type": "hex",
-            "location": [0, 0],
-            "polygon": None,
-        },
-        "hex2": {
-            "population": 200,
-            "area": 60,
-            "hex_id": "hex2",
-            "type": "hex",
-            "location": [1, 1],
-            "polygon": None,
-        },
-    }
+    # Mocked data returned by es_service.read.get_hexagon_columns
+    mock_data = pd.DataFrame(
+        {"population": [100, 200], "area": [50, 60], "district": None},
+        index=pd.Index(["hex1", "hex2"], name="hex_id"),
+    )
 
-    mock_get_hexagons = mocker.patch.object(
+    mock_get_hexagon_columns = mocker.patch.object(
         district_features_service._es_service.read,
-        "get_hexagons",
+        "get_hexagon_columns",
         return_value=mock_data,
     )
+    mock_get_districts = mocker.patch.object(
+        district_features_service._es_service.read, "get_districts"
+    )
 
     df = district_features_service.get_hexagon_district_features(
         city=city, feature_columns=feature_columns, resolution=resolution
@@ -73,9 +63,94 @@ def test_get_hexagon_district_features_returns_dataframe(
     assert set(df.index) == {"hex1", "hex2"}
     assert df.loc["hex1", "population"] == 100
     assert df.loc["hex2", "area"] == 60
-    # Should call the underlying es_service.read.get_hexagons
-    mock_get_hexagons.assert_called_once_with(
+    # Should call the underlying es_service.read.get_hexagon_columns
+    mock_get_hexagon_columns.assert_called_once_with(
         index_name=city,
         features=feature_columns,
         resolution=resolution,
+        string_features=["district"],
+    )
+    # Legacy hexagons carry the features themselves
+    mock_get_districts.assert_not_called()
+
+
+def test_get_hexagon_district_features_joins_normalized_districts(
+    district_features_service: DistrictFeaturesService,
+    mocker: MockerFixture,
+) -> None:
+    feature_columns = ["population", "area"]
+    mocker.patch.object(
+        district_features_service._es_service.read,
+        "get_hexagon_columns",
+        return_value=pd.DataFrame(
+            {
+                "population": float("nan"),
+                "area": float("nan"),
+                "district": ["Mitte", "Ost", "Mitte"],
+            },
+            index=pd.Index(["hex1", "hex2", "hex3"], name="hex_id"),
+        ),
+    )
+    mock_get_districts = mocker.patch.object(
+        district_features_service._es_service.read,
+        "get_districts",
+        return_value={
+            "Mitte": {"district": "Mitte", "population": 100, "area": 50},
+            "Ost": {"district": "Ost", "population": 200, "area": 60},
+        },
+    )
+
+    df = district_features_service.get_hexagon_district_features(
+        city="testcity", feature_columns=feature_columns, resolution=9
+    )
+
+    assert list(df.columns) == feature_columns
+    assert df["population"].tolist() == [100, 200, 100]
+    assert df["area"].tolist() == [50, 60, 50]
+    mock_get_districts.assert_called_once_with(
+        index_name="testcity", features=feature_columns
+    )
+
+
+def test_cached_district_features_are_sliced_per_batch(
+    base_service_dependencies: BaseServiceDependencies,
+    mocker: MockerFixture,
+) -> None:
+    hex_ids = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+    service = DistrictFeaturesService(
+        base_service_dependencies, feature_cache=FeatureCache()
+    )
+    mocker.patch.object(
+        service._redis_service.read, "get_generation", return_value=1
+    )
+    get_hexagon_columns = mocker.patch.object(
+        service._es_service.read,
+        "get_hexagon_columns",
+        return_value=pd.DataFrame(
+            {"population": [100.0, 200.0, 300.0], "district": None},
+            index=pd.Index(hex_ids, name="hex_id"),
+        ),
+    )
+
+    batches = [
+        service.get_hexagon_district_features(
+            city="testcity",
+            feature_columns=["population"],
+            resolution=9,
+            hex_ids=batch,
+        )
+        for batch in [hex_ids[:2], hex_ids[2:]]
+    ]
+
+    assert batches[0]["population"].to_dict() == {
+        hex_ids[0]: 100.0,
+        hex_ids[1]: 200.0,
+    }
+    assert batches[1]["population"].to_dict() == {hex_ids[2]: 300.0}
+    # All hexagons are read once for both batches
+    get_hexagon_columns.assert_called_once_with(
+        index_name="testcity",
+        resolution=9,
+        features=["population"],
+        string_features=["district"],
     )
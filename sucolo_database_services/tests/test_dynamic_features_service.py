@@ -0,0 +1,330 @@
+import logging
+from typing import Any
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from sucolo_database_services.elasticsearch_client.service import (
+    ElasticsearchService,
+)
+from sucolo_database_services.redis_client.service import RedisService
+from sucolo_database_services.services.base_service import (
+    BaseServiceDependencies,
+)
+from sucolo_database_services.services.dynamic_features_service import (
+    DynamicFeaturesService,
+)
+from sucolo_database_services.services.feature_cache import FeatureCache
+from sucolo_database_services.services.feature_planner import plan_features
+from sucolo_database_services.services.fields_and_queries import (
+    AccessibilityFields,
+    AmenityFields,
+    AmenityQuery,
+    KthNearestFields,
+    MultipleFeaturesQuery,
+    PointFeaturesQuery,
+)
+from sucolo_database_services.services.spatial_engines import (
+    RedisScriptSpatialEngine,
+)
+
+
+@pytest.fixture
+def redis_service() -> MagicMock:
+    redis_service = MagicMock(spec=RedisService)
+    redis_service.read = MagicMock()
+    # Nothing is materialized
+    redis_service.read.get_hex_feature.return_value = None
+    return redis_service
+
+
+@pytest.fixture
+def base_service_dependencies(
+    redis_service: MagicMock,
+) -> BaseServiceDependencies:
+    return BaseServiceDependencies(
+        es_service=MagicMock(spec=ElasticsearchService),
+        redis_service=redis_service,
+        logger=logging.getLogger(__name__),
+    )
+
+
+@pytest.fixture
+def dynamic_features_service(
+    base_service_dependencies: BaseServiceDependencies,
+) -> DynamicFeaturesService:
+    return DynamicFeaturesService(base_service_dependencies)
+
+
+def test_plan_features_groups_subqueries_by_amenity() -> None:
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="school", radius=300, penalty=50)],
+        counts=[
+            AmenityFields(amenity="school", radius=500),
+            AmenityFields(amenity="cafe", radius=200),
+        ],
+        presences=[AmenityFields(amenity="cafe", radius=100)],
+    )
+
+    sweeps = plan_features(query)
+
+    assert [(s.amenity, s.radius, s.count) for s in sweeps] == [
+        ("school", 500, None),
+        ("cafe", 200, None),
+    ]
+    assert [
+        (f.column(sweep.amenity), f.order)
+        for sweep in sweeps
+        for f in sweep.features
+    ] == [
+        ("nearest_school", 0),
+        ("count_school", 1),
+        ("count_cafe", 2),
+        ("present_cafe", 3),
+    ]
+
+
+def test_run_sweep_derives_features_from_one_query(
+    redis_service: MagicMock,
+    dynamic_features_service: DynamicFeaturesService,
+) -> None:
+    redis_service.read.find_nearest_pois_to_hex_centers.return_value = {
+        "a": [120.0, 280.0, 450.0],
+        "b": [350.0],
+        "c": [],
+    }
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="school", radius=300, penalty=50)],
+        counts=[AmenityFields(amenity="school", radius=500)],
+        presences=[AmenityFields(amenity="school", radius=200)],
+    )
+    (sweep,) = plan_features(query)
+
+    results = dynamic_features_service.run_sweep(sweep)
+
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_called_once_with(
+        city="leipzig", amenity="school", resolution=9, radius=500, count=None
+    )
+    assert [dict(values) for _, values in results] == [
+        {"a": 120.0, "b": 350, "c": 350},
+        {"a": 3, "b": 1, "c": 0},
+        {"a": 1, "b": 0, "c": 0},
+    ]
+
+
+def test_run_sweep_bins_multi_radius_counts(
+    redis_service: MagicMock,
+    dynamic_features_service: DynamicFeaturesService,
+) -> None:
+    redis_service.read.find_nearest_pois_to_hex_centers.return_value = {
+        "a": [120.0, 300.0, 450.0, 900.0],
+        "b": [],
+        "c": [510.0],
+    }
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        counts=[
+            AmenityFields(amenity="school", radius=300, radii=[1000, 500]),
+            AmenityFields(
+                amenity="school", radius=300, radii=[1000, 500], bands=True
+            ),
+        ],
+    )
+    (sweep,) = plan_features(query)
+
+    results = dynamic_features_service.run_sweep(sweep)
+
+    assert [(f.column("school"), dict(values)) for f, values in results] == [
+        ("count_school_300", {"a": 2, "b": 0, "c": 0}),
+        ("count_school_500", {"a": 3, "b": 0, "c": 0}),
+        ("count_school_1000", {"a": 4, "b": 0, "c": 1}),
+        ("count_school_0_300", {"a": 2, "b": 0, "c": 0}),
+        ("count_school_300_500", {"a": 1, "b": 0, "c": 0}),
+        ("count_school_500_1000", {"a": 1, "b": 0, "c": 1}),
+    ]
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_called_once_with(
+        city="leipzig", amenity="school", resolution=9, radius=1000, count=None
+    )
+
+
+def test_run_sweep_computes_kth_nearest_and_accessibility(
+    redis_service: MagicMock,
+    dynamic_features_service: DynamicFeaturesService,
+) -> None:
+    redis_service.read.find_nearest_pois_to_hex_centers.return_value = {
+        "a": [100.0, 200.0, 600.0],
+        "b": [],
+    }
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        kth_nearests=[
+            KthNearestFields(amenity="school", radius=500, k=2, penalty=0),
+            KthNearestFields(amenity="school", radius=500, k=3),
+        ],
+        accessibilities=[
+            AccessibilityFields(amenity="school", radius=500, beta=100.0)
+        ],
+    )
+    (sweep,) = plan_features(query)
+
+    results = dynamic_features_service.run_sweep(sweep)
+
+    assert [(f.column("school"), dict(v)) for f, v in results[:2]] == [
+        ("nearest_school_k2", {"a": 200.0, "b": 500}),
+        ("nearest_school_k3", {"a": None, "b": None}),
+    ]
+    feature, accessibility = results[2]
+    assert feature.column("school") == "accessibility_school"
+    assert accessibility["a"] == np.exp(-1.0) + np.exp(-2.0)
+    assert accessibility["b"] == 0.0
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_called_once_with(
+        city="leipzig", amenity="school", resolution=9, radius=500, count=None
+    )
+
+
+def test_script_engine_computes_each_feature(
+    redis_service: MagicMock,
+    base_service_dependencies: BaseServiceDependencies,
+) -> None:
+    replies = {
+        "nearest": np.array([120.0, np.nan]),
+        "count": np.array([3, 0], dtype=np.uint32),
+    }
+    redis_service.read.compute_hex_feature.side_effect = (
+        lambda mode, **kwargs: (["a", "b"], replies[mode])
+    )
+    service = DynamicFeaturesService(
+        base_service_dependencies,
+        spatial_engine=RedisScriptSpatialEngine(redis_service),
+    )
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="school", radius=300, penalty=50)],
+        counts=[AmenityFields(amenity="school", radius=500)],
+    )
+    (sweep,) = plan_features(query)
+
+    results = service.run_sweep(sweep)
+
+    assert [dict(values) for _, values in results] == [
+        {"a": 120.0, "b": 350},
+        {"a": 3, "b": 0},
+    ]
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_not_called()
+    assert [
+        call.kwargs["radius"]
+        for call in redis_service.read.compute_hex_feature.call_args_list
+    ] == [300, 500]
+
+
+def test_run_sweep_serves_materialized_features(
+    redis_service: MagicMock,
+    dynamic_features_service: DynamicFeaturesService,
+) -> None:
+    def get_hex_feature(kind: str, **kwargs: Any) -> Any:
+        if kind == "nearest":
+            return ["a", "b"], np.array([120.0, np.nan])
+        return None
+
+    redis_service.read.get_hex_feature.side_effect = get_hex_feature
+    redis_service.read.find_nearest_pois_to_hex_centers.return_value = {
+        "a": [120.0, 280.0],
+        "b": [],
+    }
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="school", radius=300, penalty=50)],
+        counts=[AmenityFields(amenity="school", radius=500)],
+    )
+    (sweep,) = plan_features(query)
+
+    results = dynamic_features_service.run_sweep(sweep)
+
+    assert [(f.kind, dict(values)) for f, values in results] == [
+        ("nearest", {"a": 120.0, "b": 350}),
+        ("count", {"a": 2, "b": 0}),
+    ]
+    # Only the count is computed live
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_called_once_with(
+        city="leipzig", amenity="school", resolution=9, radius=500, count=None
+    )
+
+
+def test_get_point_features_returns_columns(
+    redis_service: MagicMock,
+    dynamic_features_service: DynamicFeaturesService,
+) -> None:
+    redis_service.read.find_nearest_pois_to_points.return_value = (
+        np.array([0, 2, 2, 3]),
+        np.array([120.0, 280.0, 450.0]),
+    )
+    query = PointFeaturesQuery(
+        city="leipzig",
+        nearests=[AmenityFields(amenity="school", radius=300, penalty=50)],
+        counts=[AmenityFields(amenity="school", radius=500)],
+        presences=[AmenityFields(amenity="school", radius=300)],
+    )
+
+    df = dynamic_features_service.get_point_features(
+        query, lon=np.array([12.37, 12.38, 12.39]), lat=np.full(3, 51.34)
+    )
+
+    assert list(df.columns) == [
+        "nearest_school",
+        "count_school",
+        "present_school",
+    ]
+    assert df["nearest_school"].tolist() == [120.0, 350.0, 350.0]
+    assert df["count_school"].tolist() == [2, 0, 1]
+    assert df["present_school"].tolist() == [1, 0, 0]
+    redis_service.read.find_nearest_pois_to_points.assert_called_once()
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_not_called()
+
+
+def test_run_sweep_caches_features_per_generation(
+    redis_service: MagicMock,
+    base_service_dependencies: BaseServiceDependencies,
+) -> None:
+    redis_service.read.find_nearest_pois_to_hex_centers.return_value = {
+        "a": [120.0],
+        "b": [],
+    }
+    redis_service.read.get_generation.return_value = 1
+    service = DynamicFeaturesService(
+        base_service_dependencies,
+        feature_cache=FeatureCache(),
+    )
+    query = MultipleFeaturesQuery(
+        city="leipzig",
+        resolution=9,
+        nearests=[AmenityFields(amenity="school", radius=300)],
+        counts=[AmenityFields(amenity="school", radius=300)],
+    )
+    (sweep,) = plan_features(query)
+
+    first = service.run_sweep(sweep)
+    second = service.run_sweep(sweep)
+    counts = service.count_pois_in_distance(
+        AmenityQuery(city="leipzig", resolution=9, amenity="school", radius=300)
+    )
+
+    assert [dict(values) for _, values in second] == [
+        dict(values) for _, values in first
+    ]
+    assert dict(second[0][1]) == {"a": 120.0, "b": None}
+    assert counts == {"a": 1, "b": 0}
+    redis_service.read.find_nearest_pois_to_hex_centers.assert_called_once()
+
+    # New data generation, e.g. after a POI update
+    redis_service.read.get_generation.return_value = 2
+    service.run_sweep(sweep)
+    assert redis_service.read.find_nearest_pois_to_hex_centers.call_count == 2
@@ -0,0 +1,206 @@
+from typing import Any
+from unittest.mock import MagicMock
+
+import pytest
+from pytest_mock import MockerFixture
+
+from sucolo_database_services.elasticsearch_client.read_repository import (
+    ElasticsearchReadRepository,
+)
+
+
+def _hex_hit(hex_id: str, sort: int) -> dict[str, Any]:
+    return {
+        "_id": f"doc_{hex_id}",
+        "_source": {"hex_id": hex_id, "Average age": 30.0},
+        "sort": [sort],
+    }
+
+
+@pytest.fixture
+def es_client() -> MagicMock:
+    es = MagicMock()
+    es.open_point_in_time.return_value = {"id": "pit_0"}
+    return es
+
+
+def test_iter_hexagons_follows_search_after_until_last_page(
+    es_client: MagicMock,
+) -> None:
+    es_client.search.side_effect = [
+        {"pit_id": "pit_1", "hits": {"hits": [_hex_hit("a", 0)]}},
+        {"pit_id": "pit_2", "hits": {"hits": [_hex_hit("b", 1)]}},
+        {"pit_id": "pit_2", "hits": {"hits": []}},
+    ]
+    repository = ElasticsearchReadRepository(es_client)
+
+    result = list(
+        repository.iter_hexagons(
+            index_name="leipzig",
+            resolution=9,
+            features=["Average age"],
+            page_size=1,
+        )
+    )
+
+    assert [hex_id for hex_id, _ in result] == ["a", "b"]
+    es_client.open_point_in_time.assert_called_once_with(
+        index="leipzig", keep_alive="1m"
+    )
+    bodies = [call.kwargs["body"] for call in es_client.search.call_args_list]
+    assert "search_after" not in bodies[0]
+    assert bodies[1]["search_after"] == [0]
+    assert bodies[1]["pit"]["id"] == "pit_1"
+    assert bodies[2]["search_after"] == [1]
+    assert all(body["size"] == 1 for body in bodies)
+    es_client.close_point_in_time.assert_called_once_with(id="pit_2")
+
+
+def test_get_hexagons_stops_on_short_page(es_client: MagicMock) -> None:
+    es_client.search.return_value = {
+        "pit_id": "pit_1",
+        "hits": {"hits": [_hex_hit("a", 0), _hex_hit("b", 1)]},
+    }
+    repository = ElasticsearchReadRepository(es_client)
+
+    result = repository.get_hexagons(index_name="leipzig", resolution=9)
+
+    assert set(result) == {"a", "b"}
+    es_client.search.assert_called_once()
+    es_client.close_point_in_time.assert_called_once_with(id="pit_1")
+
+
+def test_point_in_time_closed_when_search_fails(es_client: MagicMock) -> None:
+    es_client.search.side_effect = RuntimeError("boom")
+    repository = ElasticsearchReadRepository(es_client)
+
+    with pytest.raises(RuntimeError):
+        repository.get_pois(index_name="leipzig")
+
+    es_client.close_point_in_time.assert_called_once_with(id="pit_0")
+
+
+def test_sliced_get_hexagons_merges_all_slices(es_client: MagicMock) -> None:
+    def search(body: dict[str, Any]) -> dict[str, Any]:
+        slice_id = body["slice"]["id"]
+        assert body["slice"]["max"] == 3
+        assert body["pit"]["id"] == "pit_0"
+        return {"hits": {"hits": [_hex_hit(f"hex_{slice_id}", slice_id)]}}
+
+    es_client.search.side_effect = search
+    repository = ElasticsearchReadRepository(es_client)
+
+    result = repository.get_hexagons(
+        index_name="leipzig", resolution=9, slices=3
+    )
+
+    assert set(result) == {"hex_0", "hex_1", "hex_2"}
+    assert es_client.search.call_count == 3
+    es_client.open_point_in_time.assert_called_once()
+    es_client.close_point_in_time.assert_called_once_with(id="pit_0")
+
+
+def test_get_hexagon_columns_skips_source(es_client: MagicMock) -> None:
+    # Count is lower than the number of hits, arrays have to grow.
+    es_client.count.return_value = {"count": 1}
+    es_client.search.return_value = {
+        "hits": {
+            "hits": [
+                {
+                    "fields": {
+                        "hex_id": ["a"],
+                        "district": ["Mitte"],
+                        "Average age": [30.0],
+                    },
+                    "sort": [0],
+                },
+                {
+                    "fields": {"hex_id": ["b"], "Average age": [40.0]},
+                    "sort": [1],
+                },
+                {"fields": {"hex_id": ["c"], "district": ["Ost"]}, "sort": [2]},
+            ]
+        }
+    }
+    repository = ElasticsearchReadRepository(es_client)
+
+    df = repository.get_hexagon_columns(
+        index_name="leipzig",
+        resolution=9,
+        features=["Average age"],
+        string_features=["district"],
+    )
+
+    body = es_client.search.call_args.kwargs["body"]
+    assert body["_source"] is False
+    assert body["docvalue_fields"] == ["Average age"]
+    assert body["fields"] == ["hex_id", "district"]
+    assert df.index.name == "hex_id"
+    assert df.index.tolist() == ["a", "b", "c"]
+    assert df["Average age"].tolist()[:2] == [30.0, 40.0]
+    assert df["Average age"].isna().tolist() == [False, False, True]
+    assert df["district"].tolist() == ["Mitte", None, "Ost"]
+
+
+def test_get_hexagon_columns_filters_area(es_client: MagicMock) -> None:
+    es_client.count.return_value = {"count": 0}
+    es_client.search.return_value = {"hits": {"hits": []}}
+    repository = ElasticsearchReadRepository(es_client)
+
+    repository.get_hexagon_columns(
+        index_name="leipzig",
+        resolution=9,
+        features=["Average age"],
+        bbox=(12.3, 51.3, 12.4, 51.4),
+        polygon=[(12.3, 51.3), (12.4, 51.3), (12.4, 51.4)],
+        hex_ids=["a", "b"],
+    )
+
+    filters = es_client.search.call_args.kwargs["body"]["query"]["bool"][
+        "filter"
+    ]
+    assert filters[0]["geo_bounding_box"]["location"] == {
+        "top_left": {"lon": 12.3, "lat": 51.4},
+        "bottom_right": {"lon": 12.4, "lat": 51.3},
+    }
+    ring = filters[1]["geo_shape"]["location"]["shape"]["coordinates"][0]
+    assert ring[0] == ring[-1] == [12.3, 51.3]
+    assert filters[2] == {"terms": {"hex_id": ["a", "b"]}}
+    count_query = es_client.count.call_args.kwargs["body"]["query"]
+    assert count_query["bool"]["filter"] == filters
+
+
+def test_get_hexagon_columns_chunks_ids(
+    es_client: MagicMock, mocker: MockerFixture
+) -> None:
+    mocker.patch(
+        "sucolo_database_services.elasticsearch_client.read_repository"
+        ".MAX_TERMS_COUNT",
+        2,
+    )
+    es_client.count.return_value = {"count": 2}
+
+    def search(body: dict[str, Any]) -> dict[str, Any]:
+        ids = body["query"]["bool"]["filter"][0]["terms"]["hex_id"]
+        return {
+            "hits": {
+                "hits": [
+                    {"fields": {"hex_id": [hex_id], "Average age": [30.0]}}
+                    for hex_id in ids
+                ]
+            }
+        }
+
+    es_client.search.side_effect = search
+    repository = ElasticsearchReadRepository(es_client)
+
+    df = repository.get_hexagon_columns(
+        index_name="leipzig",
+        resolution=9,
+        features=["Average age"],
+        hex_ids=["a", "b", "c"],
+    )
+
+    assert es_client.search.call_count == 2
+    assert df.index.tolist() == ["a", "b", "c"]
+    assert df["Average age"].tolist() == [30.0] * 3
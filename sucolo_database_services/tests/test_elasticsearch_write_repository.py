@@ -0,0 +1,134 @@
+from typing import Any, Iterator
+from unittest.mock import MagicMock
+
+import geopandas as gpd
+import pytest
+from pytest_mock import MockerFixture
+from shapely.geometry import Point, Polygon
+
+from sucolo_database_services.elasticsearch_client.write_repository import (
+    BulkSettings,
+    ElasticsearchWriteRepository,
+)
+
+
+@pytest.fixture
+def es_client() -> MagicMock:
+    es = MagicMock()
+    es.indices.get_settings.return_value = {
+        "leipzig": {"settings": {"index": {"refresh_interval": "5s"}}}
+    }
+    return es
+
+
+@pytest.fixture
+def streamed_chunks(mocker: MockerFixture) -> list[list[dict[str, Any]]]:
+    """Patch streaming_bulk; every document with "fail" is rejected."""
+    chunks: list[list[dict[str, Any]]] = []
+
+    def streaming_bulk(
+        client: Any, actions: list[dict[str, Any]], **kwargs: Any
+    ) -> Iterator[tuple[bool, dict[str, Any]]]:
+        assert kwargs["max_retries"] == 5
+        chunks.append(actions)
+        for action in actions:
+            yield "fail" not in action, {"index": {"status": 400}}
+
+    mocker.patch(
+        "elasticsearch.helpers.streaming_bulk", side_effect=streaming_bulk
+    )
+    return chunks
+
+
+def test_bulk_ingest_chunks_and_reports_failures(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None:
+    repository = ElasticsearchWriteRepository(
+        es_client,
+        bulk_settings=BulkSettings(thread_count=2, chunk_size=3, max_retries=5),
+    )
+    docs: list[dict[str, Any]] = [{"n": i} for i in range(7)]
+    docs.append({"fail": True})
+
+    result = repository.bulk_ingest(index_name="leipzig", actions=docs)
+
+    assert sorted(len(chunk) for chunk in streamed_chunks) == [2, 3, 3]
+    assert result.docs_indexed == 7
+    assert len(result.failures) == 1
+    assert result.seconds > 0
+    # Refreshes are disabled during the load and restored afterwards
+    settings_calls = es_client.indices.put_settings.call_args_list
+    assert [call.kwargs["settings"] for call in settings_calls] == [
+        {"index": {"refresh_interval": "-1"}},
+        {"index": {"refresh_interval": "5s"}},
+    ]
+    es_client.indices.refresh.assert_called_once_with(index="leipzig")
+
+
+def test_bulk_ingest_keeps_disabled_refresh(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None:
+    es_client.indices.get_settings.return_value = {
+        "leipzig__v2": {"settings": {"index": {"refresh_interval": "-1"}}}
+    }
+    repository = ElasticsearchWriteRepository(
+        es_client, bulk_settings=BulkSettings(max_retries=5)
+    )
+
+    result = repository.bulk_ingest(
+        index_name="leipzig__v2", actions=[{"n": 1}]
+    )
+
+    assert result.docs_indexed == 1
+    es_client.indices.put_settings.assert_not_called()
+
+
+def test_upload_districts_uses_district_as_id(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None:
+    square = Polygon([(0, 0), (1, 0), (1, 1), (0, 1)])
+    gdf = gpd.GeoDataFrame(
+        {
+            "id": [1, 2],
+            "district": ["Mitte", "Ost"],
+            "Average age": [40.0, 42.0],
+            "geometry": [square, square],
+        }
+    )
+    repository = ElasticsearchWriteRepository(
+        es_client, bulk_settings=BulkSettings(max_retries=5)
+    )
+
+    result = repository.upload_districts(index_name="leipzig", gdf=gdf)
+
+    assert result.docs_indexed == 2
+    docs = streamed_chunks[0]
+    assert [doc["_id"] for doc in docs] == ["Mitte", "Ost"]
+    assert docs[0]["type"] == "district"
+    assert docs[0]["polygon"].startswith("POLYGON")
+    assert "geometry" not in docs[0] and "id" not in docs[0]
+    # The input GeoDataFrame is left untouched
+    assert "polygon" not in gdf.columns
+
+
+def test_upload_pois_adds_extra_features_per_poi(
+    es_client: MagicMock, streamed_chunks: list[list[dict[str, Any]]]
+) -> None:
+    gdf = gpd.GeoDataFrame(
+        {
+            "amenity": ["school", "cafe"],
+            "wheelchair": ["yes", "no"],
+            "geometry": [Point(12.3, 51.3), Point(12.4, 51.4)],
+        }
+    )
+    repository = ElasticsearchWriteRepository(
+        es_client, bulk_settings=BulkSettings(max_retries=5)
+    )
+
+    repository.upload_pois(
+        index_name="leipzig", gdf=gdf, extra_features=["wheelchair"]
+    )
+
+    docs = streamed_chunks[0]
+    assert [doc["wheelchair"] for doc in docs] == ["yes", "no"]
+    assert docs[1]["location"] == {"lon": 12.4, "lat": 51.4}
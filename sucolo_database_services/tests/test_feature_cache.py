@@ -0,0 +1,63 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sucolo_database_services.redis_client.service import RedisService
+from sucolo_database_services.services.feature_cache import (
+    CachedValues,
+    FeatureCache,
+)
+
+HEX_IDS = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+
+
+def test_cached_values_round_trip() -> None:
+    entry = CachedValues.from_mapping(dict(zip(HEX_IDS, [120.0, None, 3.5])))
+
+    restored = CachedValues.from_bytes(entry.to_bytes())
+
+    assert restored.hex_ids == HEX_IDS
+    assert restored.to_mapping() == dict(zip(HEX_IDS, [120.0, None, 3.5]))
+    counts = CachedValues.from_mapping(dict(zip(HEX_IDS, [1, 0, 2])))
+    assert counts.to_mapping() == dict(zip(HEX_IDS, [1, 0, 2]))
+    # Hexagons without a value are skipped
+    selected = counts.select([HEX_IDS[2], "8963b10664bfff0"])
+    assert selected.to_mapping() == {HEX_IDS[2]: 2}
+
+
+def test_lru_is_bounded_in_bytes() -> None:
+    entry = CachedValues.from_hex_ids(HEX_IDS, np.zeros(3))
+    cache = FeatureCache(max_bytes=2 * entry.nbytes)
+
+    cache.put("leipzig", "a", entry)
+    cache.put("leipzig", "b", entry)
+    assert cache.get("leipzig", "a") is entry
+    cache.put("leipzig", "c", entry)
+
+    # "b" is the least recently used entry
+    assert cache.get("leipzig", "b") is None
+    assert cache.get("leipzig", "a") is entry
+    assert cache.get("leipzig", "c") is entry
+    assert cache.nbytes == 2 * entry.nbytes
+
+
+def test_redis_tier_is_shared() -> None:
+    redis_service = MagicMock(spec=RedisService)
+    redis_service.read = MagicMock()
+    redis_service.write = MagicMock()
+    entry = CachedValues.from_hex_ids(HEX_IDS, np.array([1, 0, 2]))
+    writer = FeatureCache(redis_service=redis_service, redis_ttl=60)
+    key = writer.key(3, "dynamic", 9, "school", "count", 300)
+
+    writer.put("leipzig", key, entry)
+    call = redis_service.write.cache_features.call_args.kwargs
+    assert (call["city"], call["key"], call["ttl"]) == ("leipzig", key, 60)
+    redis_service.read.get_cached_features.return_value = call["data"]
+    reader = FeatureCache(redis_service=redis_service)
+
+    cached = reader.get("leipzig", key)
+
+    assert cached is not None
+    assert cached.to_mapping() == dict(zip(HEX_IDS, [1, 0, 2]))
+    assert key.startswith("3_")
+    assert writer.key(4, "dynamic", 9, "school", "count", 300) != key
@@ -0,0 +1,100 @@
+from unittest.mock import MagicMock
+
+import pytest
+
+from sucolo_database_services.elasticsearch_client.index_manager import (
+    ElasticsearchIndexManager,
+    parse_versioned_index_name,
+)
+
+
+@pytest.fixture
+def es_client() -> MagicMock:
+    es = MagicMock()
+    es.indices.exists.return_value = False
+    es.indices.exists_alias.return_value = False
+    es.indices.get_alias.return_value = {}
+    return es
+
+
+def test_parse_versioned_index_name() -> None:
+    assert parse_versioned_index_name("leipzig__v12") == ("leipzig", 12)
+    assert parse_versioned_index_name("new__vork__v1") == ("new__vork", 1)
+    assert parse_versioned_index_name("leipzig") is None
+
+
+def test_create_versioned_index_uses_next_version_and_build_settings(
+    es_client: MagicMock,
+) -> None:
+    es_client.indices.get_alias.return_value = {
+        "leipzig__v1": {"aliases": {}},
+        "leipzig__v3": {"aliases": {"leipzig": {}}},
+    }
+    index_manager = ElasticsearchIndexManager(es_client)
+
+    index_name = index_manager.create_versioned_index(
+        alias="leipzig", mapping={"mappings": {}}
+    )
+
+    assert index_name == "leipzig__v4"
+    body = es_client.indices.create.call_args.kwargs["body"]
+    assert body["settings"] == {
+        "refresh_interval": "-1",
+        "number_of_replicas": 0,
+    }
+
+
+def test_publish_version_swaps_alias_atomically(es_client: MagicMock) -> None:
+    es_client.indices.exists_alias.return_value = True
+    es_client.indices.get_alias.return_value = {
+        "leipzig__v1": {"aliases": {"leipzig": {}}}
+    }
+    index_manager = ElasticsearchIndexManager(es_client)
+
+    index_manager.publish_version(alias="leipzig", index_name="leipzig__v2")
+
+    es_client.indices.put_settings.assert_called_once_with(
+        index="leipzig__v2",
+        settings={
+            "index": {"refresh_interval": None, "number_of_replicas": None}
+        },
+    )
+    es_client.indices.update_aliases.assert_called_once_with(
+        actions=[
+            {"remove": {"index": "leipzig__v1", "alias": "leipzig"}},
+            {"add": {"index": "leipzig__v2", "alias": "leipzig"}},
+        ]
+    )
+
+
+def test_publish_version_replaces_unversioned_index(
+    es_client: MagicMock,
+) -> None:
+    es_client.indices.exists.return_value = True
+    index_manager = ElasticsearchIndexManager(es_client)
+
+    index_manager.publish_version(alias="leipzig", index_name="leipzig__v1")
+
+    es_client.indices.update_aliases.assert_called_once_with(
+        actions=[
+            {"remove_index": {"index": "leipzig"}},
+            {"add": {"index": "leipzig__v1", "alias": "leipzig"}},
+        ]
+    )
+
+
+def test_delete_stale_versions_keeps_published_and_newer(
+    es_client: MagicMock,
+) -> None:
+    es_client.indices.get_alias.return_value = {
+        "leipzig__v1": {"aliases": {}},
+        "leipzig__v2": {"aliases": {}},
+        "leipzig__v3": {"aliases": {"leipzig": {}}},
+        "leipzig__v4": {"aliases": {}},  # still building
+    }
+    index_manager = ElasticsearchIndexManager(es_client)
+
+    deleted = index_manager.delete_stale_versions(alias="leipzig", keep=2)
+
+    assert deleted == ["leipzig__v1"]
+    es_client.indices.delete.assert_called_once_with(index="leipzig__v1")
@@ -0,0 +1,68 @@
+import h3
+import numpy as np
+
+from sucolo_database_services.utils.hex_centers import hex_ids_to_centers
+from sucolo_database_services.utils.poi_cells import (
+    approximate_counts,
+    count_pois_per_cell,
+)
+from sucolo_database_services.utils.point_index import haversine_distances
+
+
+def test_approximate_counts_sum_over_grid_disk() -> None:
+    center = h3.latlng_to_cell(12.38, 51.34, 9)
+    hex_ids = list(h3.grid_disk(center, 4))
+    lon, lat = hex_ids_to_centers([center, center])
+    cell_counts = count_pois_per_cell(lon, lat, resolution=12)
+    assert list(cell_counts.values()) == [2]
+    ring_1 = set(h3.grid_disk(center, 1))
+
+    counts = approximate_counts(
+        cells=list(cell_counts),
+        cell_counts=np.array(list(cell_counts.values())),
+        hex_ids=hex_ids,
+        radius=300,  # about one hexagon spacing at resolution 9
+    )
+
+    # Counts are scaled down to the area of the radius
+    assert [count > 0 for count in counts] == [
+        hex_id in ring_1 for hex_id in hex_ids
+    ]
+    assert approximate_counts(
+        cells=list(cell_counts),
+        cell_counts=np.array(list(cell_counts.values())),
+        hex_ids=hex_ids,
+        radius=50,
+    ).tolist() == [2 if hex_id == center else 0 for hex_id in hex_ids]
+
+
+def test_approximate_counts_match_exact_counts_for_small_radii() -> None:
+    center = h3.latlng_to_cell(12.38, 51.34, 9)
+    hex_ids = list(h3.grid_disk(center, 3))
+    hex_lon, hex_lat = hex_ids_to_centers(hex_ids)
+    rng = np.random.default_rng(0)
+    lon = rng.uniform(12.34, 12.42, 5000)
+    lat = rng.uniform(51.315, 51.365, 5000)
+    cell_counts = count_pois_per_cell(lon, lat, resolution=12)
+
+    # Radii below the spacing of the hexagons (about 300 m)
+    for radius in [30, 100, 200]:
+        exact = np.array(
+            [
+                np.sum(
+                    haversine_distances(
+                        np.full(len(lon), x), np.full(len(lat), y), lon, lat
+                    )
+                    <= radius
+                )
+                for x, y in zip(hex_lon, hex_lat)
+            ]
+        )
+        counts = approximate_counts(
+            cells=list(cell_counts),
+            cell_counts=np.array(list(cell_counts.values())),
+            hex_ids=hex_ids,
+            radius=radius,
+        )
+
+        assert abs(counts.mean() - exact.mean()) < 0.15 * exact.mean()
@@ -0,0 +1,292 @@
+from typing import Iterator
+from unittest.mock import MagicMock
+
+import h3
+import numpy as np
+import pytest
+import redis
+from pytest_mock import MockerFixture
+
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.hex_features_script import (
+    HexFeatureMode,
+)
+from sucolo_database_services.redis_client.read_repository import (
+    RedisReadRepository,
+)
+
+HEX_IDS = ["8963b10664bffff", "8963b10625bffff", "8963b1071d7ffff"]
+
+
+@pytest.fixture
+def redis_client() -> MagicMock:
+    client = MagicMock()
+    client.exists.return_value = 1
+    client.get.return_value = None
+    client.zrange.return_value = [hex_id.encode() for hex_id in HEX_IDS]
+    pipeline = client.pipeline.return_value
+    pipeline.execute.return_value = [
+        [(b"poi1", 120.5), (b"poi2", 180.0)],
+        [],
+        [(b"poi3", 40.0)],
+    ]
+    return client
+
+
+def test_find_nearest_pois_derives_hex_centers_from_h3(
+    redis_client: MagicMock,
+) -> None:
+    repository = RedisReadRepository(redis_client)
+
+    result = repository.find_nearest_pois_to_hex_centers(
+        city="leipzig", amenity="school", resolution=9, radius=500, count=None
+    )
+
+    assert result == {
+        HEX_IDS[0]: [120.5, 180.0],
+        HEX_IDS[1]: [],
+        HEX_IDS[2]: [40.0],
+    }
+    pipeline = redis_client.pipeline.return_value
+    pipeline.geopos.assert_not_called()
+    centers = [
+        (call.kwargs["longitude"], call.kwargs["latitude"])
+        for call in pipeline.georadius.call_args_list
+    ]
+    assert centers == [h3.cell_to_latlng(hex_id) for hex_id in HEX_IDS]
+    assert 51 < centers[0][1] < 52  # Leipzig latitude
+
+
+def test_hex_centers_are_cached_per_city_and_resolution(
+    redis_client: MagicMock,
+) -> None:
+    repository = RedisReadRepository(redis_client)
+    for _ in range(2):
+        repository.find_nearest_pois_to_hex_centers(
+            city="leipzig", amenity="school", resolution=9
+        )
+    first = repository.hex_centers_cache.get("leipzig", 9, HEX_IDS)
+    assert repository.hex_centers_cache.get("leipzig", 9, HEX_IDS) is first
+
+    # A changed set of hexagons is recomputed
+    changed = repository.hex_centers_cache.get("leipzig", 9, HEX_IDS[:2])
+    assert changed is not first
+    assert changed.lon.shape == (2,)
+
+
+def test_hex_catalogue_is_loaded_once_per_generation(
+    redis_client: MagicMock,
+) -> None:
+    values = {
+        "leipzig_9_hex_catalogue": HexCatalogue.from_hex_ids(
+            HEX_IDS
+        ).to_bytes(),
+        "leipzig_generation": b"1",
+    }
+    redis_client.get.side_effect = values.get
+    repository = RedisReadRepository(redis_client)
+
+    first = repository.get_hexagons(city="leipzig", resolution=9)
+
+    assert first == HEX_IDS
+    assert repository.get_hexagons(city="leipzig", resolution=9) is first
+    # Only the generation is read for the second call
+    keys = [call.args[0] for call in redis_client.get.call_args_list]
+    assert keys.count("leipzig_9_hex_catalogue") == 1
+    # A changed city loads the catalogue again
+    values["leipzig_9_hex_catalogue"] = HexCatalogue.from_hex_ids(
+        HEX_IDS[:2]
+    ).to_bytes()
+    assert repository.get_hexagons(city="leipzig", resolution=9) is first
+    values["leipzig_generation"] = b"2"
+    assert repository.get_hexagons(city="leipzig", resolution=9) == HEX_IDS[:2]
+
+
+def test_hex_catalogue_round_trip() -> None:
+    lon = np.array([12.1, 12.2, 12.3])
+    lat = np.array([51.1, 51.2, 51.3])
+    catalogue = HexCatalogue.from_hex_ids(HEX_IDS, lon=lon, lat=lat)
+
+    loaded = HexCatalogue.from_bytes(catalogue.to_bytes())
+
+    assert loaded.hex_ids == HEX_IDS
+    assert loaded.lon is not None and loaded.lat is not None
+    assert loaded.lon.tolist() == lon.tolist()
+    assert loaded.lat.tolist() == lat.tolist()
+    ids_only = HexCatalogue.from_hex_ids(HEX_IDS).to_bytes()
+    assert HexCatalogue.from_bytes(ids_only).lon is None
+    with pytest.raises(ValueError):
+        HexCatalogue.from_bytes(ids_only[:-1])
+
+
+def test_find_nearest_pois_uses_hex_catalogue(
+    redis_client: MagicMock,
+) -> None:
+    lon = np.array([12.1, 12.2, 12.3])
+    lat = np.array([51.1, 51.2, 51.3])
+    catalogue = HexCatalogue.from_hex_ids(HEX_IDS, lon=lon, lat=lat)
+    redis_client.get.side_effect = {
+        "leipzig_9_hex_catalogue": catalogue.to_bytes()
+    }.get
+    repository = RedisReadRepository(redis_client)
+
+    result = repository.find_nearest_pois_to_hex_centers(
+        city="leipzig", amenity="school", resolution=9, radius=500
+    )
+
+    assert list(result) == HEX_IDS
+    redis_client.get.assert_any_call("leipzig_9_hex_catalogue")
+    redis_client.zrange.assert_not_called()
+    centers = [
+        (call.kwargs["longitude"], call.kwargs["latitude"])
+        for call in redis_client.pipeline.return_value.georadius.call_args_list
+    ]
+    assert centers == list(zip(lon.tolist(), lat.tolist()))
+
+
+def test_compute_hex_feature_runs_script_per_chunk(
+    redis_client: MagicMock, mocker: MockerFixture
+) -> None:
+    mocker.patch(
+        "sucolo_database_services.redis_client.read_repository"
+        ".HEX_FEATURES_CHUNK_SIZE",
+        2,
+    )
+    catalogue = HexCatalogue.from_hex_ids(
+        HEX_IDS, lon=np.zeros(3), lat=np.zeros(3)
+    )
+    redis_client.get.side_effect = {
+        "leipzig_9_hex_catalogue": catalogue.to_bytes()
+    }.get
+    redis_client.pipeline.return_value.execute.return_value = [
+        np.array([120.5, np.nan]).tobytes(),
+        np.array([40.0]).tobytes(),
+    ]
+    repository = RedisReadRepository(redis_client)
+    script = redis_client.register_script.return_value
+
+    result = repository.compute_hex_feature(
+        city="leipzig",
+        amenity="school",
+        resolution=9,
+        radius=500,
+        mode="nearest",
+    )
+
+    assert result is not None
+    hex_ids, values = result
+    assert hex_ids == HEX_IDS
+    assert np.array_equal(values, [120.5, np.nan, 40.0], equal_nan=True)
+    assert [call.kwargs["args"] for call in script.call_args_list] == [
+        [500, "nearest", 0, 2],
+        [500, "nearest", 2, 3],
+    ]
+    assert script.call_args.kwargs["keys"] == [
+        "leipzig_9_hex_catalogue",
+        "leipzig_school_pois",
+    ]
+
+
+@pytest.fixture
+def real_redis_client() -> Iterator[redis.Redis]:
+    client = redis.Redis(host="localhost", port=6379, db=15)
+    try:
+        client.ping()
+    except redis.ConnectionError:
+        pytest.skip("Redis is not available.")
+    yield client
+    client.delete("test_9_hex_catalogue", "test_school_pois")
+    client.close()
+
+
+@pytest.mark.parametrize(
+    "mode, expected",
+    [("count", [1, 0, 1]), ("presence", [1, 0, 1])],
+)
+def test_hex_features_script_runs_in_redis(
+    real_redis_client: redis.Redis,
+    mocker: MockerFixture,
+    mode: HexFeatureMode,
+    expected: list[int],
+) -> None:
+    mocker.patch(
+        "sucolo_database_services.redis_client.read_repository"
+        ".HEX_FEATURES_CHUNK_SIZE",
+        2,
+    )
+    centers = [h3.cell_to_latlng(hex_id) for hex_id in HEX_IDS]
+    lon, lat = np.array(centers).T
+    real_redis_client.set(
+        "test_9_hex_catalogue",
+        HexCatalogue.from_hex_ids(HEX_IDS, lon=lon, lat=lat).to_bytes(),
+    )
+    real_redis_client.geoadd(
+        "test_school_pois",
+        [*centers[0], "poi1", *centers[2], "poi2"],
+    )
+    repository = RedisReadRepository(real_redis_client)
+
+    result = repository.compute_hex_feature(
+        city="test", amenity="school", resolution=9, radius=50, mode=mode
+    )
+    nearest = repository.compute_hex_feature(
+        city="test", amenity="school", resolution=9, radius=50, mode="nearest"
+    )
+
+    assert result is not None and nearest is not None
+    assert result[1].tolist() == expected
+    assert nearest[1][0] < 1 and nearest[1][2] < 1
+    assert np.isnan(nearest[1][1])
+
+
+def test_compute_hex_feature_needs_catalogue(redis_client: MagicMock) -> None:
+    repository = RedisReadRepository(redis_client)
+
+    result = repository.compute_hex_feature(
+        city="leipzig", amenity="school", resolution=9, radius=500, mode="count"
+    )
+
+    assert result is None
+
+
+def test_find_presence_uses_geosearch_any(redis_client: MagicMock) -> None:
+    pipeline = redis_client.pipeline.return_value
+    pipeline.execute.return_value = [[b"poi1"], [], [b"poi3"]]
+    repository = RedisReadRepository(redis_client)
+
+    result = repository.find_presence_near_hex_centers(
+        city="leipzig", amenity="bench", resolution=9, radius=200
+    )
+
+    assert result == {HEX_IDS[0]: 1, HEX_IDS[1]: 0, HEX_IDS[2]: 1}
+    pipeline.georadius.assert_not_called()
+    kwargs = pipeline.geosearch.call_args.kwargs
+    assert kwargs["count"] == 1 and kwargs["any"] is True
+    assert "withdist" not in kwargs and "sort" not in kwargs
+
+
+def test_find_nearest_pois_to_points_chunks_pipelines(
+    redis_client: MagicMock,
+) -> None:
+    pipeline = redis_client.pipeline.return_value
+    pipeline.execute.side_effect = [
+        [[(b"poi1", 120.5), (b"poi2", 180.0), (b"poi4", 250.0)], []],
+        [[(b"poi3", 40.0)]],
+    ]
+    repository = RedisReadRepository(redis_client, pipeline_chunk_size=2)
+
+    offsets, distances = repository.find_nearest_pois_to_points(
+        city="leipzig",
+        amenity="school",
+        lon=np.array([12.37, 12.38, 12.39]),
+        lat=np.array([51.33, 51.34, 51.35]),
+        radius=500,
+        count=None,
+    )
+
+    # More distances than points, the preallocated array grows
+    assert offsets.tolist() == [0, 3, 3, 4]
+    assert distances.tolist() == [120.5, 180.0, 250.0, 40.0]
+    assert pipeline.execute.call_count == 2
+    redis_client.pipeline.assert_called_with(transaction=False)
+    redis_client.set.assert_not_called()
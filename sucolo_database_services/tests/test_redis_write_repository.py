@@ -0,0 +1,161 @@
+from unittest.mock import MagicMock
+
+import geopandas as gpd
+import h3
+import pytest
+from shapely.geometry import Point, Polygon
+
+from sucolo_database_services.redis_client.hex_catalogue import HexCatalogue
+from sucolo_database_services.redis_client.write_repository import (
+    RedisWriteRepository,
+)
+
+DISTRICTS = gpd.GeoDataFrame(
+    {"district": ["Mitte"]},
+    geometry=[
+        Polygon(
+            [(12.37, 51.33), (12.39, 51.33), (12.39, 51.35), (12.37, 51.35)]
+        )
+    ],
+)
+
+
+@pytest.fixture
+def redis_client() -> MagicMock:
+    client = MagicMock()
+    client.exists.side_effect = lambda key: key == "leipzig_cafe_pois"
+    client.geoadd.side_effect = lambda key, values: len(values) // 3
+    return client
+
+
+@pytest.fixture
+def pois() -> gpd.GeoDataFrame:
+    return gpd.GeoDataFrame(
+        {
+            "amenity": ["school", "cafe", "school", "school", "bench"],
+            "wheelchair": ["yes", "yes", "no", "yes", "no"],
+            "geometry": [Point(12.0 + i, 51.0 + i) for i in range(5)],
+        },
+        index=[10, 11, 12, 13, 14],
+    )
+
+
+def test_upload_pois_by_amenity_key_chunks_geoadd(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None:
+    repository = RedisWriteRepository(redis_client, geoadd_chunk_size=2)
+
+    responses = repository.upload_pois_by_amenity_key(city="leipzig", pois=pois)
+
+    # "cafe" already exists, "school" is split into chunks of 2 POIs
+    assert responses == [2, 1, 1]
+    calls = [call.args for call in redis_client.geoadd.call_args_list]
+    assert calls == [
+        ("leipzig_school_pois", [12.0, 51.0, "10", 14.0, 53.0, "12"]),
+        ("leipzig_school_pois", [15.0, 54.0, "13"]),
+        ("leipzig_bench_pois", [16.0, 55.0, "14"]),
+    ]
+
+
+def test_upload_wheelchair_accessible_pois(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None:
+    repository = RedisWriteRepository(redis_client)
+
+    responses = repository.upload_pois_by_amenity_key(
+        city="leipzig", pois=pois, only_wheelchair_accessible=True
+    )
+
+    assert responses == [2, 1]
+    keys = [call.args[0] for call in redis_client.geoadd.call_args_list]
+    assert keys == [
+        "leipzig_school_wheelchair_pois",
+        "leipzig_cafe_wheelchair_pois",
+    ]
+
+
+def test_upload_hex_centers_writes_geo_set_and_catalogue(
+    redis_client: MagicMock,
+) -> None:
+    repository = RedisWriteRepository(redis_client, geoadd_chunk_size=5)
+
+    added = repository.upload_hex_centers(
+        city="leipzig", districts=DISTRICTS, resolution=9
+    )
+
+    key, data = redis_client.set.call_args.args
+    assert key == "leipzig_9_hex_catalogue"
+    catalogue = HexCatalogue.from_bytes(data)
+    assert added == len(catalogue) > 5
+    geo_members = [
+        member
+        for call in redis_client.geoadd.call_args_list
+        for member in call.args[1][2::3]
+    ]
+    assert geo_members == catalogue.hex_ids
+    assert catalogue.lon is not None
+    assert 12.37 < catalogue.lon.min() and catalogue.lon.max() < 12.39
+
+
+def test_upload_hex_centers_skips_existing_keys(
+    redis_client: MagicMock,
+) -> None:
+    redis_client.exists.side_effect = lambda key: True
+    repository = RedisWriteRepository(redis_client)
+
+    assert (
+        repository.upload_hex_centers(city="leipzig", districts=DISTRICTS)
+        is False
+    )
+    redis_client.geoadd.assert_not_called()
+    redis_client.set.assert_not_called()
+
+
+def test_upsert_poi_returns_previous_position(
+    redis_client: MagicMock,
+) -> None:
+    pipeline = redis_client.pipeline.return_value
+    pipeline.execute.return_value = [[(12.38, 51.34)], 0]
+    repository = RedisWriteRepository(redis_client)
+
+    previous = repository.upsert_poi(
+        city="leipzig", amenity="school", poi_id="10", lon=12.39, lat=51.35
+    )
+
+    assert previous == (12.38, 51.34)
+    pipeline.geoadd.assert_called_once_with(
+        "leipzig_school_pois", [12.39, 51.35, "10"]
+    )
+    pipeline.execute.return_value = [[None], 0]
+    assert (
+        repository.delete_poi(city="leipzig", amenity="school", poi_id="11")
+        is None
+    )
+    pipeline.zrem.assert_called_once_with("leipzig_school_pois", "11")
+
+
+def test_update_poi_cells_uses_stored_resolution(
+    redis_client: MagicMock, pois: gpd.GeoDataFrame
+) -> None:
+    redis_client.get.return_value = None
+    repository = RedisWriteRepository(redis_client)
+
+    repository.update_poi_cells(
+        city="leipzig", amenity="school", added=(12, 51)
+    )
+    redis_client.pipeline.assert_not_called()
+
+    repository.upload_poi_cells(city="leipzig", pois=pois, resolution=8)
+    redis_client.set.assert_called_once_with("leipzig_poi_cell_resolution", 8)
+    redis_client.get.return_value = b"8"
+    with pytest.raises(ValueError):
+        repository.upload_poi_cells(city="leipzig", pois=pois, resolution=9)
+
+    repository.update_poi_cells(
+        city="leipzig", amenity="school", removed=(12, 51), added=(13, 52)
+    )
+    pipeline = redis_client.pipeline.return_value
+    assert [call.args for call in pipeline.hincrby.call_args_list] == [
+        ("leipzig_school_poi_cells", h3.latlng_to_cell(12, 51, 8), -1),
+        ("leipzig_school_poi_cells", h3.latlng_to_cell(13, 52, 8), 1),
+    ]
@@ -0,0 +1,85 @@
+from unittest.mock import MagicMock
+
+import numpy as np
+
+from sucolo_database_services.data_access import DataAccess
+from sucolo_database_services.services.spatial_engines import LocalSpatialEngine
+from sucolo_database_services.utils.config import Config, SpatialEngineType
+from sucolo_database_services.utils.hex_centers import HexCenters
+from sucolo_database_services.utils.point_index import (
+    PointIndex,
+    haversine_distances,
+)
+
+
+def test_point_index_matches_brute_force() -> None:
+    rng = np.random.default_rng(0)
+    poi_lon, poi_lat = rng.uniform(12.3, 12.5, 500), rng.uniform(
+        51.3, 51.4, 500
+    )
+    lon, lat = rng.uniform(12.28, 12.52, 300), rng.uniform(51.28, 51.42, 300)
+    index = PointIndex(lon=poi_lon, lat=poi_lat)
+
+    for radius, count in [(100, None), (700, None), (700, 2)]:
+        offsets, distances = index.query_radius(
+            lon, lat, radius=radius, count=count, batch_size=64
+        )
+        for i in range(len(lon)):
+            expected = np.sort(
+                haversine_distances(
+                    np.full(len(poi_lon), lon[i]),
+                    np.full(len(poi_lat), lat[i]),
+                    poi_lon,
+                    poi_lat,
+                )
+            )
+            expected = expected[expected <= radius][:count]
+            found = distances[offsets[i] : offsets[i + 1]]
+            assert np.array_equal(found, expected)
+
+
+def test_local_engine_loads_pois_once() -> None:
+    redis_service = MagicMock()
+    redis_service.read.get_hex_centers.return_value = HexCenters(
+        hex_ids=["a", "b"],
+        lon=np.array([12.0, 13.0]),
+        lat=np.array([51.0, 51.0]),
+    )
+    # About 70 m and 140 m east of "a"
+    redis_service.read.get_poi_coordinates.return_value = (
+        np.array([12.001, 12.002]),
+        np.array([51.0, 51.0]),
+    )
+    redis_service.read.get_generation.return_value = 0
+    engine = LocalSpatialEngine(redis_service)
+
+    nearest = engine.find_nearest_pois_to_hex_centers(
+        city="leipzig", amenity="school", resolution=9, radius=100
+    )
+    everything = engine.find_nearest_pois_to_hex_centers(
+        city="leipzig", amenity="school", resolution=9, radius=200, count=None
+    )
+
+    assert nearest == {"a": [69.997], "b": []}
+    assert everything == {"a": [69.997, 139.994], "b": []}
+    redis_service.read.get_poi_coordinates.assert_called_once_with(
+        city="leipzig", amenity="school"
+    )
+    engine.invalidate("leipzig")
+    engine.get_poi_index(city="leipzig", amenity="school")
+    assert redis_service.read.get_poi_coordinates.call_count == 2
+    # Data written by another process
+    redis_service.read.get_generation.return_value = 1
+    engine.get_poi_index(city="leipzig", amenity="school")
+    engine.get_poi_index(city="leipzig", amenity="school")
+    assert redis_service.read.get_poi_coordinates.call_count == 3
+
+
+def test_spatial_engine_is_selected_by_config(config: Config) -> None:
+    config.features.spatial_engine = SpatialEngineType.LOCAL
+
+    data_access = DataAccess(config)
+
+    assert isinstance(
+        data_access.dynamic_features.spatial_engine, LocalSpatialEngine
+    )
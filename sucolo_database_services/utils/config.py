@@ -11,6 +11,12 @@ class Environment(str, Enum):
     PRODUCTION = "production"
 
 
+class SpatialEngineType(str, Enum):
+    REDIS = "redis"
+    REDIS_SCRIPT = "redis_script"
+    LOCAL = "local"
+
+
 class DatabaseConfig(BaseModel):
     elastic_host: str = Field(..., description="Elasticsearch host URL")
     elastic_user: str = Field(..., description="Elasticsearch username")
@@ -18,9 +24,31 @@ class DatabaseConfig(BaseModel):
     elastic_timeout: int = Field(
         default=60, description="Elasticsearch timeout in seconds"
     )
+    elastic_bulk_thread_count: int = Field(
+        default=4, gt=0, description="Concurrent Elasticsearch bulk requests"
+    )
+    elastic_bulk_chunk_size: int = Field(
+        default=1000, gt=0, description="Documents per bulk request"
+    )
+    elastic_bulk_max_chunk_bytes: int = Field(
+        default=10 * 1024 * 1024, gt=0, description="Bytes per bulk request"
+    )
+    elastic_bulk_max_retries: int = Field(
+        default=3,
+        ge=0,
+        description="Retries of documents rejected with 429 during ingest",
+    )
     redis_host: str = Field(..., description="Redis host")
     redis_port: int = Field(..., description="Redis port")
     redis_db: int = Field(..., description="Redis database number")
+    redis_geoadd_chunk_size: int = Field(
+        default=10_000, gt=0, description="POIs added by one Redis GEOADD"
+    )
+    redis_pipeline_chunk_size: int = Field(
+        default=10_000,
+        gt=0,
+        description="Commands sent in one Redis pipeline by read queries",
+    )
     ca_certs: Path = Field(
         default=Path("certs/ca.crt"), description="Path to CA certificates file"
     )
@@ -46,6 +74,40 @@ class LoggingConfig(BaseModel):
     )
 
 
+class FeaturesConfig(BaseModel):
+    spatial_engine: SpatialEngineType = Field(
+        default=SpatialEngineType.REDIS,
+        description=(
+            "Engine computing dynamic features: GEORADIUS queries in Redis,"
+            " a Redis script computing each feature in one call, or"
+            " in-process NumPy queries on POIs loaded from Redis"
+        ),
+    )
+    max_concurrent_queries: int = Field(
+        default=4,
+        gt=0,
+        description=(
+            "Amenity sweeps and district feature reads of one multiple"
+            " features query running at the same time"
+        ),
+    )
+    feature_cache_max_bytes: int = Field(
+        default=0,
+        ge=0,
+        description=(
+            "Bytes of computed features cached in process, 0 disables the"
+            " feature cache"
+        ),
+    )
+    feature_cache_redis: bool = Field(
+        default=False,
+        description="Also cache computed features in Redis",
+    )
+    feature_cache_redis_ttl: int = Field(
+        default=3600, gt=0, description="Seconds features are cached in Redis"
+    )
+
+
 class Config(BaseModel):
     environment: Environment = Field(
         default=Environment.DEVELOPMENT, description="Current environment"
@@ -54,6 +116,10 @@ class Config(BaseModel):
     logging: LoggingConfig = Field(
         default_factory=LoggingConfig, description="Logging configuration"
     )
+    features: FeaturesConfig = Field(
+        default_factory=FeaturesConfig,
+        description="Dynamic features configuration",
+    )
 
     class Config:
         env_prefix = "SUCOLO_"
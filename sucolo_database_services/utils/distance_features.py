@@ -0,0 +1,97 @@
+from typing import Iterable
+
+import numpy as np
+import numpy.typing as npt
+
+# Distances of many query points in CSR layout, as returned by
+# `PointIndex.query_radius`: the sorted distances of point i are
+# distances[offsets[i]:offsets[i + 1]].
+CSR_TYPE = tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]
+
+
+def to_csr(nearest_distances: Iterable[list[float]]) -> CSR_TYPE:
+    """Pack lists of sorted distances into CSR arrays."""
+    lists = list(nearest_distances)
+    lengths = np.fromiter(
+        (len(dists) for dists in lists), dtype=np.int64, count=len(lists)
+    )
+    offsets = np.zeros(len(lists) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=offsets[1:])
+    distances = np.fromiter(
+        (d for dists in lists for d in dists),
+        dtype=np.float64,
+        count=int(offsets[-1]),
+    )
+    return offsets, distances
+
+
+def nearest_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radius: float,
+) -> npt.NDArray[np.float64]:
+    """Nearest distance of every point, NaN if none is within radius."""
+    lengths = np.diff(offsets)
+    first = np.full(len(lengths), np.nan)
+    has_any = lengths > 0
+    first[has_any] = distances[offsets[:-1][has_any]]
+    first[first > radius] = np.nan
+    return first
+
+
+def counts_within_radii(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radii: Iterable[int],
+) -> dict[int, npt.NDArray[np.int64]]:
+    """Count the distances within each radius in one binning pass.
+
+    Distances are binned into the bands between the sorted radii with
+    `np.searchsorted`, and the band histograms are summed up.
+    """
+    edges = np.array(sorted(set(radii)), dtype=np.float64)
+    n_points = len(offsets) - 1
+    rows = np.repeat(np.arange(n_points), np.diff(offsets))
+    # Band i holds the distances in (edges[i - 1], edges[i]], the last
+    # one the distances beyond all radii
+    bands = np.searchsorted(edges, distances, side="left")
+    n_bands = len(edges) + 1
+    histograms = np.bincount(
+        rows * n_bands + bands, minlength=n_points * n_bands
+    ).reshape(n_points, n_bands)
+    counts = np.cumsum(histograms[:, :-1], axis=1)
+    return {
+        int(radius): counts[:, i] for i, radius in enumerate(edges.tolist())
+    }
+
+
+def kth_nearest_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    k: int,
+    radius: float,
+) -> npt.NDArray[np.float64]:
+    """Distance to the k-th nearest POI, NaN if it isn't within radius."""
+    lengths = np.diff(offsets)
+    kth = np.full(len(lengths), np.nan)
+    has_k = lengths >= k
+    kth[has_k] = distances[offsets[:-1][has_k] + k - 1]
+    kth[kth > radius] = np.nan
+    return kth
+
+
+def accessibility_within(
+    offsets: npt.NDArray[np.int64],
+    distances: npt.NDArray[np.float64],
+    radius: float,
+    beta: float,
+) -> npt.NDArray[np.float64]:
+    """Sum of exp(-d / beta) over the distances within the radius."""
+    decay = np.where(distances <= radius, np.exp(-distances / beta), 0.0)
+    lengths = np.diff(offsets)
+    accessibility = np.zeros(len(lengths))
+    # Rows without distances have no segment to sum up
+    has_any = lengths > 0
+    if has_any.any():
+        accessibility[has_any] = np.add.reduceat(decay, offsets[:-1][has_any])
+    return accessibility
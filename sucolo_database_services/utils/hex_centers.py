@@ -0,0 +1,96 @@
+import threading
+from dataclasses import dataclass
+from typing import Sequence
+
+import h3
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.utils.point_index import haversine_distances
+
+
+@dataclass(frozen=True)
+class HexCenters:
+    """Hexagon ids with their center coordinates (aligned arrays)."""
+
+    hex_ids: list[str]
+    lon: npt.NDArray[np.float64]
+    lat: npt.NDArray[np.float64]
+
+
+def hex_ids_to_centers(
+    hex_ids: Sequence[str],
+) -> tuple[npt.NDArray[np.float64], npt.NDArray[np.float64]]:
+    """Compute (lon, lat) arrays of H3 cell centers.
+
+    Hexagons are indexed from (lon, lat) pairs (see `polygons2hexagons`),
+    so `h3.cell_to_latlng` returns the center as (lon, lat), the same way
+    it is stored in the Redis GEO set.
+    """
+    lon_lat = np.fromiter(
+        (coord for hex_id in hex_ids for coord in h3.cell_to_latlng(hex_id)),
+        dtype=np.float64,
+        count=2 * len(hex_ids),
+    ).reshape(-1, 2)
+    return lon_lat[:, 0].copy(), lon_lat[:, 1].copy()
+
+
+def hexagons_in_polygon(
+    polygon: Sequence[tuple[float, float]], resolution: int
+) -> set[str]:
+    """H3 cells whose centers lie within a polygon of (lon, lat) points."""
+    return set(h3.polygon_to_cells(h3.LatLngPoly(list(polygon)), resolution))
+
+
+def hexagons_near_point(
+    lon: float, lat: float, resolution: int, radius: float
+) -> list[str]:
+    """H3 cells whose centers may lie within radius of a point.
+
+    The grid disk around the point's cell grows ring by ring until a
+    whole ring is further than radius plus one cell spacing. The result
+    is a superset of the cells within radius, filter it with the exact
+    distances of the centers.
+    """
+    cell = h3.latlng_to_cell(lon, lat, resolution)
+    cells = {cell}
+    spacing: float | None = None
+    k = 0
+    while True:
+        k += 1
+        # grid_disk also works around pentagons, unlike grid_ring
+        ring = list(set(h3.grid_disk(cell, k)) - cells)
+        ring_lon, ring_lat = hex_ids_to_centers(ring)
+        distances = haversine_distances(
+            np.full(len(ring), lon), np.full(len(ring), lat), ring_lon, ring_lat
+        )
+        if spacing is None:
+            spacing = float(distances.max())
+        cells.update(ring)
+        if distances.min() > radius + spacing:
+            return list(cells)
+
+
+class HexCentersCache:
+    """In-process cache of hexagon centers per (city, resolution).
+
+    Hexagon centers are a pure function of the H3 ids, so an entry is
+    reused as long as the city's hexagon ids are the same as when it was
+    computed, and recomputed otherwise.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[tuple[str, int], HexCenters] = {}
+        self._lock = threading.Lock()
+
+    def get(self, city: str, resolution: int, hex_ids: list[str]) -> HexCenters:
+        key = (city, resolution)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry.hex_ids == hex_ids:
+            return entry
+
+        entry = HexCenters(hex_ids, *hex_ids_to_centers(hex_ids))
+        with self._lock:
+            self._entries[key] = entry
+        return entry
@@ -0,0 +1,129 @@
+from typing import Sequence
+
+import h3
+import numpy as np
+import numpy.typing as npt
+
+from sucolo_database_services.utils.hex_centers import hex_ids_to_centers
+from sucolo_database_services.utils.point_index import haversine_distances
+
+
+def count_pois_per_cell(
+    lon: npt.NDArray[np.float64],
+    lat: npt.NDArray[np.float64],
+    resolution: int,
+) -> dict[str, int]:
+    """Count POIs per H3 cell of the given resolution."""
+    cells = [
+        h3.latlng_to_cell(poi_lon, poi_lat, resolution)
+        for poi_lon, poi_lat in zip(lon.tolist(), lat.tolist())
+    ]
+    unique_cells, counts = np.unique(cells, return_counts=True)
+    return dict(zip(unique_cells.tolist(), counts.tolist()))
+
+
+def approximate_counts(
+    cells: Sequence[str],
+    cell_counts: npt.NDArray[np.int64],
+    hex_ids: Sequence[str],
+    radius: float,
+) -> npt.NDArray[np.uint32]:
+    """Approximate the number of POIs within radius of every hexagon.
+
+    POI counts are summed up to the hexagons' resolution (or a finer
+    one, down to the POI cells' resolution, for radii below the spacing
+    of the hexagons), then over the smallest grid disk around each
+    hexagon with at least the area of the circle, and scaled down by
+    the ratio of the two areas. POIs are only resolved to cells, so
+    counts are expected values and are off near the edge of the radius.
+
+    Args:
+        cells: H3 cells with POIs, at the hexagons' resolution or finer
+        cell_counts: Number of POIs of each cell
+        hex_ids: Hexagons to count POIs for, all of one resolution
+        radius: Radius in meters
+
+    Returns:
+        Counts aligned with hex_ids
+    """
+    if len(hex_ids) == 0 or len(cells) == 0:
+        return np.zeros(len(hex_ids), dtype=np.uint32)
+    resolution = h3.get_resolution(hex_ids[0])
+    cells_resolution = h3.get_resolution(cells[0])
+    if cells_resolution < resolution:
+        raise ValueError("POI cells are coarser than the hexagons.")
+
+    # Count at a finer resolution of the POI cells if the radius is
+    # smaller than the spacing of the hexagons.
+    sample = hex_ids[len(hex_ids) // 2]
+    spacing = _hex_spacing(sample)
+    while resolution < cells_resolution and spacing > radius:
+        resolution += 1
+        spacing = _hex_spacing(h3.cell_to_center_child(sample, resolution))
+    if resolution > h3.get_resolution(hex_ids[0]):
+        hex_ids = [
+            h3.cell_to_center_child(hex_id, resolution) for hex_id in hex_ids
+        ]
+
+    parents = np.fromiter(
+        (h3.str_to_int(h3.cell_to_parent(cell, resolution)) for cell in cells),
+        dtype=np.uint64,
+        count=len(cells),
+    )
+    parent_ints, inverse = np.unique(parents, return_inverse=True)
+    parent_counts = np.bincount(
+        inverse, weights=np.asarray(cell_counts), minlength=len(parent_ints)
+    )
+
+    k, scale = _covering_disk(radius, spacing=spacing)
+    disks = [h3.grid_disk(hex_id, k) for hex_id in hex_ids]
+    lengths = np.fromiter(
+        (len(disk) for disk in disks), dtype=np.int64, count=len(disks)
+    )
+    disk_ints = np.fromiter(
+        (h3.str_to_int(cell) for disk in disks for cell in disk),
+        dtype=np.uint64,
+        count=int(lengths.sum()),
+    )
+    positions = np.searchsorted(parent_ints, disk_ints)
+    positions[positions == len(parent_ints)] = 0
+    weights = np.where(
+        parent_ints[positions] == disk_ints, parent_counts[positions], 0
+    )
+    offsets = np.cumsum(lengths) - lengths
+    counts = np.add.reduceat(weights, offsets) * scale
+    return np.rint(counts).astype(np.uint32)
+
+
+def _covering_disk(radius: float, spacing: float) -> tuple[int, float]:
+    """Smallest grid disk covering the area of a circle.
+
+    Returns:
+        Number of rings k of the disk and the ratio of the circle's
+        area to the disk's area
+    """
+    circle_area = np.pi * radius**2
+    # A hexagon's area, from the distance between hexagon centers
+    hex_area = np.sqrt(3) / 2 * spacing**2
+    k = 0
+    while (3 * k * (k + 1) + 1) * hex_area < circle_area:
+        k += 1
+    return k, float(circle_area / ((3 * k * (k + 1) + 1) * hex_area))
+
+
+def _hex_spacing(hex_id: str) -> float:
+    """Mean distance in meters between a hexagon and its neighbours.
+
+    Measured on the real centers (see `hex_ids_to_centers`), H3's own
+    edge lengths don't match the distances on the ground.
+    """
+    neighbours = [cell for cell in h3.grid_disk(hex_id, 1) if cell != hex_id]
+    lon, lat = hex_ids_to_centers([hex_id])
+    neighbour_lon, neighbour_lat = hex_ids_to_centers(neighbours)
+    distances = haversine_distances(
+        np.repeat(lon, len(neighbours)),
+        np.repeat(lat, len(neighbours)),
+        neighbour_lon,
+        neighbour_lat,
+    )
+    return float(distances.mean())
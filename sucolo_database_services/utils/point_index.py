@@ -0,0 +1,160 @@
+from typing import Any
+
+import numpy as np
+import numpy.typing as npt
+
+# Earth radius used by Redis GEO commands, so distances match GEORADIUS.
+EARTH_RADIUS_M = 6372797.560856
+# Relative margin on grid cell sizes against floating point rounding.
+_CELL_MARGIN = 1e-9
+
+
+def haversine_distances(
+    lon1: npt.NDArray[np.float64],
+    lat1: npt.NDArray[np.float64],
+    lon2: npt.NDArray[np.float64],
+    lat2: npt.NDArray[np.float64],
+) -> npt.NDArray[np.float64]:
+    """Element-wise great-circle distances in meters, the way Redis does."""
+    lon1r, lat1r = np.radians(lon1), np.radians(lat1)
+    lon2r, lat2r = np.radians(lon2), np.radians(lat2)
+    u = np.sin((lat2r - lat1r) / 2)
+    v = np.sin((lon2r - lon1r) / 2)
+    a = u * u + np.cos(lat1r) * np.cos(lat2r) * v * v
+    distances: npt.NDArray[np.float64] = (
+        2.0 * EARTH_RADIUS_M * np.arcsin(np.sqrt(a))
+    )
+    return distances
+
+
+class PointIndex:
+    """Radius queries over (lon, lat) points with NumPy.
+
+    Points are bucketed into a uniform lon/lat grid whose cells are at
+    least as large as the query radius, so all points within the radius
+    of a query lie in the 3x3 cells around it. Candidates are expanded in
+    batches and filtered with the exact haversine distance.
+    """
+
+    def __init__(
+        self,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+    ) -> None:
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+
+    def __len__(self) -> int:
+        return len(self.lon)
+
+    def query_radius(
+        self,
+        lon: npt.NDArray[np.float64],
+        lat: npt.NDArray[np.float64],
+        radius: float,
+        count: int | None = None,
+        batch_size: int = 4096,
+    ) -> tuple[npt.NDArray[np.int64], npt.NDArray[np.float64]]:
+        """Find the distances to the points within radius of each query.
+
+        Args:
+            lon: Longitudes of the query points
+            lat: Latitudes of the query points
+            radius: Radius in meters (inclusive)
+            count: Keep only the `count` nearest points of each query
+            batch_size: Number of query points expanded at once
+
+        Returns:
+            (offsets, distances) in CSR layout: the distances of query i,
+            sorted ascending, are distances[offsets[i]:offsets[i + 1]]
+        """
+        lon = np.asarray(lon, dtype=np.float64)
+        lat = np.asarray(lat, dtype=np.float64)
+        n_queries = len(lon)
+        if len(self) == 0 or n_queries == 0:
+            return np.zeros(n_queries + 1, dtype=np.int64), np.empty(0)
+
+        lon_cell, lat_cell = self._cell_size(radius, lat)
+        origin_lon, origin_lat = self.lon.min(), self.lat.min()
+        cell_x = np.floor((self.lon - origin_lon) / lon_cell).astype(np.int64)
+        cell_y = np.floor((self.lat - origin_lat) / lat_cell).astype(np.int64)
+        max_x, max_y = int(cell_x.max()), int(cell_y.max())
+        stride = max_y + 1
+        order = np.argsort(cell_x * stride + cell_y, kind="stable")
+        sorted_keys = (cell_x * stride + cell_y)[order]
+
+        counts = np.zeros(n_queries, dtype=np.int64)
+        distance_batches: list[npt.NDArray[np.float64]] = []
+        for start in range(0, n_queries, batch_size):
+            batch_lon = lon[start : start + batch_size]
+            batch_lat = lat[start : start + batch_size]
+            query_x = np.floor((batch_lon - origin_lon) / lon_cell)
+            query_y = np.floor((batch_lat - origin_lat) / lat_cell)
+
+            starts: list[npt.NDArray[np.int64]] = []
+            ends: list[npt.NDArray[np.int64]] = []
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nx = (query_x + dx).astype(np.int64)
+                    ny = (query_y + dy).astype(np.int64)
+                    valid = (nx >= 0) & (nx <= max_x) & (ny >= 0)
+                    valid &= ny <= max_y
+                    keys = nx * stride + ny
+                    left = np.searchsorted(sorted_keys, keys, side="left")
+                    right = np.searchsorted(sorted_keys, keys, side="right")
+                    starts.append(left)
+                    ends.append(np.where(valid, right, left))
+            cell_starts = np.stack(starts, axis=1).ravel()
+            lengths = np.stack(ends, axis=1).ravel() - cell_starts
+
+            # Expand the (query, cell) ranges into (query, point) pairs
+            pair_query = np.repeat(np.arange(len(batch_lon)).repeat(9), lengths)
+            run_starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+            positions = (
+                np.arange(len(pair_query))
+                - run_starts
+                + np.repeat(cell_starts, lengths)
+            )
+            points = order[positions]
+            distances = haversine_distances(
+                batch_lon[pair_query],
+                batch_lat[pair_query],
+                self.lon[points],
+                self.lat[points],
+            )
+            within = distances <= radius
+            pair_query, distances = pair_query[within], distances[within]
+
+            by_query_and_distance = np.lexsort((distances, pair_query))
+            pair_query = pair_query[by_query_and_distance]
+            distances = distances[by_query_and_distance]
+            batch_counts = np.bincount(pair_query, minlength=len(batch_lon))
+            if count is not None:
+                group_starts = np.cumsum(batch_counts) - batch_counts
+                rank = np.arange(len(pair_query)) - group_starts[pair_query]
+                distances = distances[rank < count]
+                batch_counts = np.minimum(batch_counts, count)
+            counts[start : start + batch_size] = batch_counts
+            distance_batches.append(distances)
+
+        offsets = np.zeros(n_queries + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return offsets, np.concatenate(distance_batches)
+
+    def _cell_size(
+        self, radius: float, query_lat: npt.NDArray[Any]
+    ) -> tuple[float, float]:
+        """Grid cell size in degrees covering the radius everywhere."""
+        angle = radius / EARTH_RADIUS_M
+        lat_cell = np.degrees(angle)
+        max_abs_lat = max(np.abs(self.lat).max(), np.abs(query_lat).max())
+        max_abs_lat = min(90.0, max_abs_lat + lat_cell)
+        # Longitude extent of a spherical cap around the latitude
+        ratio = np.sin(angle) / np.cos(np.radians(max_abs_lat))
+        lon_cell = np.degrees(np.arcsin(ratio)) if ratio < 1 else 360.0
+        margin = 1 + _CELL_MARGIN
+        # Degenerate radius: any positive size works for distance 0
+        return (
+            max(float(lon_cell) * margin, 1e-12),
+            max(float(lat_cell) * margin, 1e-12),
+        )